@@ -1,4 +1,10 @@
 # https://doc.qt.io/qt-5/model-view-programming.html#model-view-classes
+import weakref
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
 from qtpy.QtWidgets import (
     QStyledItemDelegate, QApplication, QWidget, QStyle, QStyleOptionViewItem)
 from qtpy.QtCore import (
@@ -9,6 +15,126 @@ from qtpy.QtGui import QPainter, QColor, QPen, QBrush, QCursor, QPolygonF, QPain
 from cgwidgets.settings.colors import iColor
 from cgwidgets.utils import attrs
 
+
+class AbstractDragDropChildProvider(object):
+    """
+    Provides the children of items on demand, so that large hierarchies
+    (such as a scene graph), do not need to be created up front.  The
+    children are only created when the item is expanded or scrolled
+    into view, in blocks of the models fetch_chunk_size.
+
+    The provider is set on an item with setChildProvider(), and each child
+    it creates uses the same provider.  Subclasses need to implement
+    fetchChildren(), and should implement hasChildren() if it can be
+    determined more cheaply than by fetching.
+
+    Example:
+        class SceneGraphProvider(AbstractDragDropChildProvider):
+            def hasChildren(self, item):
+                return 0 < len(getLocations(item.columnData()['path']))
+
+            def fetchChildren(self, item, start, count):
+                locations = getLocations(item.columnData()['path'])[start:start + count]
+                return [{'name': location.split('/')[-1], 'path': location} for location in locations]
+
+        model.setChildProvider(SceneGraphProvider())
+    """
+    def hasChildren(self, item):
+        """
+        Args:
+            item (AbstractDragDropModelItem): item whose children are provided
+
+        Returns (bool): if the item has any children that can be fetched
+        """
+        return True
+
+    def fetchChildren(self, item, start, count):
+        """
+        Args:
+            item (AbstractDragDropModelItem): item whose children are provided
+            start (int): index of the first child to return
+            count (int): maximum number of children to return, if less than this
+                are returned, the item will not be fetched from again
+
+        Returns (list): of the column data (dict) of each child, see
+            AbstractDragDropModel.insertItems()
+        """
+        return []
+
+
+# value of the columns that an item does not have
+_MISSING = object()
+
+
+class AbstractDragDropColumnSchema(object):
+    """
+    Table of column data key --> index, that is shared by all of the
+    items, so that each item only needs to store a tuple of its values.
+    Keys are added the first time that any item sets them.
+    """
+    def __init__(self, keys=None):
+        self._keys = []
+        self._indexes = {}
+        for key in keys or []:
+            self.addKey(key)
+
+    def index(self, key):
+        """
+        Returns (int): index of the key, or None if no item has set it
+        """
+        return self._indexes.get(key)
+
+    def addKey(self, key):
+        """
+        Returns (int): index of the key, this is added if it does not exist
+        """
+        index = self._indexes.get(key)
+        if index is None:
+            index = len(self._keys)
+            self._keys.append(key)
+            self._indexes[key] = index
+        return index
+
+    def keys(self):
+        return self._keys
+
+
+class AbstractDragDropColumnData(MutableMapping):
+    """
+    Dictionary view of the column data of an item, this is returned by
+    AbstractDragDropModelItem.columnData(), and reads/writes the items values.
+    """
+    __slots__ = ('_item', )
+
+    def __init__(self, item):
+        self._item = item
+
+    def __getitem__(self, key):
+        value = self._item.columnValue(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._item.setColumnValue(key, value)
+
+    def __delitem__(self, key):
+        if not self._item.removeColumnValue(key):
+            raise KeyError(key)
+
+    def __iter__(self):
+        keys = self._item.COLUMN_SCHEMA.keys()
+        for index, value in enumerate(self._item._column_values):
+            if value is not _MISSING:
+                yield keys[index]
+
+    def __len__(self):
+        return sum(1 for value in self._item._column_values if value is not _MISSING)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class AbstractDragDropModelItem(object):
     """
 
@@ -22,23 +148,61 @@ class AbstractDragDropModelItem(object):
                 name
                 value
                 items_list
+        child_provider (AbstractDragDropChildProvider): creates the children of
+            this item when they are first displayed
+        COLUMN_SCHEMA (AbstractDragDropColumnSchema): shared table of the index
+            of each column data key in the column values of the items
+
+    Note:
+        Each item caches its row under its parent, so that row() does not
+        need to search its parents children.  The rows are set by
+        addChild/insertChild/removeChild, and the children after an
+        insertion/removal are renumbered lazily, the next time one of their
+        rows is asked for.
+
+        So that large trees stay small, the items use __slots__, the flags
+        are stored as bits of one int, and the column data is stored as a
+        tuple, indexed by the COLUMN_SCHEMA.  Subclasses that add attributes
+        should declare them in their own __slots__.
     """
+    __slots__ = (
+        '_column_values',
+        '_children',
+        '_parent',
+        '_row',
+        '_dirty_row',
+        '_child_provider',
+        '_num_fetched',
+        '_flags',
+        '_delegate_widget',
+        '_dynamicWidgetFunction',
+        '__weakref__'
+    )
+    COLUMN_SCHEMA = AbstractDragDropColumnSchema(['name'])
+
+    # flags
+    IS_ENABLED = 1
+    IS_SELECTABLE = 1 << 1
+    IS_DRAG_ENABLED = 1 << 2
+    IS_DROP_ENABLED = 1 << 3
+    IS_EDITABLE = 1 << 4
+    CAN_FETCH_MORE = 1 << 5
+    DEFAULT_FLAGS = IS_ENABLED | IS_SELECTABLE | IS_DRAG_ENABLED | IS_DROP_ENABLED | IS_EDITABLE
+
     def __init__(self, parent=None):
         #self._data = data
-        self._column_data = {}
+        self._column_values = ()
         self._children = []
         self._parent = parent
+        self._row = None
+        self._dirty_row = None
+        self._child_provider = None
+        self._num_fetched = 0
         self._delegate_widget = None
         self._dynamicWidgetFunction = None
 
         # flags
-
-        #self._is_selected = False
-        self._is_enabled = True
-        self._isSelectable = True
-        self._isDragEnabled = True
-        self._isDropEnabled = True
-        self._isEditable = True
+        self._flags = AbstractDragDropModelItem.DEFAULT_FLAGS
 
         # default parent
         if parent is not None:
@@ -51,6 +215,7 @@ class AbstractDragDropModelItem(object):
     #     self._is_selected = selected
 
     def addChild(self, child):
+        child._row = len(self._children)
         self._children.append(child)
 
     def insertChild(self, position, child):
@@ -60,23 +225,115 @@ class AbstractDragDropModelItem(object):
 
         self._children.insert(position, child)
         child._parent = self
+        child._row = position
+        self.invalidateRows(position + 1)
         return True
 
     def removeChild(self, position):
 
-        if position < 0 or position > len(self._children):
+        if position < 0 or position >= len(self._children):
             return False
 
         child = self._children.pop(position)
         child._parent = None
+        child._row = None
+        self.invalidateRows(position)
+
+        return True
+
+    def insertChildren(self, position, children):
+        """
+        Inserts a block of children
+
+        Args:
+            position (int): row to insert the children at
+            children (list): of AbstractDragDropModelItems
+
+        Returns (bool): if the children were inserted
+        """
+        if position < 0 or position > len(self._children):
+            return False
 
+        self._children[position:position] = children
+        for row, child in enumerate(children, position):
+            child._parent = self
+            child._row = row
+        self.invalidateRows(position + len(children))
+        return True
+
+    def removeChildren(self, position, count):
+        """
+        Removes a block of children
+
+        Args:
+            position (int): row of the first child to remove
+            count (int): number of children to remove
+
+        Returns (bool): if the children were removed
+        """
+        if position < 0 or count < 0 or position + count > len(self._children):
+            return False
+
+        for child in self._children[position:position + count]:
+            child._parent = None
+            child._row = None
+        del self._children[position:position + count]
+        self.invalidateRows(position)
         return True
 
     def columnData(self):
-        return self._column_data
+        """
+        Returns (AbstractDragDropColumnData): dictionary of the column data,
+            changes to this are set on the item
+        """
+        return AbstractDragDropColumnData(self)
 
     def setColumnData(self, _column_data):
-        self._column_data = _column_data
+        """
+        Args:
+            _column_data (dict): of the value of each column data key
+        """
+        schema = self.COLUMN_SCHEMA
+        indexes = [(schema.addKey(key), value) for key, value in _column_data.items()]
+        values = [_MISSING] * (max(index for index, value in indexes) + 1 if indexes else 0)
+        for index, value in indexes:
+            values[index] = value
+        self._column_values = tuple(values)
+
+    def columnValue(self, key, default=None):
+        """
+        Args:
+            key (str): column data key
+            default: returned if the item does not have the key
+
+        Returns: value of the key
+        """
+        index = self.COLUMN_SCHEMA.index(key)
+        values = self._column_values
+        if index is None or len(values) <= index:
+            return default
+        value = values[index]
+        return default if value is _MISSING else value
+
+    def setColumnValue(self, key, value):
+        index = self.COLUMN_SCHEMA.addKey(key)
+        values = self._column_values
+        if len(values) <= index:
+            values += (_MISSING, ) * (index + 1 - len(values))
+        self._column_values = values[:index] + (value, ) + values[index + 1:]
+
+    def removeColumnValue(self, key):
+        """
+        Returns (bool): if the item had the key
+        """
+        if self.columnValue(key, _MISSING) is _MISSING:
+            return False
+        index = self.COLUMN_SCHEMA.index(key)
+        values = self._column_values[:index] + (_MISSING, ) + self._column_values[index + 1:]
+        while values and values[-1] is _MISSING:
+            values = values[:-1]
+        self._column_values = values
+        return True
 
     def childCount(self):
         return len(self._children)
@@ -93,9 +350,90 @@ class AbstractDragDropModelItem(object):
     def parent(self):
         return self._parent
 
+    def childProvider(self):
+        return self._child_provider
+
+    def setChildProvider(self, child_provider):
+        """
+        Sets the provider of the children of this item, these will be fetched
+        when the item is displayed.
+
+        Args:
+            child_provider (AbstractDragDropChildProvider): or None, to only
+                use the children that have been added
+        """
+        self._child_provider = child_provider
+        self._num_fetched = 0
+        self.setCanFetchMore(child_provider is not None)
+
+    def numFetched(self):
+        """
+        Returns (int): number of children that have been fetched from the
+            child provider.  This is not the childCount(), as fetched
+            children can be removed, or moved, and other items added.
+        """
+        return self._num_fetched
+
+    def canFetchMore(self):
+        return bool(self._flags & AbstractDragDropModelItem.CAN_FETCH_MORE)
+
+    def setCanFetchMore(self, can_fetch_more):
+        self.setFlag(AbstractDragDropModelItem.CAN_FETCH_MORE, can_fetch_more)
+
     def row(self):
-        if self._parent is not None:
-            return self._parent._children.index(self)
+        """
+        Returns the row of this item under its parent.  This is the cached row,
+        unless the parents children have changed since it was set.
+
+        Returns (int)
+        """
+        parent = self._parent
+        if parent is None:
+            return None
+
+        if self.__isRowCached(parent._children):
+            return self._row
+
+        # renumber the children that have moved
+        parent.updateRows()
+        if self.__isRowCached(parent._children):
+            return self._row
+
+        # the children were changed without insertChild/removeChild
+        parent.updateRows(0)
+        if self.__isRowCached(parent._children):
+            return self._row
+        return parent._children.index(self)
+
+    def __isRowCached(self, children):
+        row = self._row
+        return row is not None and row < len(children) and children[row] is self
+
+    def invalidateRows(self, position=0):
+        """
+        Marks the rows of the children from the position provided as needing
+        to be renumbered.
+
+        Args:
+            position (int): first row whose children have moved
+        """
+        if self._dirty_row is None or position < self._dirty_row:
+            self._dirty_row = position
+
+    def updateRows(self, position=None):
+        """
+        Renumbers the cached rows of the children
+
+        Args:
+            position (int): first row to renumber, by default this is the first
+                row that has been invalidated
+        """
+        if position is None:
+            position = self._dirty_row or 0
+        children = self._children
+        for row in range(position, len(children)):
+            children[row]._row = row
+        self._dirty_row = None
 
     def log(self, tabLevel=-1):
         output = ""
@@ -114,39 +452,53 @@ class AbstractDragDropModelItem(object):
         return output
 
     """ DRAG / DROP PROPERTIES """
+    def flags(self):
+        return self._flags
+
+    def setFlag(self, flag, enabled):
+        """
+        Args:
+            flag (int): one of the flags, such as IS_ENABLED
+            enabled (bool):
+        """
+        if enabled:
+            self._flags |= flag
+        else:
+            self._flags &= ~flag
+
     def isEnabled(self):
-        return self._is_enabled
+        return bool(self._flags & AbstractDragDropModelItem.IS_ENABLED)
 
     def setIsEnabled(self, enable):
-        self._is_enabled = enable
+        self.setFlag(AbstractDragDropModelItem.IS_ENABLED, enable)
 
     def isSelectable(self):
-        if self._isSelectable: return Qt.ItemIsSelectable
+        if self._flags & AbstractDragDropModelItem.IS_SELECTABLE: return Qt.ItemIsSelectable
         else: return 0
 
     def setIsSelectable(self, _isSelectable):
-        self._isSelectable = _isSelectable
+        self.setFlag(AbstractDragDropModelItem.IS_SELECTABLE, _isSelectable)
 
     def isDragEnabled(self):
-        if self._isDragEnabled: return Qt.ItemIsDragEnabled
+        if self._flags & AbstractDragDropModelItem.IS_DRAG_ENABLED: return Qt.ItemIsDragEnabled
         else: return 0
 
     def setIsDragEnabled(self, _isDragEnabled):
-        self._isDragEnabled = _isDragEnabled
+        self.setFlag(AbstractDragDropModelItem.IS_DRAG_ENABLED, _isDragEnabled)
 
     def isDropEnabled(self):
-        if self._isDropEnabled: return Qt.ItemIsDropEnabled
+        if self._flags & AbstractDragDropModelItem.IS_DROP_ENABLED: return Qt.ItemIsDropEnabled
         else: return 0
 
     def setIsDropEnabled(self, _isDropEnabled):
-        self._isDropEnabled = _isDropEnabled
+        self.setFlag(AbstractDragDropModelItem.IS_DROP_ENABLED, _isDropEnabled)
 
     def isEditable(self):
-        if self._isEditable: return Qt.ItemIsEditable
+        if self._flags & AbstractDragDropModelItem.IS_EDITABLE: return Qt.ItemIsEditable
         else: return 0
 
     def setIsEditable(self, _isEditable):
-        self._isEditable = _isEditable
+        self.setFlag(AbstractDragDropModelItem.IS_EDITABLE, _isEditable)
 
 
 class AbstractDragDropModel(QAbstractItemModel):
@@ -159,9 +511,16 @@ class AbstractDragDropModel(QAbstractItemModel):
     Attributes:
         item_type (Item): Data item to be stored on each index.  By default this
             set to the AbstractDragDropModelItem
+        fetch_chunk_size (int): number of children that are created each time
+            more children are fetched from a child provider
+        role_data (WeakKeyDictionary): of the values of the CACHED_ROLES of each
+            item that has been displayed.  {item: {role: value}}.  These are
+            only cleared when dataChanged is emitted for the item.
     """
     ITEM_HEIGHT = 35
     ITEM_WIDTH = 100
+    FETCH_CHUNK_SIZE = 256
+    CACHED_ROLES = (Qt.FontRole, Qt.ForegroundRole, Qt.SizeHintRole, Qt.DecorationRole)
 
     def __init__(self, parent=None, root_item=None):
         super(AbstractDragDropModel, self).__init__(parent)
@@ -169,6 +528,7 @@ class AbstractDragDropModel(QAbstractItemModel):
         self._item_type = AbstractDragDropModelItem
         self._item_height = AbstractDragDropModel.ITEM_HEIGHT
         self._item_width = AbstractDragDropModel.ITEM_WIDTH
+        self._fetch_chunk_size = AbstractDragDropModel.FETCH_CHUNK_SIZE
 
         # set up root item
         if not root_item:
@@ -188,14 +548,22 @@ class AbstractDragDropModel(QAbstractItemModel):
         self._isEditable = True
         self._isDeleteEnabled = True
 
-        #
-        self._dropping = False
+        # role data cache
+        self._role_data = weakref.WeakKeyDictionary()
+        self.dataChanged.connect(self.__dataChangedEvent)
 
     """ UTILS """
     def setItemEnabled(self, item, enabled):
         item.setIsEnabled(enabled)
         self.itemEnabledEvent(item, enabled)
 
+        # update font/color
+        self.dataChanged.emit(
+            self.getIndexFromItem(item),
+            self.getIndexFromItem(item, column=self.columnCount(QModelIndex()) - 1),
+            [Qt.FontRole, Qt.ForegroundRole]
+        )
+
     def deleteItem(self, item, event_update=False):
         # run deletion event
         if event_update:
@@ -206,8 +574,9 @@ class AbstractDragDropModel(QAbstractItemModel):
         old_parent_index = self.getParentIndexFromItem(item)
 
         # remove item
-        self.beginRemoveRows(old_parent_index, item.row(), item.row() + 1)
-        old_parent_item.children().remove(item)
+        row = item.row()
+        self.beginRemoveRows(old_parent_index, row, row)
+        old_parent_item.removeChild(row)
         self.endRemoveRows()
 
         # TODO remove item
@@ -224,6 +593,45 @@ class AbstractDragDropModel(QAbstractItemModel):
 
         return parent_item.childCount()
 
+    def hasChildren(self, parent=QModelIndex()):
+        parent_item = self.getItem(parent)
+        if 0 < parent_item.childCount():
+            return True
+        if parent_item.canFetchMore():
+            return parent_item.childProvider().hasChildren(parent_item)
+        return False
+
+    def canFetchMore(self, parent):
+        return self.getItem(parent).canFetchMore()
+
+    def fetchMore(self, parent):
+        """
+        Creates the next block of children from the child provider of the
+        parent.  This is run by the views when the parent is expanded,
+        or scrolled to the bottom.
+
+        Args:
+            parent (QModelIndex)
+        """
+        parent_item = self.getItem(parent)
+        if not parent_item.canFetchMore():
+            return
+
+        # the provider is indexed by the number of children it has provided,
+        # and the new children are added after the existing ones
+        child_provider = parent_item.childProvider()
+        start = parent_item.childCount()
+        item_data = child_provider.fetchChildren(parent_item, parent_item.numFetched(), self.fetchChunkSize())
+        parent_item._num_fetched += len(item_data)
+        if len(item_data) < self.fetchChunkSize():
+            parent_item.setCanFetchMore(False)
+
+        new_items = self.createItems(item_data)
+        for new_item in new_items:
+            if new_item.childProvider() is None:
+                new_item.setChildProvider(child_provider)
+        self.__insertItems(start, new_items, parent_item)
+
     def columnCount(self, parent):
         """
         INPUTS: QModelIndex
@@ -246,23 +654,44 @@ class AbstractDragDropModel(QAbstractItemModel):
         item = index.internalPointer()
 
         if role == Qt.DisplayRole or role == Qt.EditRole:
-            for i in range(self.columnCount(item)):
-                if index.column() == i:
-                    try:
-                        return_val = item.columnData()[self._header_data[i]]
-                    except KeyError:
-                        return_val = None
-                    return return_val
+            # the header data is the table of column --> column data key
+            column = index.column()
+            if column < len(self._header_data):
+                return item.columnValue(self._header_data[column])
+            return None
+
+        if role in AbstractDragDropModel.CACHED_ROLES:
+            try:
+                return self._role_data[item][role]
+            except KeyError:
+                value = self.roleData(item, role)
+                self._role_data.setdefault(item, {})[role] = value
+                return value
+
+        if role == Qt.BackgroundRole:
+            return QColor(255,0,0,255)
+
+        # if role == Qt.BackgroundRole:
+        #     return None
+
+    def roleData(self, item, role):
+        """
+        Returns the value of one of the CACHED_ROLES for an item.  This is
+        only run the first time the role is displayed, and after dataChanged
+        has been emitted for the item.
 
+        Args:
+            item (AbstractDragDropModelItem)
+            role (Qt.ItemDataRole): one of the CACHED_ROLES
+
+        Returns (QVariant)
+        """
         # change style for disabled items
         if role == Qt.FontRole:
-            #font = self.font()
             font = QApplication.font()
             font.setStrikeOut(not item.isEnabled())
-            self.layoutChanged.emit()
             return font
-            #self.setFont(0, font)
-        # todo disabled item color
+
         if role == Qt.ForegroundRole:
             if item.isEnabled():
                 color = QColor(*iColor["rgba_text"])
@@ -270,14 +699,37 @@ class AbstractDragDropModel(QAbstractItemModel):
                 color = QColor(*iColor["rgba_text_disabled"])
             return color
 
-        elif role == Qt.BackgroundRole:
-            return QColor(255,0,0,255)
-
         if role == Qt.SizeHintRole:
             return QSize(self.item_width, self.item_height)
 
-        # if role == Qt.BackgroundRole:
-        #     return None
+        return None
+
+    def invalidateRoleData(self, items=None, roles=None):
+        """
+        Removes the cached values of the CACHED_ROLES.  This is run when
+        dataChanged is emitted, so normally does not need to be called directly.
+
+        Args:
+            items (list): of AbstractDragDropModelItems, by default every item
+            roles (list): of Qt.ItemDataRoles, by default every role
+        """
+        if items is None:
+            items = list(self._role_data.keys())
+
+        for item in items:
+            if roles:
+                role_data = self._role_data.get(item)
+                if role_data:
+                    for role in roles:
+                        role_data.pop(role, None)
+            else:
+                self._role_data.pop(item, None)
+
+    def __dataChangedEvent(self, top_left, bottom_right, roles=None):
+        parent_item = self.getItem(top_left.parent())
+        children = parent_item.children()
+        items = children[top_left.row():bottom_right.row() + 1]
+        self.invalidateRoleData(items=items, roles=roles)
 
     def setData(self, index, value, role=Qt.EditRole):
         """
@@ -288,6 +740,7 @@ class AbstractDragDropModel(QAbstractItemModel):
                 item = index.internalPointer()
                 arg = self._header_data[index.column()]
                 item.columnData()[arg] = value
+                self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
                 return True
         return False
 
@@ -352,6 +805,20 @@ class AbstractDragDropModel(QAbstractItemModel):
 
         return self._root_item
 
+    def getIndexFromItem(self, item, column=0):
+        """
+        Returns the index of the item provided
+
+        Args:
+            item (AbstractDragDropModelItem)
+            column (int)
+
+        Returns (QModelIndex)
+        """
+        if item is self._root_item or item.parent() is None:
+            return QModelIndex()
+        return self.createIndex(item.row(), column, item)
+
     def getItemName(self, item):
         name = item.columnData()[self._header_data[0]]
         return name
@@ -386,41 +853,262 @@ class AbstractDragDropModel(QAbstractItemModel):
         INPUTS: int, int, QModelIndex
         """
         parent_item = self.getItem(parent)
-        self.beginInsertRows(parent, position, position + num_rows - 1)
-
-        for row in range(num_rows):
-            childCount = parent_item.childCount()
-            childNode = self.createNewItem()
-            success = parent_item.insertChild(position, childNode)
+        if position < 0 or parent_item.childCount() < position:
+            return False
 
+        self.beginInsertRows(parent, position, position + num_rows - 1)
+        new_items = [self.createNewItem() for row in range(num_rows)]
+        success = parent_item.insertChildren(position, new_items)
         self.endInsertRows()
 
         return success
 
     def removeRows(self, position, num_rows, parent=QModelIndex()):
         """INPUTS: int, int, QModelIndex"""
-        # pre flight
-        if self._dropping is True:
-            self._dropping = False
-            return True
-
         # get parent
         parent_item = self.getItem(parent)
+        if position < 0 or parent_item.childCount() < position + num_rows:
+            return False
 
         # remove rows
         self.beginRemoveRows(parent, position, position + num_rows - 1)
-        for row in range(num_rows):
-            success = parent_item.removeChild(position)
+        success = parent_item.removeChildren(position, num_rows)
         self.endRemoveRows()
 
         return success
 
+    """ BULK EDITS """
+    def createItems(self, item_data):
+        """
+        Creates the items for insertItems(), without inserting them into the model
+
+        Args:
+            item_data (list | dict): see insertItems()
+
+        Returns (list): of AbstractDragDropModelItems
+        """
+        new_items = []
+        # column data
+        if isinstance(item_data, (list, tuple)):
+            for column_data in item_data:
+                new_item = self.createNewItem()
+                new_item.setColumnData(column_data)
+                new_items.append(new_item)
+
+        # tree
+        else:
+            for name, children in item_data.items():
+                new_item = self.createNewItem()
+                new_item.setColumnData({self._header_data[0]: name})
+                if children:
+                    new_item.insertChildren(0, self.createItems(children))
+                new_items.append(new_item)
+
+        return new_items
+
+    def insertItems(self, row, item_data, parent=QModelIndex()):
+        """
+        Inserts a block of new items, this only emits one set of
+        insert signals, no matter how many items are inserted.
+
+        Args:
+            row (int): row to insert the items at, if this is less than 0,
+                they are appended to the parents children
+            item_data (list | dict): of the items to create.  This can either be
+                a list of the column data (dict) of each item, or a tree of
+                {name: children}, where children is another tree, a list of
+                column data, or None.  The names are set on the first column.
+            parent (QModelIndex): index to insert the items under
+
+        Returns (list): of the new AbstractDragDropModelItems
+        """
+        parent_item = self.getItem(parent)
+        if row < 0 or parent_item.childCount() < row:
+            row = parent_item.childCount()
+
+        new_items = self.createItems(item_data)
+        self.__insertItems(row, new_items, parent_item)
+
+        return new_items
+
+    def __insertItems(self, row, new_items, parent_item):
+        if not new_items:
+            return
+        self.beginInsertRows(self.getIndexFromItem(parent_item), row, row + len(new_items) - 1)
+        parent_item.insertChildren(row, new_items)
+        self.endInsertRows()
+
+    def removeItems(self, items, event_update=False):
+        """
+        Removes the items provided.  These are removed in blocks of
+        contiguous rows, with one set of remove signals for each block.
+
+        Args:
+            items (list): of AbstractDragDropModelItems to remove.  Items under
+                another item that is being removed are removed with it.
+            event_update (bool): if the itemDeleteEvent should be run
+                for each item
+        """
+        blocks = self.getItemBlocks(self.getTopLevelItems(items))
+
+        # remove the last blocks first, so that the rows of the others do not change
+        for block in reversed(blocks):
+            if event_update:
+                for item in block:
+                    self.itemDeleteEvent(item)
+
+            parent_item = block[0].parent()
+            row = block[0].row()
+            self.beginRemoveRows(self.getIndexFromItem(parent_item), row, row + len(block) - 1)
+            parent_item.removeChildren(row, len(block))
+            self.endRemoveRows()
+
+    def moveItems(self, items, parent=QModelIndex(), row=-1):
+        """
+        Moves the items provided under a new parent.  These are moved in blocks
+        of contiguous rows, with one set of move signals for each block, so that
+        the views keep their selection/expanded state.
+
+        Args:
+            items (list): of AbstractDragDropModelItems to move, these keep the
+                order they had in the tree.  Items under another item that is
+                being moved are moved with it, and the parent and its ancestors
+                can not be moved.
+            parent (QModelIndex): index to move the items under
+            row (int): row to move the items to, if this is less than 0, they
+                are appended to the parents children
+
+        Returns (list): of the AbstractDragDropModelItems that were moved
+        """
+        parent_item = self.getItem(parent)
+        if row < 0 or parent_item.childCount() < row:
+            row = parent_item.childCount()
+
+        # remove the parent and its ancestors
+        ancestors = set()
+        ancestor = parent_item
+        while ancestor is not None:
+            ancestors.add(id(ancestor))
+            ancestor = ancestor.parent()
+        items = [item for item in self.getTopLevelItems(items) if id(item) not in ancestors]
+
+        index = 0
+        while index < len(items):
+            # get the contiguous block, this is checked as the items move, as the
+            # block can be split by items moved in before it
+            source_item = items[index].parent()
+            first = items[index].row()
+            count = 1
+            while (
+                index + count < len(items)
+                and items[index + count].parent() is source_item
+                and items[index + count].row() == first + count
+            ):
+                count += 1
+            block = items[index:index + count]
+            index += count
+
+            # already in place
+            if source_item is parent_item and first <= row <= first + count:
+                row = first + count
+                continue
+
+            is_valid = self.beginMoveRows(
+                self.getIndexFromItem(source_item), first, first + count - 1,
+                self.getIndexFromItem(parent_item), row
+            )
+            if not is_valid:
+                continue
+            source_item.removeChildren(first, count)
+            if source_item is parent_item and first < row:
+                row -= count
+            parent_item.insertChildren(row, block)
+            self.endMoveRows()
+            row += count
+
+        return items
+
+    def getTopLevelItems(self, items):
+        """
+        Returns the items that are not under any of the other items provided,
+        these are sorted into the order that they are in the tree, and the
+        root item and items that are not in the model are removed.
+
+        Args:
+            items (list): of AbstractDragDropModelItems
+
+        Returns (list): of AbstractDragDropModelItems
+        """
+        item_ids = set(id(item) for item in items)
+        top_level_items = {}
+        for item in items:
+            # get path from the root to the item
+            path = []
+            ancestor = item
+            is_top_level = True
+            while ancestor is not self._root_item:
+                if ancestor is None:
+                    is_top_level = False
+                    break
+                if ancestor is not item and id(ancestor) in item_ids:
+                    is_top_level = False
+                    break
+                path.append(ancestor.row())
+                ancestor = ancestor.parent()
+
+            if is_top_level and path:
+                top_level_items[tuple(reversed(path))] = item
+
+        return [top_level_items[path] for path in sorted(top_level_items.keys())]
+
+    @staticmethod
+    def getItemBlocks(items):
+        """
+        Splits items into blocks of contiguous rows under the same parent
+
+        Args:
+            items (list): of AbstractDragDropModelItems, in the order that they
+                are in the tree
+
+        Returns (list): of lists of AbstractDragDropModelItems
+        """
+        blocks = []
+        for item in items:
+            if blocks:
+                previous_item = blocks[-1][-1]
+                if previous_item.parent() is item.parent() and previous_item.row() + 1 == item.row():
+                    blocks[-1].append(item)
+                    continue
+            blocks.append([item])
+        return blocks
+
     def getRootItem(self):
         return self._root_item
 
     def setRootItem(self, root_item):
         self._root_item = root_item
 
+    def childProvider(self):
+        return self._root_item.childProvider()
+
+    def setChildProvider(self, child_provider):
+        """
+        Sets the provider of the children of the root item, see
+        AbstractDragDropChildProvider
+
+        Args:
+            child_provider (AbstractDragDropChildProvider)
+        """
+        self.beginResetModel()
+        self._root_item.setChildProvider(child_provider)
+        self.endResetModel()
+
+    def fetchChunkSize(self):
+        return self._fetch_chunk_size
+
+    def setFetchChunkSize(self, fetch_chunk_size):
+        self._fetch_chunk_size = max(1, fetch_chunk_size)
+
     """ PROPERTIES """
     @property
     def item_height(self):
@@ -428,7 +1116,10 @@ class AbstractDragDropModel(QAbstractItemModel):
 
     @item_height.setter
     def item_height(self, _item_height):
+        if _item_height == self._item_height:
+            return
         self._item_height = _item_height
+        self.__itemSizeChangedEvent()
 
     @property
     def item_width(self):
@@ -436,7 +1127,16 @@ class AbstractDragDropModel(QAbstractItemModel):
 
     @item_width.setter
     def item_width(self, _item_width):
+        if _item_width == self._item_width:
+            return
         self._item_width = _item_width
+        self.__itemSizeChangedEvent()
+
+    def __itemSizeChangedEvent(self):
+        # every item shares the same size, so relayout once
+        self.invalidateRoleData(roles=[Qt.SizeHintRole])
+        self.layoutAboutToBeChanged.emit()
+        self.layoutChanged.emit()
 
     """ DRAG / DROP PROPERTIES """
     def isSelectable(self):
@@ -560,34 +1260,18 @@ class AbstractDragDropModel(QAbstractItemModel):
         return mimedata
 
     def dropMimeData(self, data, action, row, column, parent):
-        # bypass remove rows
-        self._dropping = True
-
         # get parent item
         parent_item = parent.internalPointer()
         if not parent_item:
             parent_item = self.getRootItem()
 
-        # iterate through index list
-        indexes = self.indexes
-        for item in indexes:
-            # drop on item
-            if row < 0:
-                row = 0
+        # drop on item
+        if row < 0:
+            row = 0
 
-            # drop between items
-            else:
-                # apply offset if dropping below the current location (due to deletion)
-                if row > item.row():
-                    row -= 1
-
-            # remove item
-            self.deleteItem(item, event_update=False)
-
-            # insert item
-            self.beginInsertRows(parent, row, row + 1)
-            parent_item.insertChild(row, item)
-            self.endInsertRows()
+        # move items
+        indexes = self.indexes
+        self.moveItems(indexes, parent=self.getIndexFromItem(parent_item), row=row)
 
         # run virtual function
         self.dropEvent(row, indexes, parent_item)
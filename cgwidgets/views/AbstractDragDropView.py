@@ -179,10 +179,8 @@ class AbstractDragDropAbstractView(object):
         if self.model().isDeleteEnabled():
             if event.key() in [Qt.Key_Delete, Qt.Key_Backspace]:
                 indexes = self.selectionModel().selectedIndexes()
-                for index in indexes:
-                    if index.column() == 0:
-                        item = index.internalPointer()
-                        self.model().deleteItem(item, event_update=True)
+                items = [index.internalPointer() for index in indexes if index.column() == 0]
+                self.model().removeItems(items, event_update=True)
 
         # Disable Item
         if self.model().isEnableable():
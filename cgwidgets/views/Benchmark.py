@@ -0,0 +1,333 @@
+"""
+Headless benchmarks of the AbstractDragDropModel.
+
+Times the model operations that the views run for every index they resolve,
+on flat trees of NUM_ITEMS children:
+    row: AbstractDragDropModelItem.row() of every child, and of a sample
+        of the children using the linear search that row() used to run
+    parent: AbstractDragDropModel.parent() of a grandchild under each child,
+        which looks up the row of the child
+    memory: bytes per item of AbstractDragDropModelItems and TansuModelItems,
+        and of items that store their attributes/column data in dicts, as the
+        items did before they used __slots__
+
+The results are written as json, so they can be compared across commits:
+
+    python -m cgwidgets.views.Benchmark --items 100000 -o results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import qtpy
+from qtpy.QtCore import qVersion
+
+from cgwidgets.views import AbstractDragDropModel, AbstractDragDropModelItem
+from cgwidgets.widgets.TansuWidget.TansuModel import TansuModelItem
+
+
+NUM_ITEMS = 100000
+NUM_SAMPLES = 1000
+
+
+class LinearRowItem(AbstractDragDropModelItem):
+    """
+    Item that looks up its row by searching its parents children, this is
+    how row() was run before the rows were cached.
+    """
+    __slots__ = ()
+
+    def row(self):
+        if self._parent is not None:
+            return self._parent._children.index(self)
+
+
+class DictLayoutItem(object):
+    """
+    Item that stores its attributes, flags, and column data in dicts,
+    this is how the items were stored before they used __slots__.
+    """
+    def __init__(self, parent=None):
+        self._column_data = {}
+        self._children = []
+        self._parent = parent
+        self._row = None
+        self._dirty_row = None
+        self._child_provider = None
+        self._num_fetched = 0
+        self._can_fetch_more = False
+        self._delegate_widget = None
+        self._dynamicWidgetFunction = None
+        self._is_enabled = True
+        self._isSelectable = True
+        self._isDragEnabled = True
+        self._isDropEnabled = True
+        self._isEditable = True
+        if parent is not None:
+            self._row = len(parent._children)
+            parent._children.append(self)
+
+    def setColumnData(self, _column_data):
+        self._column_data = _column_data
+
+
+class ModelBenchmark(object):
+    """
+    Args:
+        num_items (int): number of children in each of the flat trees
+        num_samples (int): number of children whose rows are looked up with
+            a linear search
+        repeat (int): number of times each stage is run
+        log (function): called with a message for each stage
+
+    Attributes:
+        results (dict): of stage name (str) to timings (dict) in seconds
+    """
+    STAGES = ['row', 'parent', 'memory']
+
+    def __init__(self, num_items=NUM_ITEMS, num_samples=NUM_SAMPLES, repeat=3, log=None):
+        self._num_items = num_items
+        self._num_samples = min(num_samples, num_items)
+        self._repeat = repeat
+        self._log = log
+        self._results = {}
+
+    """ API """
+    def run(self, stages=None):
+        """
+        Runs the stages provided
+
+        Args:
+            stages (list): of stage names (str) in STAGES, by default all of them
+
+        Returns (dict): results, see getResults()
+        """
+        if stages is None:
+            stages = ModelBenchmark.STAGES
+        for stage in stages:
+            getattr(self, 'bench' + stage.capitalize())()
+        return self.getResults()
+
+    def getResults(self):
+        """
+        Returns (dict): of the 'metadata' of the run, and the 'results' of each stage
+        """
+        return {
+            'metadata': self.getMetadata(),
+            'results': self._results
+        }
+
+    def time(self, name, function, setup=None, num_calls=1, **extra):
+        """
+        Runs the function provided repeat times, and records how long it took
+
+        Args:
+            name (str): name of the result
+            function (function): that is timed
+            setup (function): run before each call, this is not timed
+            num_calls (int): number of calls made by the function, this is
+                used to record the time per call
+            extra: any other values to record with the result
+
+        Returns (dict): result
+        """
+        runs = []
+        for index in range(self._repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            function()
+            runs.append(time.perf_counter() - start)
+
+        result = {
+            'runs': runs,
+            'min': min(runs),
+            'median': statistics.median(runs),
+            'mean': statistics.mean(runs),
+            'num_calls': num_calls,
+            'per_call': min(runs) / num_calls
+        }
+        result.update(extra)
+        self._results[name] = result
+        if self._log:
+            self._log('{name:<24} min {min:9.4f}s  per call {per_call:.3e}s'.format(name=name, **result))
+        return result
+
+    """ UTILS """
+    def createTree(self, item_type, depth=1):
+        """
+        Creates a flat tree of num_items children
+
+        Args:
+            item_type (AbstractDragDropModelItem): type of item to create
+            depth (int): levels of items under the root, each item below
+                the first level has one child
+
+        Returns (AbstractDragDropModel)
+        """
+        root_item = item_type()
+        root_item.setColumnData({'name': 'root'})
+        for index in range(self._num_items):
+            item = item_type(parent=root_item)
+            item.setColumnData({'name': 'item{index}'.format(index=index)})
+            for level in range(1, depth):
+                item = item_type(parent=item)
+                item.setColumnData({'name': 'child{index}'.format(index=index)})
+
+        model = AbstractDragDropModel(root_item=root_item)
+        model.setItemType(item_type)
+        return model
+
+    def getSample(self, children):
+        """
+        Returns (list): of num_samples children spread evenly through the children
+        """
+        step = max(1, len(children) // self._num_samples)
+        return children[::step][:self._num_samples]
+
+    def getMetadata(self):
+        try:
+            commit = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.DEVNULL
+            ).decode('utf-8').strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'num_items': self._num_items,
+            'num_samples': self._num_samples,
+            'repeat': self._repeat,
+            'python': platform.python_version(),
+            'qt_api': qtpy.API,
+            'qt_version': qVersion(),
+            'platform': platform.platform()
+        }
+
+    """ STAGES """
+    def benchRow(self):
+        # linear search
+        children = self.createTree(LinearRowItem).getRootItem().children()
+        sample = self.getSample(children)
+
+        def linearRows():
+            for item in sample:
+                item.row()
+
+        result = self.time('row_linear', linearRows, num_calls=len(sample))
+        result['estimate_all'] = result['per_call'] * len(children)
+
+        # cached
+        children = self.createTree(AbstractDragDropModelItem).getRootItem().children()
+
+        def cachedRows():
+            for item in children:
+                item.row()
+
+        self.time('row_cached', cachedRows, num_calls=len(children))
+
+        # cached, after inserting at the top, which renumbers every child
+        model = self.createTree(AbstractDragDropModelItem)
+        root_item = model.getRootItem()
+        children = root_item.children()
+
+        def insert():
+            root_item.insertChild(0, AbstractDragDropModelItem())
+
+        self.time('row_cached_insert', cachedRows, setup=insert, num_calls=len(children))
+
+    def benchParent(self):
+        for name, item_type in (('parent_linear', LinearRowItem), ('parent_cached', AbstractDragDropModelItem)):
+            model = self.createTree(item_type, depth=2)
+            children = model.getRootItem().children()
+            if item_type is LinearRowItem:
+                children = self.getSample(children)
+
+            # indexes of the grandchildren
+            indexes = [model.createIndex(0, 0, item.child(0)) for item in children]
+
+            def resolve():
+                for index in indexes:
+                    model.parent(index)
+
+            result = self.time(name, resolve, num_calls=len(indexes))
+            result['estimate_all'] = result['per_call'] * self._num_items
+
+    def benchMemory(self):
+        # the column values are created first, so that only the items are measured
+        column_data = [
+            {'name': 'item{index}'.format(index=index), 'value': index}
+            for index in range(self._num_items)
+        ]
+
+        for name, item_type in (
+            ('memory_dict_layout', DictLayoutItem),
+            ('memory_slots_layout', AbstractDragDropModelItem),
+            ('memory_tansu_item', TansuModelItem)
+        ):
+            gc.collect()
+            tracemalloc.start()
+            start = tracemalloc.get_traced_memory()[0]
+            root_item = item_type()
+            for item_data in column_data:
+                item = item_type(parent=root_item)
+                item.setColumnData(dict(item_data) if item_type is DictLayoutItem else item_data)
+            size = tracemalloc.get_traced_memory()[0] - start
+            tracemalloc.stop()
+
+            result = {
+                'bytes': size,
+                'num_items': self._num_items,
+                'bytes_per_item': size / self._num_items
+            }
+            self._results[name] = result
+            if self._log:
+                self._log('{name:<24} {bytes_per_item:9.1f} bytes per item'.format(name=name, **result))
+            del root_item, item
+
+    """ PROPERTIES """
+    @property
+    def results(self):
+        return self._results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the AbstractDragDropModel')
+    parser.add_argument('-o', '--output', help='path to write the json results to, defaults to stdout')
+    parser.add_argument('--items', type=int, default=NUM_ITEMS, help='number of children in each tree')
+    parser.add_argument('--samples', type=int, default=NUM_SAMPLES, help='children timed with a linear search')
+    parser.add_argument('--repeat', type=int, default=3, help='number of times each stage is run')
+    parser.add_argument(
+        '--stages', nargs='+', choices=ModelBenchmark.STAGES, help='stages to run, defaults to all'
+    )
+    args = parser.parse_args(argv)
+
+    benchmark = ModelBenchmark(
+        num_items=args.items,
+        num_samples=args.samples,
+        repeat=args.repeat,
+        log=lambda message: print(message, file=sys.stderr)
+    )
+    results = benchmark.run(stages=args.stages)
+
+    output = json.dumps(results, indent=4, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
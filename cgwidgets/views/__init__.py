@@ -1,5 +1,6 @@
 from .AbstractDragDropModel import AbstractDragDropModelItem
 from .AbstractDragDropModel import AbstractDragDropModel
+from .AbstractDragDropModel import AbstractDragDropChildProvider
 
 from .AbstractDragDropView import AbstractDragDropListView
 from .AbstractDragDropView import AbstractDragDropTreeView
@@ -0,0 +1,208 @@
+import unittest
+import sys
+
+from qtpy.QtWidgets import QApplication
+from qtpy.QtTest import QAbstractItemModelTester
+from qtpy.QtCore import QModelIndex, QtWarningMsg, qInstallMessageHandler
+
+from cgwidgets.views.AbstractDragDropModel import AbstractDragDropModel, AbstractDragDropChildProvider
+
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+class ListProvider(AbstractDragDropChildProvider):
+    """
+    Provides the children named in the names list to the item named
+    parent_name, the children it creates do not have any children.
+    """
+    def __init__(self, names, parent_name='root'):
+        self.names = names
+        self.parent_name = parent_name
+        self.requests = []
+
+    def hasChildren(self, item):
+        return item.columnData()['name'] == self.parent_name
+
+    def fetchChildren(self, item, start, count):
+        if not self.hasChildren(item):
+            return []
+        self.requests.append((start, count))
+        return [{'name': name} for name in self.names[start:start + count]]
+
+
+def getNames(model, parent=QModelIndex()):
+    item = model.getItem(parent)
+    return [child.columnData()['name'] for child in item.children()]
+
+
+def getItem(model, *names):
+    """
+    Returns the item at the path of names provided
+    """
+    item = model.getRootItem()
+    for name in names:
+        item = [child for child in item.children() if child.columnData()['name'] == name][0]
+    return item
+
+
+def getTree(model, item=None):
+    """
+    Returns (dict): of the names of the items under the item provided,
+        in the same format as the trees provided to insertItems()
+    """
+    if item is None:
+        item = model.getRootItem()
+    return {
+        child.columnData()['name']: getTree(model, child) if child.childCount() else None
+        for child in item.children()
+    }
+
+
+class TestModel(unittest.TestCase):
+    """
+    The model is checked by a QAbstractItemModelTester while it is edited,
+    and any problem that it reports fails the test.
+    """
+    TREE = {
+        'a': {'a0': None, 'a1': None, 'a2': {'a2x': None}},
+        'b': {'b0': None, 'b1': None},
+        'c': None
+    }
+
+    def setUp(self):
+        self.model = AbstractDragDropModel()
+        self.model.insertItems(0, TestModel.TREE)
+        self.warnings = []
+        self.message_handler = qInstallMessageHandler(self.__messageHandler)
+        self.tester = QAbstractItemModelTester(
+            self.model, QAbstractItemModelTester.FailureReportingMode.Warning
+        )
+
+    def tearDown(self):
+        qInstallMessageHandler(self.message_handler)
+        self.assertEqual(self.warnings, [])
+
+    def __messageHandler(self, message_type, context, message):
+        # the root is enabled, so that items can be dropped onto the
+        # viewport, the tester expects it to only be drop enabled
+        if 'flags == Qt::ItemIsDropEnabled' in message:
+            return
+        if message_type >= QtWarningMsg:
+            self.warnings.append(message)
+
+    def getIndex(self, *names):
+        return self.model.getIndexFromItem(getItem(self.model, *names))
+
+    def test_insertItems(self):
+        self.assertEqual(getTree(self.model), TestModel.TREE)
+        new_items = self.model.insertItems(
+            1, {'x': {'x0': [{'name': 'x00'}]}, 'y': None}, parent=self.getIndex('a')
+        )
+        self.assertEqual([item.columnData()['name'] for item in new_items], ['x', 'y'])
+        self.assertEqual(getNames(self.model, self.getIndex('a')), ['a0', 'x', 'y', 'a1', 'a2'])
+        self.assertEqual(getTree(self.model, getItem(self.model, 'a', 'x')), {'x0': {'x00': None}})
+        self.assertEqual(self.model.rowCount(self.getIndex('a', 'x', 'x0')), 1)
+
+    def test_moveItemsWithinParent(self):
+        a0, a1, a2 = getItem(self.model, 'a').children()
+        moved = self.model.moveItems([a2, a0], self.getIndex('a'), 0)
+        self.assertEqual(moved, [a0, a2])
+        self.assertEqual(getNames(self.model, self.getIndex('a')), ['a0', 'a2', 'a1'])
+
+        self.model.moveItems([a0], self.getIndex('a'), -1)
+        self.assertEqual(getNames(self.model, self.getIndex('a')), ['a2', 'a1', 'a0'])
+        self.assertEqual([item.row() for item in (a2, a1, a0)], [0, 1, 2])
+
+    def test_moveItemsAcrossParents(self):
+        a0 = getItem(self.model, 'a', 'a0')
+        a2 = getItem(self.model, 'a', 'a2')
+        b1 = getItem(self.model, 'b', 'b1')
+        self.model.moveItems([b1, a2, a0], self.getIndex('b'), 0)
+        self.assertEqual(getNames(self.model, self.getIndex('a')), ['a1'])
+        self.assertEqual(getNames(self.model, self.getIndex('b')), ['a0', 'a2', 'b1', 'b0'])
+        self.assertEqual(getTree(self.model, a2), {'a2x': None})
+        self.assertIs(a2.parent(), getItem(self.model, 'b'))
+
+    def test_moveItemsUnderThemselves(self):
+        # an item can not be moved under itself, but its children are moved with it
+        a = getItem(self.model, 'a')
+        self.model.moveItems([a, getItem(self.model, 'a', 'a2')], self.getIndex('a', 'a2'))
+        self.assertEqual(getTree(self.model), TestModel.TREE)
+
+        self.model.moveItems([a, getItem(self.model, 'a', 'a1')], self.getIndex('c'))
+        self.assertEqual(getNames(self.model), ['b', 'c'])
+        self.assertEqual(getTree(self.model, getItem(self.model, 'c')), {'a': TestModel.TREE['a']})
+
+    def test_removeItems(self):
+        self.model.removeItems([getItem(self.model, 'a', 'a0'), getItem(self.model, 'a', 'a2')])
+        self.assertEqual(getNames(self.model, self.getIndex('a')), ['a1'])
+
+    def test_removeNestedItems(self):
+        # the children of items that are removed are removed with them
+        items = [
+            getItem(self.model, 'a', 'a2', 'a2x'),
+            getItem(self.model, 'a'),
+            getItem(self.model, 'a', 'a1'),
+            getItem(self.model, 'b', 'b0'),
+            getItem(self.model, 'c')
+        ]
+        self.model.removeItems(items)
+        self.assertEqual(getTree(self.model), {'b': {'b1': None}})
+
+
+class TestFetchMore(unittest.TestCase):
+    """
+    The child provider is indexed by the number of children it has
+    provided, not the number of children the parent currently has.
+    """
+    NAMES = ['c{index}'.format(index=index) for index in range(6)]
+
+    def setUp(self):
+        self.provider = ListProvider(TestFetchMore.NAMES)
+        self.model = AbstractDragDropModel()
+        self.model.setFetchChunkSize(2)
+        self.model.setChildProvider(self.provider)
+
+    def test_fetchMore(self):
+        while self.model.canFetchMore(QModelIndex()):
+            self.model.fetchMore(QModelIndex())
+        self.assertEqual(getNames(self.model), ['c0', 'c1', 'c2', 'c3', 'c4', 'c5'])
+        self.assertEqual(self.provider.requests, [(0, 2), (2, 2), (4, 2), (6, 2)])
+
+    def test_removeThenFetch(self):
+        self.model.fetchMore(QModelIndex())
+        self.model.removeItems([self.model.getRootItem().child(0)])
+        self.model.fetchMore(QModelIndex())
+        self.assertEqual(getNames(self.model), ['c1', 'c2', 'c3'])
+
+    def test_insertThenFetch(self):
+        self.model.fetchMore(QModelIndex())
+        self.model.insertItems(0, [{'name': 'new'}])
+        self.model.fetchMore(QModelIndex())
+        self.assertEqual(getNames(self.model), ['new', 'c0', 'c1', 'c2', 'c3'])
+
+    def test_moveThenFetch(self):
+        # move an item onto a parent that has not been fetched from yet
+        model = AbstractDragDropModel()
+        model.setFetchChunkSize(2)
+        moved_item, lazy_item = model.insertItems(0, {'moved': None, 'lazy': None})
+        lazy_item.setChildProvider(ListProvider(TestFetchMore.NAMES, parent_name='lazy'))
+        lazy_index = model.getIndexFromItem(lazy_item)
+        model.moveItems([moved_item], lazy_index)
+        self.assertTrue(model.canFetchMore(lazy_index))
+        model.fetchMore(lazy_index)
+        self.assertEqual(getNames(model, lazy_index), ['moved', 'c0', 'c1'])
+
+    def test_moveWithinThenFetch(self):
+        self.model.fetchMore(QModelIndex())
+        self.model.insertItems(-1, {'parent': None})
+        parent_item = self.model.getRootItem().child(2)
+        self.model.moveItems([self.model.getRootItem().child(0)], self.model.getIndexFromItem(parent_item))
+        self.model.fetchMore(QModelIndex())
+        self.assertEqual(getNames(self.model), ['c1', 'parent', 'c2', 'c3'])
+        self.assertEqual(getNames(self.model, self.model.getIndexFromItem(parent_item)), ['c0'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,565 @@
+"""
+Per directory thumbnail atlases.
+
+Displaying a directory of a couple thousand assets means opening a couple
+thousand images before the grid is complete, and on network storage the
+latency of each open is what takes the time.  An atlas packs the default
+thumbnail of every asset in a library directory into a few large images
+(pages), with a table of where each asset is stored.  The views then read
+one page per few hundred assets, and slice the thumbnails out of it, and
+only fall back to reading the individual proxies for assets that are not
+in the atlas.
+
+The atlases are written to ATLAS_DIR (rather than the library directories,
+so that they are not parsed as assets), as
+    <key>.json: the table
+        {
+            'version': <int>,
+            'directory': <str> library directory,
+            'cell_size': <int> size of each thumbnail,
+            'columns': <int> number of cells in each row of a page,
+            'generation': <int> build the pages were written by,
+            'pages': <list> of <str> names of the page images,
+            'entries': {
+                <json filepath>: {
+                    'image': <str> path to the image the thumbnail is of,
+                    'mtime': <int> mtime of the image when it was packed,
+                    'page': <int>, 'x': <int>, 'y': <int>,
+                    'w': <int>, 'h': <int>
+                }
+            }
+        }
+    <key>.<generation>.<page>.jpg: the pages
+
+Atlases are rebuilt incrementally, thumbnails that have not changed are
+copied from the old pages rather than decoded again.  Each build writes its
+pages under a new generation, so the pages of the table a view is still
+displaying are never overwritten.  The old generation is removed once
+the AtlasCache has dropped the old table.  They can be built
+for an existing library with
+    python -m cgwidgets.widgets.LibraryWidget.Atlas /path/to/library
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from qtpy.QtCore import *
+from qtpy.QtGui import *
+
+from .__utils__ import iUtils
+from .Record import AssetRecord
+from .ThumbnailCache import ThumbnailCache
+
+
+class ThumbnailAtlas(object):
+    """
+    Atlas of a single library directory
+    @directory: <str> path to the library directory
+    @atlas_dir: <str> path to the directory the atlases are stored in
+    @table: <dict> offset table, or None if there is no atlas
+    """
+    VERSION = 1
+
+    def __init__(self, directory, atlas_dir=None):
+        if atlas_dir is None:
+            atlas_dir = ThumbnailAtlas.getDefaultAtlasDir()
+        self._directory = directory
+        self._atlas_dir = atlas_dir
+        self._table = None
+        self._pages = {}
+        self._stale_pages = []
+
+    @staticmethod
+    def getDefaultAtlasDir():
+        atlas_dir = iUtils.getSetting('ATLAS_DIR')
+        if atlas_dir:
+            return atlas_dir
+        return os.environ['HOME'] + '/.library/atlas'
+
+    """ API """
+
+    def load(self):
+        """
+        Reads the offset table of this atlas
+        @return: <bool> True if there is a valid atlas
+        """
+        self._pages = {}
+        try:
+            with open(self.getTablePath(), 'r') as f:
+                table = json.load(f)
+        except (OSError, ValueError):
+            self._table = None
+            return False
+        if table.get('version') != ThumbnailAtlas.VERSION or table.get('directory') != self._directory:
+            self._table = None
+            return False
+        self._table = table
+        return True
+
+    def getEntry(self, filepath):
+        """
+        @filepath: <str> path to json file
+        @return: <dict> entry of the asset, or None
+        """
+        if self._table is None:
+            return None
+        return self._table['entries'].get(filepath)
+
+    def getImage(self, filepath, image_path=None):
+        """
+        Slices the thumbnail of the asset out of its page.
+        @filepath: <str> path to json file
+        @image_path: <str> if provided, the thumbnail is only returned if
+            it was packed from this image
+        @return: <QImage> or None if it is not in the atlas
+        """
+        entry = self.getEntry(filepath)
+        if entry is None:
+            return None
+        if image_path is not None and entry['image'] != image_path:
+            return None
+        page = self.getPage(entry['page'])
+        if page is None or page.isNull():
+            return None
+        return page.copy(entry['x'], entry['y'], entry['w'], entry['h'])
+
+    def getPage(self, page_index):
+        """
+        @return: <QImage> page, this is only read from disk once
+        """
+        try:
+            return self._pages[page_index]
+        except KeyError:
+            pass
+        try:
+            page_name = self._table['pages'][page_index]
+        except (IndexError, TypeError):
+            return None
+        page = QImage('/'.join([self._atlas_dir, page_name]))
+        self._pages[page_index] = page
+        return page
+
+    def releasePages(self):
+        """
+        Frees the decoded pages, the thumbnails sliced from them are
+        held by the ThumbnailCache
+        """
+        self._pages = {}
+
+    def removeStalePages(self):
+        """
+        Deletes the pages of the generation that the last build replaced.
+        This should only be called once nothing is displaying the old
+        table, as its thumbnails are sliced out of these pages.
+        """
+        for page_name in self._stale_pages:
+            try:
+                os.remove('/'.join([self._atlas_dir, page_name]))
+            except OSError:
+                pass
+        self._stale_pages = []
+
+    """ BUILD """
+
+    def build(self, records=None, cell_size=None, page_size=None, quality=None):
+        """
+        Packs the default image of every asset in the directory.  Assets
+        whose default image has not changed since the last build are
+        copied from the old atlas, only new/changed assets are decoded.
+        This is safe to call from a worker thread.
+        @records: <list> of <AssetRecord> assets in the directory, if not
+            provided the json files in the directory are parsed
+        @cell_size: <int> size of each thumbnail
+        @page_size: <int> number of cells in each row/column of a page
+        @return: <dict> of the number of 'copied', 'decoded', and
+            'removed' thumbnails
+        """
+        if cell_size is None:
+            cell_size = iUtils.getSetting('ATLAS_CELL_SIZE')
+        if page_size is None:
+            page_size = iUtils.getSetting('ATLAS_PAGE_SIZE')
+        if quality is None:
+            quality = iUtils.getSetting('ATLAS_QUALITY')
+        if records is None:
+            records = ThumbnailAtlas.loadRecords(self._directory)
+
+        # old atlas
+        self.load()
+        old_table = self._table
+        if self._table and self._table.get('cell_size') != cell_size:
+            self._table = None
+        old_entries = dict(self._table['entries']) if self._table else {}
+
+        # gather thumbnails
+        stats = {'copied': 0, 'decoded': 0, 'removed': 0}
+        thumbnails = []
+        for record in sorted(records, key=lambda record: record.filepath):
+            image_path = record.default_image
+            if not image_path:
+                continue
+            mtime = ThumbnailCache.getMTime(image_path)
+            old_entry = old_entries.pop(record.filepath, None)
+            image = None
+            if old_entry and old_entry['image'] == image_path and old_entry['mtime'] == mtime:
+                image = self.getImage(record.filepath)
+                if image is not None:
+                    stats['copied'] += 1
+            if image is None:
+                image = ThumbnailCache.decodeImage(
+                    record.getDisplayPath(image_path, cell_size), cell_size
+                )
+                if image.isNull():
+                    continue
+                if image.height() > cell_size:
+                    image = image.scaledToHeight(cell_size, Qt.SmoothTransformation)
+                stats['decoded'] += 1
+            thumbnails.append((record.filepath, image_path, mtime, image))
+        stats['removed'] = len(old_entries)
+
+        # nothing changed
+        is_packed = self._table and self._table.get('columns') == page_size
+        if is_packed and stats['decoded'] == 0 and stats['removed'] == 0:
+            self.releasePages()
+            return stats
+
+        self.write(thumbnails, cell_size, page_size, quality)
+        self.releasePages()
+        if old_table:
+            self._stale_pages = [
+                page_name for page_name in old_table.get('pages', [])
+                if page_name not in self._table['pages']
+            ]
+        return stats
+
+    def write(self, thumbnails, cell_size, page_size, quality):
+        """
+        @thumbnails: <list> of <tuple> (filepath, image_path, mtime, QImage)
+        """
+        if not os.path.isdir(self._atlas_dir):
+            os.makedirs(self._atlas_dir)
+
+        key = self.getKey()
+        # new pages never replace the pages of the old table
+        generation = int(time.time() * 1000)
+        if self._table:
+            generation = max(generation, self.generation + 1)
+        cells_per_page = page_size * page_size
+        pages = []
+        entries = {}
+        for page_index, first in enumerate(range(0, len(thumbnails), cells_per_page)):
+            page_thumbnails = thumbnails[first:first + cells_per_page]
+            num_rows = (len(page_thumbnails) + page_size - 1) // page_size
+            num_columns = min(page_size, len(page_thumbnails))
+            page = QImage(num_columns * cell_size, num_rows * cell_size, QImage.Format_RGB32)
+            page.fill(QColor(0, 0, 0))
+            painter = QPainter(page)
+            for cell, (filepath, image_path, mtime, image) in enumerate(page_thumbnails):
+                x = (cell % page_size) * cell_size
+                y = (cell // page_size) * cell_size
+                painter.drawImage(x, y, image)
+                entries[filepath] = {
+                    'image': image_path,
+                    'mtime': mtime,
+                    'page': page_index,
+                    'x': x,
+                    'y': y,
+                    'w': image.width(),
+                    'h': image.height()
+                }
+            painter.end()
+
+            page_name = '{key}.{generation}.{page}.jpg'.format(
+                key=key, generation=generation, page=page_index
+            )
+            temp_path = '/'.join([self._atlas_dir, page_name + '.tmp'])
+            page.save(temp_path, 'jpg', quality)
+            os.replace(temp_path, '/'.join([self._atlas_dir, page_name]))
+            pages.append(page_name)
+
+        table = {
+            'version': ThumbnailAtlas.VERSION,
+            'directory': self._directory,
+            'cell_size': cell_size,
+            'columns': page_size,
+            'generation': generation,
+            'pages': pages,
+            'entries': entries
+        }
+        temp_path = self.getTablePath() + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(table, f, separators=(',', ':'))
+        os.replace(temp_path, self.getTablePath())
+
+        self._table = table
+        self._pages = {}
+
+    @staticmethod
+    def loadRecords(directory):
+        """
+        @return: <list> of <AssetRecord> of the json files in the directory
+        """
+        records = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return records
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    continue
+            except OSError:
+                continue
+            record = AssetRecord.load('/'.join([directory, entry.name]))
+            if record is not None:
+                records.append(record)
+        return records
+
+    """ UTILS """
+
+    def getKey(self):
+        return hashlib.sha1(self._directory.encode('utf-8')).hexdigest()[:16]
+
+    def getTablePath(self):
+        return '/'.join([self._atlas_dir, self.getKey() + '.json'])
+
+    """ PROPERTIES """
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def table(self):
+        return self._table
+
+    @property
+    def cell_size(self):
+        if self._table is None:
+            return None
+        return self._table['cell_size']
+
+    @property
+    def generation(self):
+        if self._table is None:
+            return None
+        return self._table.get('generation', 0)
+
+    @property
+    def stale_pages(self):
+        """
+        <list> of <str> names of the pages the last build replaced
+        """
+        return self._stale_pages
+
+
+class AtlasCache(QObject):
+    """
+    Atlases of all of the directories that have been displayed, this is
+    what the image widgets use to look up their thumbnails.  Directories
+    without an atlas are built in the background (if ATLAS_AUTO_BUILD
+    is enabled), and are used the next time they are displayed.
+
+    atlasBuilt is emitted with the directory, and the <ThumbnailAtlas>
+    that was built, or None if the build failed.
+
+    @hits: <int> number of thumbnails sliced from an atlas
+    @misses: <int> number of thumbnails that were not in an atlas
+    """
+    atlasBuilt = Signal(str, object)
+
+    _instance = None
+
+    def __init__(self, parent=None, atlas_dir=None, auto_build=None):
+        super(AtlasCache, self).__init__(parent)
+        if auto_build is None:
+            auto_build = iUtils.getSetting('ATLAS_AUTO_BUILD')
+        self._atlas_dir = atlas_dir
+        self._auto_build = auto_build
+        self._atlases = {}
+        self._building = set()
+        self._rebuild = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self.resetStats()
+
+        self.atlasBuilt.connect(self.__atlasBuilt)
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the atlases shared by all of the widgets in this process
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    """ API """
+
+    def getAtlas(self, directory):
+        """
+        @directory: <str> path to library directory
+        @return: <ThumbnailAtlas> the table is only read the first time
+        """
+        try:
+            return self._atlases[directory]
+        except KeyError:
+            atlas = ThumbnailAtlas(directory, atlas_dir=self._atlas_dir)
+            if not atlas.load() and self._auto_build:
+                self.requestBuild(directory)
+            self._atlases[directory] = atlas
+            return atlas
+
+    def pixmap(self, record, image_path, width):
+        """
+        @record: <AssetRecord>
+        @image_path: <str> path to the image that is being displayed
+        @width: <int> width it is displayed at
+        @return: <QPixmap> sliced from the atlas of the records directory,
+            or None if it is not in the atlas, or is stored smaller than
+            the width provided
+        """
+        filepath = record.filepath
+        if not filepath or not image_path:
+            return None
+        atlas = self.getAtlas(os.path.dirname(filepath))
+        entry = atlas.getEntry(filepath)
+        if entry is None or entry['image'] != image_path or width > entry['w']:
+            self._misses += 1
+            return None
+
+        # the thumbnails of a rebuilt atlas are cached separately
+        thumbnail_cache = ThumbnailCache.instance()
+        key = ThumbnailCache.getKey(
+            '/'.join([atlas.getTablePath(), str(atlas.generation), filepath]),
+            width,
+            mtime=entry['mtime'] or 0
+        )
+        pixmap = thumbnail_cache.get(key)
+        if pixmap is None:
+            image = atlas.getImage(filepath, image_path)
+            if image is None:
+                self._misses += 1
+                return None
+            if image.width() > width:
+                image = image.scaledToWidth(width, Qt.SmoothTransformation)
+            pixmap = thumbnail_cache.insert(key, image)
+        self._hits += 1
+        return pixmap
+
+    def requestBuild(self, directory):
+        """
+        (Re)builds the atlas of the directory provided in the background
+        @directory: <str> path to library directory
+        """
+        if directory in self._building:
+            self._rebuild.add(directory)
+            return
+        self._building.add(directory)
+        self._pool.start(AtlasBuildTask(self, directory, atlas_dir=self._atlas_dir))
+
+    def invalidate(self, directory):
+        self._atlases.pop(directory, None)
+
+    def releasePages(self):
+        """
+        Frees the pages of all of the atlases, this is called once the
+        views have finished creating their widgets
+        """
+        for atlas in self._atlases.values():
+            atlas.releasePages()
+
+    def waitForDone(self, msecs=-1):
+        self._pool.waitForDone(msecs)
+        QCoreApplication.processEvents()
+
+    """ STATS """
+
+    def stats(self):
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'count': len(self._atlases)
+        }
+
+    def resetStats(self):
+        self._hits = 0
+        self._misses = 0
+
+    """ EVENTS """
+
+    def __atlasBuilt(self, directory, atlas):
+        # the old table is no longer displayed, so its pages can go
+        self._building.discard(directory)
+        self._atlases.pop(directory, None)
+        if atlas is not None:
+            atlas.removeStalePages()
+        if directory in self._rebuild:
+            self._rebuild.discard(directory)
+            self.requestBuild(directory)
+
+
+class AtlasBuildTask(QRunnable):
+    """
+    Builds the atlas of a single directory
+    @cache: <AtlasCache>
+    @directory: <str> path to library directory
+    """
+    def __init__(self, cache, directory, atlas_dir=None):
+        super(AtlasBuildTask, self).__init__()
+        self.cache = cache
+        self.directory = directory
+        self.atlas_dir = atlas_dir
+
+    def run(self):
+        atlas = ThumbnailAtlas(self.directory, atlas_dir=self.atlas_dir)
+        try:
+            atlas.build()
+        except OSError:
+            atlas = None
+        try:
+            self.cache.atlasBuilt.emit(self.directory, atlas)
+        except RuntimeError:
+            pass
+
+
+def buildLibrary(library_dir, atlas_dir=None, log=print):
+    """
+    Builds the atlas of every directory in the library
+    @library_dir: <str> path to the library
+    @return: <int> number of directories built
+    """
+    num_built = 0
+    for root, dirs, files in os.walk(library_dir):
+        dirs.sort()
+        records = ThumbnailAtlas.loadRecords(root)
+        if not records:
+            continue
+        atlas = ThumbnailAtlas(root, atlas_dir=atlas_dir)
+        stats = atlas.build(records=records)
+        atlas.removeStalePages()
+        num_built += 1
+        log('{directory} {stats}'.format(directory=root, stats=stats))
+    return num_built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Builds the thumbnail atlas of every directory in a library'
+    )
+    parser.add_argument('library_dir', nargs='+', help='path to the library')
+    parser.add_argument('--atlas-dir', help='where to write the atlases, defaults to ATLAS_DIR')
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    num_built = 0
+    for library_dir in args.library_dir:
+        num_built += buildLibrary(library_dir, atlas_dir=args.atlas_dir)
+    print('built {num} atlases'.format(num=num_built))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
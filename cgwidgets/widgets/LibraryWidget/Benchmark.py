@@ -0,0 +1,347 @@
+"""
+Headless benchmarks of the Library.
+
+Times each of the stages that the user waits on when browsing a library:
+    dirlist_populate: creating the DirList, and listing every directory
+    model_loader_cold: loading every row with the ImageListLoader, with
+        the ShardCache cleared
+    model_loader_warm: the same, with the ShardCache populated
+    model_index: loading every row from the LibraryIndex
+    search: populateHideList for each of the SEARCH_QUERIES
+    view_<mode>: building each of the view modes, with the
+        ThumbnailCache cleared
+    resize_relayout: resizing the Thumbnail view through RESIZE_WIDTHS
+    scrub_step: stepping through the frames of an image
+
+The Library is run with QT_QPA_PLATFORM=offscreen, and (unless --home is
+provided) with a temporary $HOME, so that the users settings, index, and
+caches do not change the results.  The results are written as json, so
+they can be compared across commits:
+
+    python -m cgwidgets.widgets.LibraryWidget.Synthetic /tmp/synthetic
+    python -m cgwidgets.widgets.LibraryWidget.Benchmark /tmp/synthetic/library -o results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import qtpy
+from qtpy.QtCore import *
+from qtpy.QtWidgets import *
+
+from .__utils__ import iUtils
+from .LibraryWidget import DirList, FullScreenImageItem, LibraryWidget
+from .ShardCache import ShardCache
+from .ThumbnailCache import ThumbnailCache
+from .Views import ImageListModel
+
+
+SEARCH_QUERIES = [
+    'name{asset_0000}',
+    'name{asset_00.*1}',
+    'type{shader}',
+    'note{wet, glossy}',
+    'name{does_not_exist}'
+]
+VIEW_MODES = ['List', 'Detailed', 'Table', 'Thumbnail', 'Icon']
+RESIZE_WIDTHS = [400, 640, 800, 1024, 1280, 1600, 1280, 1024, 800, 640]
+
+
+class LibraryBenchmark(object):
+    """
+    @library_dir: <str> path to the library that is benchmarked
+    @repeat: <int> number of times each stage is run
+    @scrub_steps: <int> number of frames stepped through by scrub_step
+    @log: <function> called with a message for each stage
+    @results: <dict> of <str> stage name to <dict> of the timings
+        in seconds
+    """
+    STAGES = ['dirlist', 'model', 'search', 'views', 'resize', 'scrub']
+
+    def __init__(self, library_dir, repeat=3, scrub_steps=200, log=None):
+        self._library_dir = library_dir.rstrip('/')
+        self._repeat = repeat
+        self._scrub_steps = scrub_steps
+        self._log = log
+        self._results = {}
+        self._app = None
+        self._main_widget = None
+        self._model = None
+
+    """ API """
+
+    def run(self, stages=None):
+        """
+        Runs the stages provided
+        @stages: <list> of <str> names in STAGES, defaults to all of them
+        @return: <dict> results, see getResults()
+        """
+        self._app = QApplication.instance() or QApplication(sys.argv[:1])
+
+        if stages is None:
+            stages = LibraryBenchmark.STAGES
+        for stage in stages:
+            getattr(self, 'bench' + stage.capitalize())()
+        return self.getResults()
+
+    def getResults(self):
+        """
+        @return: <dict> of the 'metadata' of the run, and the 'results'
+            of each stage
+        """
+        return {
+            'metadata': self.getMetadata(),
+            'results': self._results
+        }
+
+    def time(self, name, function, setup=None, **extra):
+        """
+        Runs the function provided repeat times, and records how long it took
+        @name: <str> name of the result
+        @function: <function> that is timed
+        @setup: <function> run before each call, this is not timed
+        @extra: any other values to record with the result
+        @return: <dict> result
+        """
+        runs = []
+        for index in range(self._repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            function()
+            runs.append(time.perf_counter() - start)
+
+        result = {
+            'runs': runs,
+            'min': min(runs),
+            'median': statistics.median(runs),
+            'mean': statistics.mean(runs)
+        }
+        result.update(extra)
+        self._results[name] = result
+        if self._log:
+            self._log('{name:<24} min {min:9.4f}s  median {median:9.4f}s'.format(name=name, **result))
+        return result
+
+    """ UTILS """
+
+    def getMainWidget(self):
+        """
+        @return: <LibraryWidget> displaying the library, this is only
+            created once, and is shared by the stages
+        """
+        if self._main_widget is None:
+            os.environ['LIBRARY_DIR'] = self._library_dir
+            self._main_widget = LibraryWidget()
+            self._main_widget.resize(1024, 768)
+            self._main_widget.show()
+            self._app.processEvents()
+        return self._main_widget
+
+    def getModel(self):
+        """
+        @return: <ImageListModel> of every row in the library
+        """
+        if self._model is None:
+            self._model = self.loadModel()
+        return self._model
+
+    def loadModel(self):
+        main_widget = self.getMainWidget()
+        model = ImageListModel(parent_widget=main_widget.dir_widget)
+        model.directory = self._library_dir
+        main_widget.loader.populateModelFromDirectory(model, [self._library_dir], recursive=True)
+        while main_widget.loader.isLoading():
+            main_widget.loader.waitForDone()
+        return model
+
+    def processEvents(self):
+        QCoreApplication.processEvents()
+
+    def getMetadata(self):
+        try:
+            commit = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.DEVNULL
+            ).decode('utf-8').strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        num_rows = self._model.rowCount() if self._model is not None else None
+        return {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'library_dir': self._library_dir,
+            'num_rows': num_rows,
+            'repeat': self._repeat,
+            'python': platform.python_version(),
+            'qt_api': qtpy.API,
+            'qt_version': qVersion(),
+            'platform': platform.platform()
+        }
+
+    """ STAGES """
+
+    def benchDirlist(self):
+        dir_lists = []
+
+        def populate():
+            dir_list = DirList(library_dir=self._library_dir)
+            dir_lists.append(dir_list)
+            # fetch every directory in the tree
+            while True:
+                for item in dir_list.getAllChildren(dir_list.invisibleRootItem(), item_list=[]):
+                    if dir_list.canFetchMore(item):
+                        dir_list.fetchMore(item)
+                if not dir_list.isFetching():
+                    break
+                dir_list.lister.waitForDone()
+
+        result = self.time('dirlist_populate', populate)
+        dir_list = dir_lists[-1]
+        directories = dir_list.getAllChildren(dir_list.invisibleRootItem(), item_list=[])
+        result['num_directories'] = len(directories)
+        for dir_list in dir_lists:
+            dir_list.deleteLater()
+
+    def benchModel(self):
+        models = []
+
+        def load():
+            models.append(self.loadModel())
+
+        self.time('model_loader_cold', load, setup=ShardCache.instance().clear)
+        self.time('model_loader_warm', load)
+        self._model = models[-1]
+        self._results['model_loader_warm']['num_rows'] = self._model.rowCount()
+
+        main_widget = self.getMainWidget()
+        index = main_widget.getIndex()
+        if index is None:
+            return
+
+        def loadIndex():
+            model = ImageListModel(parent_widget=main_widget.dir_widget)
+            model.directory = self._library_dir
+            main_widget.loader.populateModelFromIndex(model, index, self._library_dir)
+            while main_widget.loader.isLoading():
+                main_widget.loader.waitForDone()
+            models.append(model)
+
+        self.time('model_index', loadIndex)
+        self._results['model_index']['num_rows'] = models[-1].rowCount()
+
+    def benchSearch(self):
+        model = self.getModel()
+        for query in SEARCH_QUERIES:
+            # the search index is built by the first query
+            model.populateHideList(query)
+            self.time(
+                'search {query}'.format(query=query),
+                lambda: model.populateHideList(query),
+                num_hidden=len(model.metadata['hidden'])
+            )
+        model.populateHideList('')
+
+    def benchViews(self):
+        main_widget = self.getMainWidget()
+        model = self.getModel()
+        main_widget.model = model
+        mode_menu = main_widget.top_bar_widget.mode_container.mode_menu
+
+        for mode in VIEW_MODES:
+            mode_menu.setCurrentText(mode)
+            self.processEvents()
+
+            def build():
+                model.updateViews()
+                self.processEvents()
+
+            self.time('view_{mode}'.format(mode=mode.lower()), build, setup=ThumbnailCache.instance().clear)
+
+    def benchResize(self):
+        main_widget = self.getMainWidget()
+        main_widget.model = self.getModel()
+        main_widget.top_bar_widget.mode_container.mode_menu.setCurrentText('Thumbnail')
+        main_widget.model.updateViews()
+        self.processEvents()
+        height = main_widget.height()
+
+        def relayout():
+            for width in RESIZE_WIDTHS:
+                main_widget.resize(width, height)
+                self.processEvents()
+
+        self.time('resize_relayout', relayout, num_resizes=len(RESIZE_WIDTHS))
+
+    def benchScrub(self):
+        model = self.getModel()
+        if model.rowCount() == 0:
+            return
+        # frames are scrubbed in the full screen viewer
+        image_width = max(iUtils.getSetting('IMAGE_SIZES').values())
+        image_widget = FullScreenImageItem(image_width=image_width, record=model.imageJSONList[0])
+
+        def scrub():
+            for step in range(self._scrub_steps):
+                image_widget.setImage('next')
+                self.processEvents()
+
+        def reset():
+            ThumbnailCache.instance().clear()
+            image_widget.getPrefetcher().cancel()
+
+        result = self.time('scrub_step', scrub, setup=reset, num_steps=self._scrub_steps)
+        result['step_mean'] = result['mean'] / self._scrub_steps
+        result['hit_rate'] = image_widget.getFrameHitRate()
+        image_widget.deleteLater()
+
+    """ PROPERTIES """
+
+    @property
+    def results(self):
+        return self._results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the Library')
+    parser.add_argument('library_dir', help='path to the library to benchmark')
+    parser.add_argument('-o', '--output', help='path to write the json results to, defaults to stdout')
+    parser.add_argument('--repeat', type=int, default=3, help='number of times each stage is run')
+    parser.add_argument('--scrub-steps', type=int, default=200, help='frames stepped through when scrubbing')
+    parser.add_argument(
+        '--stages', nargs='+', choices=LibraryBenchmark.STAGES, help='stages to run, defaults to all'
+    )
+    parser.add_argument('--home', help='$HOME to run with, defaults to a temporary directory')
+    args = parser.parse_args(argv)
+
+    # this needs to be set up before the settings are read
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.environ['HOME'] = args.home or tempfile.mkdtemp(prefix='library_benchmark_')
+
+    benchmark = LibraryBenchmark(
+        args.library_dir,
+        repeat=args.repeat,
+        scrub_steps=args.scrub_steps,
+        log=lambda message: print(message, file=sys.stderr)
+    )
+    results = benchmark.run(stages=args.stages)
+
+    output = json.dumps(results, indent=4, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,6 +15,10 @@ from qtpy.QtWidgets import *
 from qtpy.QtCore import *
 
 from .__utils__ import iUtils
+from .Atlas import AtlasCache
+from .Prefetch import FramePrefetcher
+from .Record import AssetRecord
+from .ThumbnailCache import ThumbnailCache
 from cgwidgets import utils as gUtils
 
 
@@ -30,8 +34,16 @@ class ImageWidget(QLabel):
     @image_dir: directory containing the image sequence proxy
     @current_image: name of the current image being displayed proxy
     @json_file: full path to json file hosting all of the meta data
+    @record: <AssetRecord> parsed json data / proxy images of the asset
     @file_extension: extension of files to use
+    @UNSELECTED_SS: <str> style sheet of images that are not selected
     """
+    UNSELECTED_SS = """
+        border-style: solid;\
+        border-width:2px;\
+        border-color: rgba(0,0,0,0)\
+    """
+
     def __init__(
         self,
         parent=None,
@@ -60,15 +72,20 @@ class ImageWidget(QLabel):
         model.appendToSelectionList(self.json_file)
 
     def setUnselected(self):
-        style_sheet = """
-            border-style: solid;\
-            border-width:2px;\
-            border-color: rgba(0,0,0,0)\
-        """
-        self.setStyleSheet(style_sheet)
+        self.setStyleSheet(ImageWidget.UNSELECTED_SS)
         model = iUtils().getModel(self)
         model.removeFromSelectionList(self.json_file)
 
+    def updateSelection(self):
+        """
+        Updates the border to display if this image is selected in the
+        model, without changing the selection
+        """
+        if self.isSelected():
+            self.setStyleSheet(iUtils().getSetting('IMAGE_SELECTED_SS'))
+        else:
+            self.setStyleSheet(ImageWidget.UNSELECTED_SS)
+
     """
     button <QButton> current button being pressed
     """
@@ -174,11 +191,23 @@ class ImageWidget(QLabel):
         """
         the current image is a full file path to an image on disk
         """
-        self.pixmap = QPixmap(current_pixmap)
-        self.pixmap = self.pixmap.scaledToWidth(self.image_width)
+        self._current_image_path = current_pixmap
+        self.pixmap = self.getAtlasPixmap(current_pixmap)
+        if self.pixmap is None:
+            self.pixmap = ThumbnailCache.instance().pixmap(
+                self.getDisplayPath(current_pixmap), self.image_width
+            )
         self.setPixmap(self.pixmap)
         return self.pixmap
 
+    @property # < AssetRecord >
+    def record(self):
+        return self._record
+
+    @record.setter
+    def record(self, record):
+        self._record = record
+
     @property # str < filepath >
     def json_file(self):
         return self._json_file
@@ -189,26 +218,89 @@ class ImageWidget(QLabel):
 
     """ UTILS """
 
+    def getCurrentImagePath(self):
+        """
+        @return: <str> path on disk to the frame currently displayed
+        """
+        return self._current_image_path
+
+    def getDisplayPath(self, image_path):
+        """
+        @image_path: <str> path to proxy image
+        @return: <str> path to the image that is decoded to display
+            the proxy image at the width of this widget
+        """
+        record = getattr(self, '_record', None)
+        if record is None:
+            return image_path
+        return record.getDisplayPath(image_path, self.image_width)
+
+    def getAtlasPixmap(self, image_path):
+        """
+        @image_path: <str> path to proxy image
+        @return: <QPixmap> sliced from the atlas of the directory the
+            asset is in, or None if it is not in the atlas
+        """
+        record = getattr(self, '_record', None)
+        if record is None or not iUtils.getSetting('ATLAS_ENABLED'):
+            return None
+        return AtlasCache.instance().pixmap(record, image_path, self.image_width)
+
+    def getPrefetcher(self):
+        """
+        Returns the FramePrefetcher used when scrubbing this image.  This
+        is only created the first time the image is scrubbed.
+        @return: <FramePrefetcher>
+        """
+        prefetcher = getattr(self, '_prefetcher', None)
+        if prefetcher is None or prefetcher.image_width != self.image_width:
+            if prefetcher is not None:
+                prefetcher.cancel()
+            prefetcher = FramePrefetcher(
+                parent=self,
+                image_dir=self.proxyImageDir,
+                image_list=self.proxyImageList,
+                image_width=self.image_width,
+                record=self.record
+            )
+            self._prefetcher = prefetcher
+        return prefetcher
+
+    def getFrameHitRate(self):
+        """
+        @return: <float> ratio of the frames displayed while scrubbing that
+            had already been prefetched
+        """
+        return self.getPrefetcher().hitRate()
+
     def setImage(self, direction='next'):
         """
         Displays the previous/next image to the user depending
-        on the input given to direction
+        on the input given to direction.  The frames are read from
+        the prefetcher, which decodes the frames around the current one
+        in the background.
         @direction: <str> if it will display the next/previous image
         """
         current_index = self.proxyImageIndex
         image_list = self.proxyImageList
+        # no proxy images to scrub through
+        if not image_list:
+            return
         if direction == 'next':
             current_index += 1
         elif direction == 'previous':
             current_index -= 1
+        current_index %= len(image_list)
         new_image = image_list[current_index]
-        proxy_image_dir = self.proxyImageDir
-        new_image_path = '/'.join([proxy_image_dir, new_image])
         self.proxyImageIndex = current_index
 
         self.currentImage = new_image
 
-        self.currentPixmap = new_image_path
+        prefetcher = self.getPrefetcher()
+        self._current_image_path = prefetcher.getImagePath(current_index)
+        self.pixmap = prefetcher.pixmap(current_index)
+        self.setPixmap(self.pixmap)
+        prefetcher.setPosition(current_index)
         self.setFrameWidgetText(new_image)
 
     def nextImage(self):
@@ -248,8 +340,9 @@ class ImageWidget(QLabel):
                     self.setSelected()
 
             self._activated = False
+        # only this image has changed
         model = iUtils().getModel(self)
-        model.updateViews()
+        model.updateViewSelection([self.json_file])
         # not to sure on why this goes bananas
         # RuntimeError: wrapped C/C++ object of type DefaultImage has been deleted
         # return QLabel.mouseReleaseEvent(self, event, *args, **kwargs)
@@ -264,37 +357,36 @@ class DefaultImage(ImageWidget):
         self,
         parent=None,
         image_width=None,
-        json_file=None
+        json_file=None,
+        record=None
     ):
         super(ImageWidget, self).__init__(parent)
         """
         @image_dir : path to directory with image sequence inside
+        @record: <AssetRecord> if this is not provided, the json_file
+            will be loaded
         """
         self._activated = False
 
-        self.json_file = json_file
-        json_data = gUtils.getJSONData(json_file)
+        if record is None:
+            record = AssetRecord.load(json_file)
+        self.record = record
+        self.json_file = record.filepath
 
-        self.proxyImageDir = json_data['proxy']
-        self.proxyImageList = (sorted(os.listdir(json_data['proxy'])))
-        self.proxyImageIndex = 0
+        self.proxyImageDir = record.proxy_dir
+        self.proxyImageList = record.proxy_list
+        self.proxyImageIndex = record.default_index
 
         self.image_width = image_width
         self.setFixedWidth(self.image_width)
         self.setFixedHeight(self.image_width)
 
-        self.currentImage = os.listdir(self.proxyImageDir)[0]
+        self.currentImage = self.proxyImageList[self.proxyImageIndex]
         file_extension = self.currentImage[self.currentImage.rindex('.'):]
         self.proxyFileExtension = file_extension
 
         # set default image
-        if 'default_image' in json_data.keys():
-            current_image = '/'.join([self.proxyImageDir, json_data['default_image']])
-            if os.path.isfile(current_image) is False:
-                current_image = '/'.join([self.proxyImageDir, self.currentImage])
-        else:
-            current_image = '/'.join([self.proxyImageDir, self.currentImage])
-        self.currentPixmap = current_image
+        self.currentPixmap = record.default_image
 
         # set default style sheet
         style_sheet = """
@@ -346,7 +438,7 @@ class DefaultImage(ImageWidget):
     def mouseReleaseEvent(self, event, *args, **kwargs):
         if self.button == Qt.LeftButton:
             model = iUtils().getModel(self)
-            model.updateViews()
+            model.updateViewSelection([self.json_file])
             return ImageWidget.mouseReleaseEvent(self, event, *args, **kwargs)
     """
 
@@ -0,0 +1,364 @@
+"""
+Persistent on disk index of the LIBRARY_DIR.
+
+Walking the library and parsing every json file on launch is really slow
+over network storage.  The index records every directory and asset in
+a local SQLite database ($HOME/.library/index.db), and is refreshed
+incrementally by comparing the mtime of each directory against the one
+that was recorded the last time it was scanned.  Only directories whose
+mtime has changed are listed again, and only the json files whose
+mtime/size have changed are parsed again.  The listing of the proxy
+directory of each asset is stored with it, so the rows read from the index
+never touch the file system.  This is listed again whenever the json file
+changes.
+
+The refresh is run on the ImageListLoader's workers (IndexLoadTask), and
+the changes the LibraryWatcher finds are written back to the index on a
+worker as well (IndexUpdateTask), so the GUI thread never waits on it.
+
+Note:
+    Editing a json file in place does not change the mtime of the
+    directory it lives in.  These changes are only picked up if the
+    LibraryWatcher is running, otherwise publishing should write a new
+    file (or replace the old one) so that the change is picked up on the
+    next refresh.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+from qtpy.QtCore import QRunnable
+
+from .__utils__ import iUtils
+from .Record import AssetRecord
+
+
+class LibraryIndex(object):
+    """
+    @index_file: <str> path to the SQLite database
+    @COLUMNS: <list> of <str> json keys that are stored in their own
+        column, these are the same keys as the ImageListModel key_map
+    @SCHEMA_VERSION: <int> version of the tables, an index written with an
+        older version is dropped and rebuilt
+    """
+    COLUMNS = ['name', 'type', 'notes', 'data', 'frame', 'proxy']
+    SCHEMA_VERSION = 2
+
+    def __init__(self, index_file=None):
+        if not index_file:
+            index_file = iUtils.getSetting('INDEX_FILE')
+            if not index_file:
+                index_file = os.environ['HOME'] + '/.library/index.db'
+        index_dir = os.path.dirname(index_file)
+        if index_dir and not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+
+        self._index_file = index_file
+        self._local = threading.local()
+        # writes are made from several workers
+        self._lock = threading.RLock()
+        self.createTables()
+
+    """ DATABASE """
+
+    def connection(self):
+        """
+        Returns the connection to the database for the current thread
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.index_file)
+            self._local.connection = connection
+        return connection
+
+    def createTables(self):
+        connection = self.connection()
+        columns = ', '.join(['{} TEXT'.format(column) for column in self.COLUMNS])
+        with connection:
+            # the index is only a cache, so it is simply rebuilt
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                connection.execute('DROP TABLE IF EXISTS directories')
+                connection.execute('DROP TABLE IF EXISTS assets')
+                connection.execute('PRAGMA user_version = {}'.format(self.SCHEMA_VERSION))
+
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime INTEGER
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS assets (
+                    filepath TEXT PRIMARY KEY,
+                    directory TEXT,
+                    mtime INTEGER,
+                    size INTEGER,
+                    {columns},
+                    json TEXT,
+                    proxy_list TEXT
+                )
+            """.format(columns=columns))
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS directories_parent ON directories(parent)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS assets_directory ON assets(directory)'
+            )
+
+    """ REFRESH """
+
+    def refresh(self, directory):
+        """
+        Incrementally updates the index for the directory provided and
+        all of its sub directories.
+        @directory: <str> path to directory
+        """
+        connection = self.connection()
+        with self._lock, connection:
+            parent = connection.execute(
+                'SELECT parent FROM directories WHERE path = ?', (directory, )
+            ).fetchone()
+            parent = parent[0] if parent else None
+            self.refreshDirectory(connection, directory, parent)
+
+    def updateAssets(self, records):
+        """
+        Writes the records provided into the index.  This is used for the
+        changes found by the LibraryWatcher, as editing a json file in place
+        does not change the mtime of its directory, so refresh() would
+        not find them.  Only assets in directories that have already been
+        indexed are written, the rest are found when they are refreshed.
+        @records: <list> of <AssetRecord>
+        """
+        connection = self.connection()
+        with self._lock, connection:
+            for record in records:
+                directory = os.path.dirname(record.filepath)
+                if not self.hasDirectory(directory, connection=connection):
+                    continue
+                try:
+                    stat = os.stat(record.filepath)
+                except OSError:
+                    connection.execute('DELETE FROM assets WHERE filepath = ?', (record.filepath, ))
+                    continue
+                self.setAsset(connection, directory, record, stat.st_mtime_ns, stat.st_size)
+
+    def removeAssets(self, filepaths):
+        """
+        @filepaths: <list> of <str> paths to the json files to remove
+        """
+        connection = self.connection()
+        with self._lock, connection:
+            connection.executemany(
+                'DELETE FROM assets WHERE filepath = ?', [(filepath, ) for filepath in filepaths]
+            )
+
+    def refreshDirectory(self, connection, directory, parent):
+        """
+        Updates the directory if its mtime has changed, and then
+        continues on to all of its children.
+        @directory: <str> path to directory
+        @parent: <str> path to the parent directory
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self.removeDirectory(connection, directory)
+            return
+
+        row = connection.execute(
+            'SELECT mtime FROM directories WHERE path = ?', (directory, )
+        ).fetchone()
+        if row and row[0] == mtime:
+            children = self.getChildDirectories(directory, connection=connection)
+        else:
+            children = self.scanDirectory(connection, directory, parent, mtime)
+
+        for child in children:
+            self.refreshDirectory(connection, child, directory)
+
+    def scanDirectory(self, connection, directory, parent, mtime):
+        """
+        Lists the directory provided and updates all of the assets
+        that have changed since it was last scanned.
+        @return: <list> of <str> paths to the child directories
+        """
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            self.removeDirectory(connection, directory)
+            return []
+
+        # get old values
+        old_children = set(self.getChildDirectories(directory, connection=connection))
+        old_assets = dict(
+            (filepath, (asset_mtime, size)) for filepath, asset_mtime, size in connection.execute(
+                'SELECT filepath, mtime, size FROM assets WHERE directory = ?', (directory, )
+            )
+        )
+
+        # update entries
+        children = []
+        filepaths = set()
+        for entry in entries:
+            filepath = '/'.join([directory, entry.name])
+            try:
+                if entry.is_dir():
+                    children.append(filepath)
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            filepaths.add(filepath)
+            if old_assets.get(filepath) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            record = AssetRecord.load(filepath)
+            if record is None:
+                filepaths.discard(filepath)
+                continue
+            self.setAsset(connection, directory, record, stat.st_mtime_ns, stat.st_size)
+
+        # remove everything that no longer exists
+        for filepath in set(old_assets.keys()) - filepaths:
+            connection.execute('DELETE FROM assets WHERE filepath = ?', (filepath, ))
+        for child in old_children - set(children):
+            self.removeDirectory(connection, child)
+
+        connection.execute(
+            'INSERT OR REPLACE INTO directories (path, parent, mtime) VALUES (?, ?, ?)',
+            (directory, parent, mtime)
+        )
+
+        return sorted(children)
+
+    def setAsset(self, connection, directory, record, mtime, size):
+        """
+        Stores a single asset in the index
+        @record: <AssetRecord> the proxy directory is listed
+            now if it has not been already
+        """
+        values = [record.filepath, directory, mtime, size]
+        for column in self.COLUMNS:
+            value = record.get(column)
+            values.append(value if value is None else str(value))
+        values.append(json.dumps(dict(record)))
+        values.append(json.dumps(list(record.proxy_list)))
+
+        connection.execute(
+            'INSERT OR REPLACE INTO assets VALUES ({})'.format(
+                ', '.join(['?'] * len(values))
+            ),
+            values
+        )
+
+    def removeDirectory(self, connection, directory):
+        """
+        Removes the directory provided, and everything underneath it
+        from the index.
+        """
+        prefix = directory + '/'
+        connection.execute(
+            'DELETE FROM directories WHERE path = ? OR substr(path, 1, ?) = ?',
+            (directory, len(prefix), prefix)
+        )
+        connection.execute(
+            'DELETE FROM assets WHERE directory = ? OR substr(directory, 1, ?) = ?',
+            (directory, len(prefix), prefix)
+        )
+
+    """ QUERY """
+
+    def getChildDirectories(self, directory, connection=None):
+        """
+        @return: <list> of <str> paths to all of the
+            sub directories of the directory provided
+        """
+        if not connection:
+            connection = self.connection()
+        return [
+            row[0] for row in connection.execute(
+                'SELECT path FROM directories WHERE parent = ? ORDER BY path', (directory, )
+            )
+        ]
+
+    def getDescendantDirectories(self, directory):
+        """
+        @return: <list> of <str> paths to all of the directories
+            underneath the directory provided, at any depth
+        """
+        prefix = directory + '/'
+        return [
+            row[0] for row in self.connection().execute(
+                'SELECT path FROM directories WHERE substr(path, 1, ?) = ? ORDER BY path',
+                (len(prefix), prefix)
+            )
+        ]
+
+    def hasDirectory(self, directory, connection=None):
+        if not connection:
+            connection = self.connection()
+        row = connection.execute(
+            'SELECT 1 FROM directories WHERE path = ?', (directory, )
+        ).fetchone()
+        return row is not None
+
+    def getRows(self, filedirs_list):
+        """
+        Returns the rows for all of the assets located directly in the
+        directories provided.  This is done in a single query.
+        @filedirs_list: <list> of <str> paths to directories
+        @return: <list> of <AssetRecord>
+        """
+        connection = self.connection()
+        with connection:
+            connection.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS selection (path TEXT PRIMARY KEY)'
+            )
+            connection.execute('DELETE FROM selection')
+            connection.executemany(
+                'INSERT OR IGNORE INTO selection VALUES (?)',
+                [(filedir, ) for filedir in filedirs_list]
+            )
+            cursor = connection.execute("""
+                SELECT assets.json, assets.proxy_list FROM assets
+                JOIN selection ON assets.directory = selection.path
+                ORDER BY assets.filepath
+            """)
+            return [
+                AssetRecord(json.loads(jsondata), proxy_list=json.loads(proxy_list))
+                for jsondata, proxy_list in cursor
+            ]
+
+    """ PROPERTIES """
+
+    @property
+    def index_file(self):
+        return self._index_file
+
+
+class IndexUpdateTask(QRunnable):
+    """
+    Writes the changes found by the LibraryWatcher into the index
+    @index: <LibraryIndex>
+    @records: <list> of <AssetRecord> that were created/modified
+    @removed: <list> of <str> paths to json files that were removed
+    """
+    def __init__(self, index, records, removed):
+        super(IndexUpdateTask, self).__init__()
+        self.index = index
+        self.records = records
+        self.removed = removed
+
+    def run(self):
+        try:
+            if self.records:
+                self.index.updateAssets(self.records)
+            if self.removed:
+                self.index.removeAssets(self.removed)
+        except sqlite3.Error:
+            # picked up by the next refresh of the directory
+            pass
@@ -168,6 +168,7 @@ NOTES:
     json file needs iskatanalibrary key to be registered for plugin
 """
 import re
+import sqlite3
 
 from qtpy.QtWidgets import *
 from qtpy.QtGui import *
@@ -176,8 +177,17 @@ from qtpy.QtCore import *
 #from cgqtpy.ImageLibrary import ImageWidget
 import sys
 from . import ImageWidget
+from .Atlas import AtlasCache
 from .PublishWidget import PublishWidget
+from .Loader import DirectoryLister, ImageListLoader
+from .Mirror import ProxyMirror
+from .Record import AssetRecord
+from .Session import LibrarySession
+from .ShardCache import ShardCache
+from .Index import IndexUpdateTask, LibraryIndex
+from .ThumbnailCache import ThumbnailCache
 from .TopBarWidget import TopBarMainWidget
+from .Watcher import LibraryWatcher
 from .__utils__ import iUtils
 from cgwidgets import utils as gUtils
 from .Views import *
@@ -207,6 +217,21 @@ class LibraryWidget(QWidget, iUtils):
             self.full_screen_image,
             self.closeFullScreenImageWidget
         )
+        QShortcut(
+            QKeySequence("Ctrl+A"),
+            self.working_area_widget,
+            self.selectAll
+        )
+        QShortcut(
+            QKeySequence("Ctrl+Shift+A"),
+            self.working_area_widget,
+            self.clearSelection
+        )
+        QShortcut(
+            QKeySequence("Ctrl+I"),
+            self.working_area_widget,
+            self.invertSelection
+        )
         """
         QShortcut(
             QKeySequence("Q"),
@@ -247,12 +272,16 @@ class LibraryWidget(QWidget, iUtils):
         self.thumbnail_view = ThumbnailViewWidget(self)
         self.detailed_view = DetailedViewWidget(self)
         self.list_view = ListViewMainWidget(self)
+        self.icon_view = IconViewWidget(self)
+        self.table_view = TableViewWidget(self)
 
         # add widgets to working area layout
         self.working_area_layout.addWidget(self.thumbnail_view)
         self.working_area_layout.addWidget(self.detailed_view)
         self.working_area_layout.addWidget(self.list_view)
         self.working_area_layout.addWidget(self.publish_widget)
+        self.working_area_layout.addWidget(self.icon_view)
+        self.working_area_layout.addWidget(self.table_view)
 
         # add widgets/layouts
         self.working_area_widget.setLayout(self.working_area_main_layout)
@@ -289,9 +318,35 @@ class LibraryWidget(QWidget, iUtils):
         self.view_layout.addWidget(self.main_splitter)
         self.view_layout.addWidget(self.full_screen_image)
 
+        # set up loader
+        self.loader = ImageListLoader(self)
+
+        # set up index
+        self.index = None
+        if iUtils.getSetting('INDEX_ENABLED'):
+            try:
+                self.index = LibraryIndex()
+            except (OSError, sqlite3.Error):
+                # fall back to walking the file system
+                pass
+
+        # set up watcher
+        self.watcher = None
+        if iUtils.getSetting('WATCHER_ENABLED'):
+            try:
+                self.watcher = LibraryWatcher(self)
+            except OSError:
+                pass
+            else:
+                self.watcher.filesChanged.connect(self.__filesChanged)
+
         # set up dir list
         self.library_dir = os.environ['LIBRARY_DIR']
-        self.dir_widget = DirList(library_dir=self.library_dir)
+        self.dir_widget = DirList(
+            library_dir=self.library_dir, index=self.index, watcher=self.watcher
+        )
+        if self.watcher:
+            self.watcher.directoriesChanged.connect(self.__directoriesChanged)
         self.setupWorkingArea()
 
         # add widgets
@@ -306,6 +361,23 @@ class LibraryWidget(QWidget, iUtils):
         # setup user defaults
         self.setupUserDefaults()
 
+        # redraw when the settings that change the views are edited
+        iUtils.getSettingsStore().settingChanged.connect(self.__settingChanged)
+
+        # restore the last session
+        self.session = None
+        self._revalidate_model = None
+        self.loader.loadFinished.connect(self.__revalidateFinished)
+        self.loader.loadFinished.connect(AtlasCache.instance().releasePages)
+        self.loader.loadFinished.connect(self.__prefetchMirror)
+        self.loader.loadFinished.connect(self.table_view.sortModel)
+        if iUtils.getSetting('SESSION_ENABLED'):
+            self.session = LibrarySession()
+            self.restoreSession()
+            app = QCoreApplication.instance()
+            if app:
+                app.aboutToQuit.connect(self.saveSession)
+
     def setupUserDefaults(self):
         """
         Sets up the user defaults for any options the user may click
@@ -333,9 +405,141 @@ class LibraryWidget(QWidget, iUtils):
 
     """  UTILS """
 
+    def getLoader(self):
+        return self.loader
+
+    def getIndex(self):
+        return self.index
+
+    def getWatcher(self):
+        return self.watcher
+
+    def getCurrentSize(self):
+        """
+        @return: <str> name of the image size that is selected
+        """
+        size_buttons = self.top_bar_widget.size_button_container.thumbnail_view_buttons
+        for name, size_button in size_buttons.items():
+            if size_button.isChecked():
+                return name
+        return None
+
+    def applyChanges(self, model, created, modified, removed):
+        """
+        Patches the model with the changes provided, as row
+        inserts/updates/removes rather than rebuilding it.
+        @model: <ImageListModel>
+        @created: <list> of <AssetRecord>
+        @modified: <list> of <AssetRecord>
+        @removed: <list> of <str> paths to json files
+        """
+        # rows the loader/index already added are updated instead, and
+        # rows it has not reached yet (or that failed to parse) are added
+        changed = created + modified
+        modified = [
+            record for record in changed
+            if model.getRecordFromFilepath(record.filepath) is not None
+        ]
+        created = [
+            record for record in changed
+            if model.getRecordFromFilepath(record.filepath) is None
+        ]
+
+        num_changed = 0
+        if removed:
+            num_changed += model.removeFilepaths(removed)
+        if modified:
+            num_changed += model.updateRecords(modified)
+        if created:
+            model.insertJSONRows(created)
+            if self.table_view.model() is model:
+                self.table_view.sortModel()
+
+        # widget views do not follow the model signals
+        if num_changed:
+            model.updateViews()
+
+    """ SESSION """
+
+    def saveSession(self):
+        """
+        Writes the directory, view mode, image size, and rows that are
+        currently displayed to the session file.
+        """
+        model = getattr(self, '_model', None)
+        if not self.session or not model or not model.directory:
+            return
+
+        try:
+            self.session.save(
+                self.library_dir,
+                model.directory,
+                view=self.top_bar_widget.mode_container.mode_menu.currentText(),
+                size=self.getCurrentSize(),
+                records=model.imageJSONList
+            )
+        except OSError:
+            pass
+
+    def restoreSession(self):
+        """
+        Displays the rows stored in the session immediately, and then
+        reloads the directory in the background to pick up anything
+        that changed since it was saved.
+        @return: <bool> True if a session was restored
+        """
+        session = self.session.load(library_dir=self.library_dir)
+        if not session:
+            return False
+        directory = session['directory']
+
+        # restore rows
+        model = ImageListModel(parent_widget=self.dir_widget)
+        model.directory = directory
+        model.populateModelFromRecords(session['rows'])
+        self.model = model
+
+        # restore view mode / size
+        mode_widget = self.top_bar_widget.mode_container.mode_menu
+        mode_index = mode_widget.findText(session.get('view') or '')
+        if mode_index >= 0:
+            mode_widget.setCurrentIndex(mode_index)
+        size_buttons = self.top_bar_widget.size_button_container.thumbnail_view_buttons
+        if session.get('size') in size_buttons:
+            size_buttons[session['size']].setSelected()
+
+        # select the directory without reloading it
+        self.dir_widget.setCurrentDirectory(directory, populate=False)
+        self.dir_widget.watchTree(directory)
+
+        self.revalidateModel(model)
+        return True
+
+    def revalidateModel(self, model):
+        """
+        Loads the directory of the model provided into a second model in
+        the background, once it has finished the differences between the
+        two are patched into the model provided.
+        @model: <ImageListModel>
+        """
+        self._revalidate_model = ImageListModel(parent_widget=self.dir_widget)
+        self._revalidate_model.directory = model.directory
+        self.loader.populateModelFromDirectory(
+            self._revalidate_model, [model.directory], recursive=True
+        )
+
     def getSelectionList(self):
         return self.model.metadata['selected']
 
+    def selectAll(self):
+        self.model.selectAll()
+
+    def clearSelection(self):
+        self.model.clearSelection()
+
+    def invertSelection(self):
+        self.model.invertSelection()
+
     def getFullScreenImageWidget(self):
         return self.full_screen_image
 
@@ -432,12 +636,8 @@ class LibraryWidget(QWidget, iUtils):
                 self.drag_image_path
                 self.drag_proxy_image_path
             except AttributeError:
-                json_data = gUtils.getJSONData(widget.json_file)
-                if 'default_image' in json_data.keys():
-                    current_image = '/'.join([widget.proxyImageDir, json_data['default_image']])
-                    if os.path.isfile(current_image) is False:
-                        current_image = '/'.join([widget.proxyImageDir, widget.currentImage])
-                else:
+                current_image = widget.record.default_image
+                if not current_image:
                     current_image = '/'.join([widget.proxyImageDir, widget.currentImage])
                 self.drag_image_path = current_image
                 self.drag_proxy_image_path = current_image
@@ -445,8 +645,9 @@ class LibraryWidget(QWidget, iUtils):
             drag = QDrag(self)
 
             # set drag/drop pixmap
-            pixmap = QPixmap(self.drag_proxy_image_path)
-            pixmap = pixmap.scaledToWidth(widget.image_width * .5)
+            pixmap = ThumbnailCache.instance().pixmap(
+                self.drag_proxy_image_path, widget.image_width * .5
+            )
             drag.setPixmap(pixmap)
             hotspot = QPoint(pixmap.width() * .5, pixmap.height() * .5)
             drag.setHotSpot(hotspot)
@@ -511,9 +712,107 @@ class LibraryWidget(QWidget, iUtils):
         self._model = model
         self.thumbnail_view.setModel(model)
         self.detailed_view.setModel(model)
+        self.icon_view.setModel(model)
+        self.table_view.setModel(model)
 
     """ EVENTS """
 
+    def __settingChanged(self, setting, value):
+        if setting not in ('IMAGE_SELECTED_BORDER_WIDTH', 'IMAGE_SELECTED_SS'):
+            return
+        model = getattr(self, '_model', None)
+        if model:
+            model.updateViews()
+
+    def __directoriesChanged(self, created, removed):
+        shard_cache = ShardCache.instance()
+        for directory in created + removed:
+            shard_cache.invalidate(directory)
+            shard_cache.invalidate(os.path.dirname(directory))
+        self.dir_widget.updateDirectories(created, removed)
+
+    def __filesChanged(self, created, modified, removed):
+        """
+        Applies the changes the watcher found on disk to the model that is
+        currently displayed, as row inserts/updates/removes rather
+        than rescanning the directory.
+        @created: <list> of <AssetRecord>
+        @modified: <list> of <AssetRecord>
+        @removed: <list> of <str> paths to json files
+        """
+        # drop the parsed shards of the directories that changed
+        shard_cache = ShardCache.instance()
+        filepaths = removed + [record.filepath for record in created + modified]
+        directories = set(os.path.dirname(filepath) for filepath in filepaths)
+        for directory in directories:
+            shard_cache.invalidate(directory)
+
+        # repack the thumbnails of the directories that changed
+        if iUtils.getSetting('ATLAS_ENABLED') and iUtils.getSetting('ATLAS_AUTO_BUILD'):
+            atlas_cache = AtlasCache.instance()
+            for directory in directories:
+                atlas_cache.requestBuild(directory)
+
+        # files edited in place do not change the mtime of their
+        # directory, so the index is updated directly
+        if self.index:
+            QThreadPool.globalInstance().start(
+                IndexUpdateTask(self.index, created + modified, removed)
+            )
+
+        model = getattr(self, '_model', None)
+        if not model or not model.directory:
+            return
+
+        def isInModel(filepath):
+            return model.containsDirectory(os.path.dirname(filepath))
+
+        self.applyChanges(
+            model,
+            [record for record in created if isInModel(record.filepath)],
+            [record for record in modified if isInModel(record.filepath)],
+            [filepath for filepath in removed if isInModel(filepath)]
+        )
+
+    def __prefetchMirror(self):
+        """
+        Mirrors the images of the directory that has just been loaded
+        in the background, if the mirror is enabled
+        """
+        mirror = ProxyMirror.active()
+        model = getattr(self, '_model', None)
+        if mirror is None or not model:
+            return
+        width = iUtils.getSetting('IMAGE_SIZES').get(self.getCurrentSize())
+        mirror.prefetchRecords(model.imageJSONList, width=width)
+
+    def __revalidateFinished(self):
+        """
+        Compares the rows restored from the session against the rows that
+        were just loaded from disk, and patches in the differences.
+        """
+        fresh_model = self._revalidate_model
+        if fresh_model is None or self.loader.model is not fresh_model:
+            return
+        self._revalidate_model = None
+
+        model = getattr(self, '_model', None)
+        if not model or model.directory != fresh_model.directory:
+            return
+
+        old_records = dict((record.filepath, record) for record in model.imageJSONList)
+        created = []
+        modified = []
+        for record in fresh_model.imageJSONList:
+            old_record = old_records.pop(record.filepath, None)
+            if old_record is None:
+                created.append(record)
+            elif dict(old_record) != dict(record) or old_record.proxy_list != record.proxy_list:
+                modified.append(record)
+        removed = list(old_records.keys())
+
+        self.applyChanges(model, created, modified, removed)
+
     def activateFullScreenDisplay(self):
         """
         Gets the current list of items selected by the user
@@ -531,6 +830,10 @@ class LibraryWidget(QWidget, iUtils):
 
             # activate full screen widget
 
+    def closeEvent(self, event, *args, **kwargs):
+        self.saveSession()
+        return QWidget.closeEvent(self, event, *args, **kwargs)
+
     def resizeEvent(self, *args, **kwargs):
         # why is the thumbnail view updating here?
         # self.thumbnail_view.update()
@@ -544,11 +847,18 @@ class FullScreenImageViewer(ThumbnailViewWidget):
 
     Hit escape to close.  There is no other way to go back, because
     I really don't think it's worth wasting the screen real estate on that...
+
+    The items are only created when the selection changes.  Resizing the
+    viewer repacks the existing items, and the resize events are coalesced
+    so that this is only done once per frame.
+    @selection_list: <list> of <str> paths to the json files
+        currently displayed
     """
     def __init__(self, parent=None):
         super(FullScreenImageViewer, self).__init__(parent)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self._selection_list = []
 
         self.setToolTip("""
     LMB Click:
@@ -636,26 +946,60 @@ class FullScreenImageViewer(ThumbnailViewWidget):
     def createModelFromSelectionList(self, selection_list=None):
         """
         creates a new model for itself based off of the user selection
-        that is stored in the main model
+        that is stored in the main model.  The records are shared with
+        the main model, so the json files are not read again.
         """
-        view_list = []
-        model = ImageListModel(parent_widget=self)
+        main_model = iUtils.getModel(self)
+        record_list = []
         for filepath in selection_list:
-            view_list.append(filepath)
-        model.populateModelFromList(view_list)
+            record = main_model.getRecordFromFilepath(filepath)
+            if record is None:
+                record = AssetRecord.load(filepath)
+            if record is not None:
+                record_list.append(record)
+
+        model = ImageListModel(parent_widget=self)
+        model.populateModelFromRecords(record_list)
         return model
 
     def update(self, selection_list):
-        model = self.createModelFromSelectionList(selection_list=selection_list)
-        self.image_size = self.getImageSize()
-        self.setModel(model)
+        """
+        Creates the items for the selection provided.  If the selection
+        has not changed, the current items are reused.
+        @selection_list: <list> of <str> paths to json files
+        """
+        selection_list = list(selection_list)
+        if selection_list != self._selection_list or len(self.widget_list) == 0:
+            self._selection_list = selection_list
+            model = self.createModelFromSelectionList(selection_list=selection_list)
+            self.image_size = int(self.getImageSize())
+            self.setModel(model)
+        else:
+            self.resizeWidgets()
 
         # update selected items...
+        self.updateSelection()
+
+    def updateSelection(self, filepaths=None):
         for widget in self.widget_list:
-            if widget.isSelected():
-                widget.setSelected()
-            else:
-                widget.setUnselected()
+            if filepaths is None or widget.json_file in filepaths:
+                widget.updateSelection()
+
+    def resizeWidgets(self):
+        """
+        Recomputes the size of the items to fit the viewer, and repacks
+        them.  The grid is only rebuilt if the number of columns changed.
+        """
+        if len(self.widget_list) == 0:
+            return
+        num_columns = self.num_columns
+        image_size = int(self.getImageSize())
+        if image_size != self.image_size:
+            self.image_size = image_size
+            for widget in self.widget_list:
+                widget.setImageWidth(image_size)
+        if self.num_columns != num_columns:
+            self.layoutWidgets(num_columns=self.num_columns)
 
     def setModel(self, model):
         self.model = model
@@ -668,7 +1012,7 @@ class FullScreenImageViewer(ThumbnailViewWidget):
             temp_dict[widget.json_file]['currentImage'] = widget.currentImage
             temp_dict[widget.json_file]['proxyImageIndex'] = widget.proxyImageIndex
         # clear layout
-        gUtils.clearLayout(self.main_layout)
+        self.resetLayout()
 
         # populate model
         widget_list = []
@@ -686,7 +1030,8 @@ class FullScreenImageViewer(ThumbnailViewWidget):
                 parent=self,
                 image_width=self.image_size,
                 json_file=jsondata['filepath'],
-                default_values=default_values
+                default_values=default_values,
+                record=jsondata
             )
 
             widget_list.append(image_widget)
@@ -741,17 +1086,20 @@ class FullScreenImageViewer(ThumbnailViewWidget):
         previous selection back to the user
         """
         main_widget = gUtils.getMainWidget(self, 'Library')
-        main_widget.model.metadata['selected'] = main_widget.temp_selection_list
-        main_widget.model.updateViews()
+        if main_widget:
+            main_widget.model.metadata['selected'] = main_widget.temp_selection_list
+            main_widget.model.updateViews()
         return ThumbnailViewWidget.hideEvent(self, *args, **kwargs)
 
     def resizeEvent(self, event, *args, **kwargs):
         """
         When this widget is resized, it updates the sizes of the widgets
-        to get the most possible space
+        to get the most possible space.  This is deferred to the next
+        frame, so dragging the edge of the window only repacks the
+        widgets once per frame.
         """
-        main_widget = gUtils.getMainWidget(self, 'Library')
-        self.update(selection_list=main_widget.temp_selection_list)
+        if not self._resize_timer.isActive():
+            self._resize_timer.start()
         #return ThumbnailViewWidget.resizeEvent(self, event, *args, **kwargs)
 
 
@@ -761,39 +1109,33 @@ class FullScreenImageItem(ImageWidget.ImageWidget):
         parent=None,
         image_width=None,
         json_file=None,
-        default_values=None
+        default_values=None,
+        record=None
     ):
         super(FullScreenImageItem, self).__init__(parent)
+        self._source_pixmap = None
+        self._source_pixmap_path = None
 
         # set up json data
-
-        self.json_file = json_file
-        json_data = gUtils.getJSONData(json_file)
+        if record is None:
+            record = AssetRecord.load(json_file)
+        self.record = record
+        self.json_file = record.filepath
 
         self.image_width = image_width
 
         # set up default image
-        self.proxyImageDir = json_data['proxy']
-        self.proxyImageList = (sorted(os.listdir(json_data['proxy'])))
+        self.proxyImageDir = record.proxy_dir
+        self.proxyImageList = record.proxy_list
 
         # check to see if default image exists already
         if not default_values:
-            self.proxyImageIndex = 0
-            self.currentImage = os.listdir(self.proxyImageDir)[0]
+            self.proxyImageIndex = record.default_index
+            self.currentImage = self.proxyImageList[self.proxyImageIndex]
         else:
             self.currentImage = default_values['currentImage']
             self.proxyImageIndex = default_values['proxyImageIndex']
-
-        # set default image
-        if 'default_image' in json_data.keys():
-            current_image = '/'.join(
-                [self.proxyImageDir, json_data['default_image']]
-            )
-            if os.path.isfile(current_image) is False:
-                current_image = '/'.join([self.proxyImageDir, self.currentImage])
-        else:
-            current_image = '/'.join([self.proxyImageDir, self.currentImage])
-        self.currentPixmap = current_image
+        self.currentPixmap = '/'.join([self.proxyImageDir, self.currentImage])
 
         # get file extension
         file_extension = self.currentImage[self.currentImage.rindex('.'):]
@@ -803,7 +1145,7 @@ class FullScreenImageItem(ImageWidget.ImageWidget):
         self.text_widget = QLabel(self)
 
         # set note
-        self.setToolTip(repr(json_data).replace(',', '\n')[1:-1])
+        self.setToolTip(repr(record).replace(',', '\n')[1:-1])
 
         # settings
         self.setFixedWidth(self.image_width)
@@ -817,6 +1159,37 @@ class FullScreenImageItem(ImageWidget.ImageWidget):
         style_sheet = FULL_SCREEN_TEXT_SS
         self.text_widget.setStyleSheet(style_sheet)
 
+    def setImageWidth(self, image_width):
+        """
+        Resizes this image.  The frame currently displayed is scaled from
+        the full resolution image decoded the first time it was displayed,
+        rather than being read from disk again.
+        @image_width: <int>
+        """
+        self.image_width = image_width
+        self.setFixedWidth(image_width)
+        self.setFixedHeight(image_width)
+
+        source_pixmap = self.getSourcePixmap()
+        if source_pixmap.isNull():
+            return
+        if source_pixmap.width() > image_width:
+            self.pixmap = source_pixmap.scaledToWidth(image_width, Qt.SmoothTransformation)
+        else:
+            self.pixmap = source_pixmap
+        self.setPixmap(self.pixmap)
+
+    def getSourcePixmap(self):
+        """
+        @return: <QPixmap> full resolution version of the frame that is
+            currently displayed.  This is held until the frame changes.
+        """
+        image_path = self.getCurrentImagePath()
+        if self._source_pixmap_path != image_path:
+            self._source_pixmap = ThumbnailCache.instance().pixmap(image_path, 0)
+            self._source_pixmap_path = image_path
+        return self._source_pixmap
+
     def setFrameWidgetPosition(self):
         frame_widget = self.getFrameWidget()
         frame_y_pos = (
@@ -925,6 +1298,9 @@ class ListViewMainWidget(QScrollArea):
     def update(self):
         pass
 
+    def updateSelection(self, filepaths=None):
+        pass
+
 
 class SearchBar(QLineEdit):
     """
@@ -985,50 +1361,184 @@ class DirList(QTreeWidget):
     widgets init function when this widget is instantiated.
     This should potentially be moved to an environment variable,
     as well as having a user defined location?
+
+    Only the root directories are created on launch.  The children of an
+    item are listed on a worker thread (DirectoryLister) the first time it
+    is expanded, following the canFetchMore/fetchMore protocol of
+    QAbstractItemModel, and a placeholder is displayed until they arrive.
+
+    @index: <LibraryIndex> if provided, the assets are read
+        from the index (which is refreshed incrementally) rather than
+        walking the file system.
+    @watcher: <LibraryWatcher> if provided, the root directories, the
+        directories that have been fetched, and the directory selected are
+        watched, and the items are updated when directories are
+        created/removed.
     """
-    def __init__(self, library_dir=None, parent=None):
+    def __init__(self, library_dir=None, parent=None, index=None, watcher=None):
         super(DirList, self).__init__(parent)
         # self.main_widget = main_widget
         self.setHeaderHidden(True)
         self.setAlternatingRowColors(True)
+        self._index = index
+        self._watcher = watcher
+        self._fetching_items = {}
+        self._items = {}
+        self._current_directory = None
+        self._tree_directory = None
+        self._populate = True
+
+        # set up lister
+        self.lister = DirectoryLister(self)
+        self.lister.directoryListed.connect(self.__directoryListed)
+        self.itemExpanded.connect(self.__itemExpanded)
+
         #self.library_dir = library_dir
         for directory in library_dir.split(':'):
             self.populate(directory)
 
     def populate(self, directory):
         """
-        Creates all of the items for the model to replicate a hierarchical
-        representation of the file system
-        """
-        def populateChildren(item=None, directory=None):
-            children = os.listdir(directory)
-            if len(children) > 0:
-                for name in os.listdir(directory):
-                    new_directory = '/'.join([directory, name])
-                    # check to see if its a dir, or display
-                    if os.path.isdir(new_directory) is True:
-                        new_item = DirListItem(
-                            parent=item,
-                            name=name,
-                            file_dir=new_directory
-                        )
-                        if len(os.listdir(new_directory)) > 0:
-                            populateChildren(
-                                item=new_item,
-                                directory=new_directory
-                            )
-                            new_item.setExpanded(True)
-
-            return item
-
+        Creates the item for the root directory provided.  Its children
+        are fetched when it is expanded.
+        @directory: <str> path to directory
+        """
         root = self.invisibleRootItem()
         name = directory.split('/')[-1]
-        item = DirListItem(
-            parent=root,
-            name=name,
-            file_dir=directory
-        )
-        populateChildren(item=item, directory=directory)
+        item = self.createItem(root, name, directory)
+        item.setExpanded(True)
+        if self.watcher:
+            self.watcher.addDirectory(directory)
+
+    def createItem(self, parent, name, file_dir, has_children=True, index=None):
+        """
+        @parent: <QTreeWidgetItem>
+        @index: <int> position to insert the item at, if None it
+            is appended to the end
+        @return: <DirListItem>
+        """
+        item = DirListItem(name=name, file_dir=file_dir, has_children=has_children)
+        if index is None:
+            parent.addChild(item)
+        else:
+            parent.insertChild(index, item)
+        self._items[file_dir] = item
+        return item
+
+    def getItem(self, file_dir):
+        """
+        @return: <DirListItem> for the directory provided, or None
+            if it has not been fetched
+        """
+        return self._items.get(file_dir)
+
+    def setCurrentDirectory(self, directory, populate=True):
+        """
+        Selects the item of the directory provided.  If its parents have
+        not been fetched yet, they are expanded one at a time, and it is
+        selected once its item has been created.
+        @directory: <str> path to directory
+        @populate: <bool> if False, the model is not reloaded when the
+            item is selected.  This is used when the model has already
+            been populated (restoring a session).
+        """
+        self._current_directory = (directory, populate)
+        self.expandToCurrentDirectory()
+
+    def expandToCurrentDirectory(self):
+        if self._current_directory is None:
+            return
+        directory, populate = self._current_directory
+
+        # find the closest item that has been created
+        file_dir = directory
+        while file_dir not in self._items:
+            parent_dir = os.path.dirname(file_dir)
+            if parent_dir == file_dir:
+                self._current_directory = None
+                return
+            file_dir = parent_dir
+        item = self._items[file_dir]
+
+        # select
+        if file_dir == directory:
+            self._current_directory = None
+            self._populate = populate
+            try:
+                self.setCurrentItem(item)
+            finally:
+                self._populate = True
+            self.scrollToItem(item)
+            return
+
+        # directory no longer exists
+        if item.isFetched():
+            self._current_directory = None
+            return
+
+        # fetch the next level, this is called again when it arrives
+        item.setExpanded(True)
+        if self.canFetchMore(item):
+            self.fetchMore(item)
+
+    def updateDirectories(self, created, removed):
+        """
+        Adds/removes the items of directories that were created/removed
+        on disk.  Directories whose parent has not been fetched yet are
+        ignored, as they will be listed when it is expanded.
+        @created: <list> of <str> paths to directories
+        @removed: <list> of <str> paths to directories
+        """
+        for file_dir in removed:
+            item = self._items.pop(file_dir, None)
+            if item is None:
+                continue
+            prefix = file_dir + '/'
+            for child_dir in [path for path in self._items if path.startswith(prefix)]:
+                self._items.pop(child_dir)
+                self._fetching_items.pop(child_dir, None)
+            (item.parent() or self.invisibleRootItem()).removeChild(item)
+
+        for file_dir in created:
+            if file_dir in self._items:
+                continue
+            parent_dir, name = os.path.split(file_dir)
+            parent = self._items.get(parent_dir)
+            if parent is None or not parent.isFetched():
+                continue
+
+            # keep the children sorted
+            index = parent.childCount()
+            for row in range(parent.childCount()):
+                if parent.child(row).text(0) > name:
+                    index = row
+                    break
+            self.createItem(parent, name, file_dir, has_children=False, index=index)
+
+    def canFetchMore(self, item):
+        """
+        @item: <DirListItem>
+        @return: <bool> True if the children of the item have not
+            been listed yet
+        """
+        return not item.isFetched() and item.getFileDir() not in self._fetching_items
+
+    def isFetching(self):
+        """
+        @return: <bool> True if any items are waiting for their
+            children to be listed
+        """
+        return len(self._fetching_items) > 0
+
+    def fetchMore(self, item):
+        """
+        Lists the children of the item on a worker thread, and displays
+        a placeholder until they are created.
+        @item: <DirListItem>
+        """
+        item.addPlaceholder()
+        self._fetching_items[item.getFileDir()] = item
+        self.lister.listDirectory(item.getFileDir())
 
     def selectionChanged(self, *args, **kwargs):
         """
@@ -1038,35 +1548,109 @@ class DirList(QTreeWidget):
         """
         main_widget = gUtils.getMainWidget(self, 'Library')
 
-        # get all items
+        # get directory
         item = self.currentItem()
-        children = self.getAllChildren(item, item_list=[])
-        children.append(item)
+        if not isinstance(item, DirListItem):
+            return QTreeWidget.selectionChanged(self, *args, **kwargs)
+        directory = item.getFileDir()
+        if not self._populate:
+            return QTreeWidget.selectionChanged(self, *args, **kwargs)
+
+        # populate views from the index
+        # the index is refreshed on the loader, and its rows are
+        # streamed into the model
+        if self.index:
+            model = ImageListModel(parent_widget=self)
+            model.directory = directory
+            main_widget.model = model
+            main_widget.loader.populateModelFromIndex(model, self.index, directory)
 
         # populate views
-        model = ImageListModel(
-            parent_widget=self,
-            filedirs_list=[item.getFileDir() for item in children]
-        )
-        main_widget.model = model
+        # the rows are streamed into the model by the loader, this will
+        # cancel any directory that is still being loaded
+        else:
+            model = ImageListModel(parent_widget=self)
+            model.directory = directory
+            main_widget.model = model
+            main_widget.loader.populateModelFromDirectory(model, [directory], recursive=True)
+
+        # update the view when files are published/removed
+        self.watchTree(directory)
 
         return QTreeWidget.selectionChanged(self, *args, **kwargs)
 
+    def watchTree(self, directory):
+        """
+        Watches the tree of the directory that is displayed, and stops
+        watching the tree of the directory that was displayed before it.
+        @directory: <str> path to directory
+        """
+        if not self.watcher or directory == self._tree_directory:
+            return
+        if self._tree_directory:
+            self.watcher.unwatchTree(self._tree_directory)
+        self._tree_directory = directory
+        self.watcher.watchTree(directory)
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def watcher(self):
+        return self._watcher
+
     def getAllChildren(self, item, item_list=[]):
+        """
+        @return: <list> of all of the DirListItems underneath the item
+            provided that have been fetched
+        """
         if item.childCount() > 0:
             for index in range(0, item.childCount()):
                 child = item.child(index)
+                if not isinstance(child, DirListItem):
+                    continue
                 item_list.append(child)
                 if child.childCount() > 0:
                     self.getAllChildren(child, item_list=item_list)
         return item_list
 
+    """ EVENTS """
+
+    def __itemExpanded(self, item):
+        if isinstance(item, DirListItem) and self.canFetchMore(item):
+            self.fetchMore(item)
+
+    def __directoryListed(self, directory, children):
+        item = self._fetching_items.pop(directory, None)
+        if item is None:
+            return
+
+        item.removePlaceholder()
+        for name, file_dir, has_children in children:
+            self.createItem(item, name, file_dir, has_children=has_children)
+        item.setFetched(True)
+        if self.watcher:
+            self.watcher.addDirectory(directory)
+        self.expandToCurrentDirectory()
+
 
 class DirListItem(QTreeWidgetItem):
-    def __init__(self, parent=None, name='', file_dir=None):
+    """
+    @file_dir: <str> path to the directory this item represents
+    @has_children: <bool> if False, the children of this item will not
+        be fetched, and it will not display an expand indicator
+    """
+    def __init__(self, parent=None, name='', file_dir=None, has_children=True):
         super(DirListItem, self).__init__(parent)
         self.setText(0, name)
         self.setFileDir(file_dir)
+        self._placeholder = None
+        self._is_fetched = False
+        if has_children:
+            self.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        else:
+            self.setFetched(True)
         # SET TEXT COLOR
         # self.setForeground(0,QBrush(QColor(200,200,200)))
 
@@ -1076,6 +1660,37 @@ class DirListItem(QTreeWidgetItem):
     def getFileDir(self):
         return self.file_dir
 
+    def isFetched(self):
+        return self._is_fetched
+
+    def setFetched(self, is_fetched):
+        """
+        @is_fetched: <bool> if True, the children of this item have
+            been created
+        """
+        self._is_fetched = is_fetched
+        if is_fetched:
+            self.setChildIndicatorPolicy(
+                QTreeWidgetItem.DontShowIndicatorWhenChildless
+            )
+
+    def addPlaceholder(self):
+        """
+        Adds a child item that is displayed while the children of
+        this item are being listed
+        """
+        if self._placeholder is not None:
+            return
+        self._placeholder = QTreeWidgetItem(self)
+        self._placeholder.setText(0, 'Loading...')
+        self._placeholder.setFlags(Qt.NoItemFlags)
+
+    def removePlaceholder(self):
+        if self._placeholder is None:
+            return
+        self.removeChild(self._placeholder)
+        self._placeholder = None
+
 
 if __name__ == '__main__':
 
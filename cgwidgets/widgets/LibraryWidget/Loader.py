@@ -0,0 +1,473 @@
+"""
+Background loading for the ImageListModel.
+
+The directory walk and the json parsing are done on a worker pool, and
+the rows are streamed back into the model in batches so that the views
+can fill in progressively while the rest of the tree is still being read.
+
+Starting a new job cancels the previous one, so clicking on another
+directory in the DirList before the current one has finished loading
+will simply drop the old results.
+
+Each directory that is scanned is stored in the ShardCache, so loading a
+directory that has already been visited (and has not changed) does not
+parse any of its json files again.
+
+When the LibraryIndex is enabled, the index is refreshed on a worker
+(IndexLoadTask), and its rows are streamed into the model the same way.
+
+The DirectoryLister lists the sub directories of the items in the DirList
+on a worker when they are expanded, so the tree is loaded lazily.
+"""
+import os
+import sqlite3
+import threading
+
+from qtpy.QtCore import *
+
+from .__utils__ import iUtils
+from .Record import AssetRecord
+from .ShardCache import PendingShard, ShardCache
+
+
+class ImageListLoader(QObject):
+    """
+    Scans directories / json files on a QThreadPool and inserts the parsed
+    rows into an ImageListModel.
+
+    @batch_size: <int> number of json files that each worker parses before
+        sending the rows back to the model
+    @job_id: <int> id of the current job, results from any other job
+        are considered stale and are dropped
+    @model: <ImageListModel> model that is currently being populated
+    @thread_count: <int> max number of worker threads
+    """
+    rowsLoaded = Signal(int, object)
+    taskFinished = Signal(int)
+    jobEmpty = Signal(int)
+    loadFinished = Signal()
+
+    def __init__(self, parent=None, batch_size=None, thread_count=None):
+        super(ImageListLoader, self).__init__(parent)
+        if not batch_size:
+            batch_size = iUtils.getSetting('LOADER_BATCH_SIZE')
+        self._batch_size = batch_size
+        self._job_id = 0
+        self._num_tasks = 0
+        self._model = None
+        self._lock = threading.Lock()
+
+        # set up pool
+        self._pool = QThreadPool(self)
+        if thread_count:
+            self._pool.setMaxThreadCount(thread_count)
+
+        self.rowsLoaded.connect(self.__rowsLoaded)
+        self.taskFinished.connect(self.__taskFinished)
+        self.jobEmpty.connect(self.__jobEmpty, Qt.QueuedConnection)
+
+    """ API """
+
+    def populateModelFromDirectory(self, model, filedirs_list, recursive=False):
+        """
+        Populates the model from all of the json files located in the
+        directories provided.  Each directory is scanned on its own worker.
+        @model: <ImageListModel>
+        @filedirs_list: <list> of <str> paths to directories
+        @recursive: <bool> if True, all of the sub directories are
+            scanned as well
+        """
+        job_id = self.startJob(model)
+        for filedir in filedirs_list:
+            self.startTask(DirectoryScanTask(self, job_id, filedir, recursive=recursive))
+        self.checkJobEmpty(job_id)
+
+    def populateModelFromList(self, model, json_list):
+        """
+        Populates the model from the list of json files provided
+        @model: <ImageListModel>
+        @json_list: <list> of <str> paths to json files
+        """
+        job_id = self.startJob(model)
+        self.startParseTasks(job_id, json_list)
+        self.checkJobEmpty(job_id)
+
+    def populateModelFromIndex(self, model, index, directory):
+        """
+        Refreshes the index for the directory provided, and then populates
+        the model from all of the assets in it, and its sub directories.
+        @model: <ImageListModel>
+        @index: <LibraryIndex>
+        @directory: <str> path to directory
+        """
+        job_id = self.startJob(model)
+        self.startTask(IndexLoadTask(self, job_id, index, directory))
+
+    def cancel(self):
+        """
+        Cancels the current job.  Any work that has not been started yet
+        is removed from the pool, and any rows still in flight are dropped
+        when they arrive.
+        """
+        with self._lock:
+            self._job_id += 1
+            self._num_tasks = 0
+        self._pool.clear()
+        self._model = None
+
+    def isLoading(self):
+        return self._num_tasks > 0
+
+    def waitForDone(self, msecs=-1):
+        """
+        Blocks until all of the workers have finished, and the rows
+        they have sent back have been inserted into the model
+        """
+        self._pool.waitForDone(msecs)
+        QCoreApplication.processEvents()
+
+    """ UTILS """
+
+    def isCurrentJob(self, job_id):
+        return job_id == self._job_id
+
+    def startJob(self, model):
+        self.cancel()
+        self._model = model
+        return self._job_id
+
+    def checkJobEmpty(self, job_id):
+        """
+        loadFinished is emitted when the last task of a job finishes, so a
+        job that did not start any tasks emits it here instead.  This is
+        queued, so it is emitted after the caller has returned, just like
+        a job that does have tasks.
+        """
+        with self._lock:
+            if not self.isCurrentJob(job_id) or self._num_tasks > 0:
+                return
+        self.jobEmpty.emit(job_id)
+
+    def startTask(self, task):
+        """
+        @task: <LoaderTask> task to run on the pool
+        """
+        with self._lock:
+            if not self.isCurrentJob(task.job_id):
+                return
+            self._num_tasks += 1
+        self._pool.start(task)
+
+    def startParseTasks(self, job_id, json_list, shard=None):
+        """
+        Splits the json list into batches, and creates a worker
+        for each one of them
+        @json_list: <list> of <str> paths to json files
+        @shard: <PendingShard> if provided, the records parsed are
+            added to it as well
+        """
+        batch_size = self.batch_size
+        for index in range(0, len(json_list), batch_size):
+            self.startTask(
+                ParseTask(self, job_id, json_list[index:index + batch_size], shard=shard)
+            )
+
+    @staticmethod
+    def getNumBatches(num_items, batch_size):
+        return (num_items + batch_size - 1) // batch_size
+
+    """ EVENTS """
+
+    def __rowsLoaded(self, job_id, row_list):
+        if not self.isCurrentJob(job_id):
+            return
+        if len(row_list) > 0:
+            self._model.insertJSONRows(row_list)
+
+    def __taskFinished(self, job_id):
+        with self._lock:
+            if not self.isCurrentJob(job_id):
+                return
+            self._num_tasks -= 1
+            num_tasks = self._num_tasks
+        if num_tasks == 0:
+            self.loadFinished.emit()
+
+    def __jobEmpty(self, job_id):
+        if self.isCurrentJob(job_id) and self._num_tasks == 0:
+            self.loadFinished.emit()
+
+    """ PROPERTIES """
+
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    @batch_size.setter
+    def batch_size(self, batch_size):
+        self._batch_size = batch_size
+
+    @property
+    def model(self):
+        return self._model
+
+
+class LoaderTask(QRunnable):
+    """
+    Base class for all of the workers run by the ImageListLoader.
+
+    @loader: <ImageListLoader> loader that started this task
+    @job_id: <int> job this task belongs to
+    """
+    def __init__(self, loader, job_id):
+        super(LoaderTask, self).__init__()
+        self.loader = loader
+        self.job_id = job_id
+
+    def isCancelled(self):
+        return not self.loader.isCurrentJob(self.job_id)
+
+    def run(self):
+        try:
+            self.process()
+        finally:
+            self.loader.taskFinished.emit(self.job_id)
+
+    def process(self):
+        """
+        Abstract method for children, this is where the actual work
+        is done
+        """
+        pass
+
+
+class DirectoryScanTask(LoaderTask):
+    """
+    Lists a single directory, and splits the files found
+    into batches of ParseTasks.  If the directory, and the mtime/size of
+    its files have not changed since it was last scanned, the rows are
+    sent from the ShardCache instead.
+    @filedir: <str> path to directory
+    @recursive: <bool> if True, a new DirectoryScanTask is started
+        for each sub directory found
+    """
+    def __init__(self, loader, job_id, filedir, recursive=False):
+        super(DirectoryScanTask, self).__init__(loader, job_id)
+        self.filedir = filedir
+        self.recursive = recursive
+
+    def process(self):
+        if self.isCancelled():
+            return
+        # stat before listing, so changes made while this is
+        # scanning invalidate the shard
+        try:
+            mtime = os.stat(self.filedir).st_mtime_ns
+        except OSError:
+            return
+
+        try:
+            entries = list(os.scandir(self.filedir))
+        except OSError:
+            return
+
+        # the files are stat'ed before they are parsed as well, so a file
+        # edited in place (which does not change the mtime of the
+        # directory) invalidates the shard
+        files = {}
+        sub_directories = []
+        for entry in entries:
+            filepath = '/'.join([self.filedir, entry.name])
+            try:
+                if entry.is_dir():
+                    sub_directories.append(filepath)
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            files[filepath] = (stat.st_mtime_ns, stat.st_size)
+
+        shard_cache = ShardCache.instance()
+        shard = shard_cache.get(self.filedir, mtime, files)
+        if shard is not None:
+            self.loader.rowsLoaded.emit(self.job_id, list(shard.records))
+            self.startSubDirectoryTasks(shard.sub_directories)
+            return
+
+        json_list = list(files.keys())
+        shard = PendingShard(
+            shard_cache,
+            self.filedir,
+            mtime,
+            files,
+            sub_directories,
+            ImageListLoader.getNumBatches(len(json_list), self.loader.batch_size)
+        )
+        self.startSubDirectoryTasks(sub_directories)
+        self.loader.startParseTasks(self.job_id, json_list, shard=shard)
+
+    def startSubDirectoryTasks(self, sub_directories):
+        if not self.recursive:
+            return
+        for filedir in sub_directories:
+            self.loader.startTask(
+                DirectoryScanTask(self.loader, self.job_id, filedir, recursive=True)
+            )
+
+
+class ParseTask(LoaderTask):
+    """
+    Parses a batch of json files into AssetRecords, and sends all of the
+    valid rows back to the loader in one go.  The proxy directory of
+    each record is listed here as well, so that the views do not have to.
+    @json_list: <list> of <str> paths to json files
+    @shard: <PendingShard> shard of the directory the files are in
+    """
+    def __init__(self, loader, job_id, json_list, shard=None):
+        super(ParseTask, self).__init__(loader, job_id)
+        self.json_list = json_list
+        self.shard = shard
+
+    def process(self):
+        row_list = []
+        for filepath in self.json_list:
+            if self.isCancelled():
+                if self.shard:
+                    self.shard.cancel()
+                return
+            record = AssetRecord.load(filepath)
+            if record is not None:
+                row_list.append(record)
+
+        if self.shard:
+            self.shard.addRecords(row_list)
+        self.loader.rowsLoaded.emit(self.job_id, row_list)
+
+
+class IndexLoadTask(LoaderTask):
+    """
+    Refreshes the LibraryIndex for a directory, and sends all of the rows
+    of the directory, and its sub directories, back to the loader in batches.
+    If the index cannot be read (it is locked by another process, etc), the
+    directory is scanned with a DirectoryScanTask instead.
+    @index: <LibraryIndex>
+    @directory: <str> path to directory
+    """
+    def __init__(self, loader, job_id, index, directory):
+        super(IndexLoadTask, self).__init__(loader, job_id)
+        self.index = index
+        self.directory = directory
+
+    def process(self):
+        if self.isCancelled():
+            return
+        try:
+            self.index.refresh(self.directory)
+            if self.isCancelled():
+                return
+            filedirs_list = [self.directory] + self.index.getDescendantDirectories(self.directory)
+            rows = self.index.getRows(filedirs_list)
+        except sqlite3.Error:
+            self.loader.startTask(
+                DirectoryScanTask(self.loader, self.job_id, self.directory, recursive=True)
+            )
+            return
+
+        batch_size = self.loader.batch_size
+        for start in range(0, len(rows), batch_size):
+            if self.isCancelled():
+                return
+            self.loader.rowsLoaded.emit(self.job_id, rows[start:start + batch_size])
+
+
+class DirectoryLister(QObject):
+    """
+    Lists the sub directories of a directory on a worker thread.  This is
+    used by the DirList to fetch the children of an item when it is
+    expanded, rather than walking the entire library on launch.
+
+    directoryListed is emitted with the directory, and a <list> of
+    <tuple> (name, path, has_children) of its sub directories sorted
+    by name.
+    """
+    directoryListed = Signal(str, object)
+
+    def __init__(self, parent=None):
+        super(DirectoryLister, self).__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pending = set()
+
+        self.directoryListed.connect(self.__directoryListed)
+
+    def listDirectory(self, directory):
+        """
+        @directory: <str> path to directory to list
+        """
+        if directory in self._pending:
+            return
+        self._pending.add(directory)
+        self._pool.start(DirectoryListTask(self, directory))
+
+    def isListing(self, directory):
+        return directory in self._pending
+
+    def waitForDone(self, msecs=-1):
+        """
+        Blocks until all of the directories have been listed, and
+        the results have been delivered
+        """
+        self._pool.waitForDone(msecs)
+        QCoreApplication.processEvents()
+
+    """ EVENTS """
+
+    def __directoryListed(self, directory, children):
+        self._pending.discard(directory)
+
+
+class DirectoryListTask(QRunnable):
+    """
+    Lists the sub directories of a single directory
+    @lister: <DirectoryLister>
+    @directory: <str> path to directory
+    """
+    def __init__(self, lister, directory):
+        super(DirectoryListTask, self).__init__()
+        self.lister = lister
+        self.directory = directory
+
+    @staticmethod
+    def hasSubDirectories(directory):
+        """
+        @return: <bool> True if the directory has at least one
+            sub directory.  This stops at the first one found.
+        """
+        try:
+            for entry in os.scandir(directory):
+                if entry.is_dir():
+                    return True
+        except OSError:
+            pass
+        return False
+
+    def run(self):
+        children = []
+        try:
+            entries = sorted(os.scandir(self.directory), key=lambda entry: entry.name)
+        except OSError:
+            entries = []
+
+        for entry in entries:
+            try:
+                if not entry.is_dir():
+                    continue
+            except OSError:
+                continue
+            path = '/'.join([self.directory, entry.name])
+            children.append((entry.name, path, self.hasSubDirectories(path)))
+
+        try:
+            self.lister.directoryListed.emit(self.directory, children)
+        except RuntimeError:
+            # the DirList has been deleted
+            pass
@@ -0,0 +1,163 @@
+"""
+Hidden / selected state of the ImageListModel.
+
+The hidden and selected items used to be stored as plain lists of file
+paths, which made every membership check (done once per row by every
+view) a linear scan.  They are now stored as PathLists, which are ordered
+sets that keep the list API the rest of the Library was written against.
+"""
+from collections import OrderedDict
+
+
+class PathList(object):
+    """
+    Ordered set of file paths with the API of a <list>.
+
+    Membership, append, and remove are all constant time, and iterating
+    returns the paths in the order they were added.  Positional access
+    (index, [index]) builds a list/row map of the paths the first time it
+    is used, which is then held until the paths change.  As this is a set,
+    appending a path that already exists moves it to the end rather than
+    adding it twice.
+    @paths: <list> of <str> initial paths
+    """
+    def __init__(self, paths=None):
+        self._paths = OrderedDict()
+        self._list = None
+        self._rows = None
+        if paths:
+            self.extend(paths)
+
+    """ LIST API """
+
+    def append(self, path):
+        self._paths.pop(path, None)
+        self._paths[path] = None
+        self.invalidate()
+
+    def extend(self, paths):
+        for path in paths:
+            self.append(path)
+
+    def remove(self, path):
+        try:
+            del self._paths[path]
+        except KeyError:
+            raise ValueError('{path} is not in list'.format(path=path))
+        self.invalidate()
+
+    def index(self, path):
+        if self._rows is None:
+            self._rows = dict((path, row) for row, path in enumerate(self.getList()))
+        try:
+            return self._rows[path]
+        except KeyError:
+            raise ValueError('{path} is not in list'.format(path=path))
+
+    def clear(self):
+        self._paths.clear()
+        self.invalidate()
+
+    def copy(self):
+        return PathList(self)
+
+    """ SET API """
+
+    def add(self, path):
+        """
+        Adds the path, if it already exists its order is left as is
+        """
+        if path not in self._paths:
+            self._paths[path] = None
+            self.invalidate()
+
+    def discard(self, path):
+        if path in self._paths:
+            del self._paths[path]
+            self.invalidate()
+
+    def update(self, paths):
+        for path in paths:
+            self.add(path)
+
+    def difference_update(self, paths):
+        for path in paths:
+            self.discard(path)
+
+    """ UTILS """
+
+    def getList(self):
+        """
+        @return: <list> of the paths, this is shared until the
+            paths change, so it should not be modified
+        """
+        if self._list is None:
+            self._list = list(self._paths)
+        return self._list
+
+    def invalidate(self):
+        """
+        Drops the positional lookups, this is called whenever
+        the paths change
+        """
+        self._list = None
+        self._rows = None
+
+    """ PROTOCOLS """
+
+    def __contains__(self, path):
+        return path in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __bool__(self):
+        return len(self._paths) > 0
+
+    __nonzero__ = __bool__
+
+    def __getitem__(self, index):
+        return self.getList()[index]
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return 'PathList({paths})'.format(paths=list(self._paths))
+
+
+class ImageListMetadata(dict):
+    """
+    Metadata of the ImageListModel
+        metadata['hidden'] = PathList([filepath, filepath])
+        metadata['selected'] = PathList([filepath, filepath])
+
+    Anything assigned to one of the PATH_KEYS is converted to a PathList,
+    so that code assigning a plain list still gets constant time lookups.
+    @PATH_KEYS: <list> of <str> keys whose values are PathLists
+    """
+    PATH_KEYS = ['hidden', 'selected']
+
+    def __init__(self, *args, **kwargs):
+        super(ImageListMetadata, self).__init__()
+        for key in self.PATH_KEYS:
+            self[key] = []
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if key in self.PATH_KEYS and not isinstance(value, PathList):
+            value = PathList(value)
+        return dict.__setitem__(self, key, value)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
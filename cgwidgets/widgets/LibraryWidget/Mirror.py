@@ -0,0 +1,553 @@
+"""
+Local mirror of the proxy images.
+
+When LIBRARY_DIR is on network storage, every thumbnail that is decoded,
+and every frame that is scrubbed, is read across the network, so browsing
+is only as fast as the server.  The ProxyMirror copies the images that the
+Library decodes to a local directory (MIRROR_DIR), and the ThumbnailCache
+reads the local copy instead of the source once it has been mirrored.
+
+Each copy is named after the path, mtime, and size of its source, so a
+source that is edited is simply mirrored again, and the old copy ages out.
+The mirror is LRU evicted once it goes over MIRROR_SIZE.  Sources are only
+stat'd once every MIRROR_REVALIDATE_INTERVAL seconds.
+
+Copies are made on a worker pool:
+    - images that are decoded before they are mirrored are read from
+        the source, and queued to be mirrored
+    - the images of the rows of the directory that is displayed are
+        prefetched in the background (the default images first, and then
+        up to MIRROR_PREFETCH_FRAME_LIMIT frames from the first row down).
+        The rows are enumerated on a worker (MirrorPrefetchTask), as
+        this lists the proxy directories of rows that have not been
+        displayed yet.
+
+A copy is only kept if the source did not change while it was being copied,
+and the copy reads back with the same size and checksum as the source.
+Copies that do not decode are removed, and the source is read instead.
+
+The mirror is disabled by default (MIRROR_ENABLED).
+"""
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from qtpy.QtCore import *
+
+from .__utils__ import iUtils
+
+
+class ProxyMirror(object):
+    """
+    @mirror_dir: <str> path to the local directory the images are copied to
+    @max_bytes: <int> quota of the mirror, once the size of the copies goes
+        over this, the least recently used are removed
+    @revalidate_interval: <float> number of seconds a sources mtime / size
+        is trusted for before it is stat'd again
+    @num_bytes: <int> current size of the mirror
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, mirror_dir=None, max_bytes=None, revalidate_interval=None, thread_count=None):
+        if mirror_dir is None:
+            mirror_dir = ProxyMirror.getDefaultMirrorDir()
+        if max_bytes is None:
+            max_bytes = iUtils.getSetting('MIRROR_SIZE')
+        if revalidate_interval is None:
+            revalidate_interval = iUtils.getSetting('MIRROR_REVALIDATE_INTERVAL')
+        if thread_count is None:
+            thread_count = iUtils.getSetting('MIRROR_THREAD_COUNT')
+        self._mirror_dir = mirror_dir.rstrip('/')
+        self._max_bytes = max_bytes
+        self._revalidate_interval = revalidate_interval
+
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self._sources = {}
+        self._pending = set()
+        self._prefetch_id = 0
+        self._num_bytes = 0
+        self.resetStats()
+
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(thread_count)
+
+        # pick up the copies made by previous sessions, this is not run on
+        # the mirrors pool so that cancelling the prefetches does not drop it
+        QThreadPool.globalInstance().start(MirrorScanTask(self))
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the mirror shared by all of the widgets in this process
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def active(cls):
+        """
+        @return: <ProxyMirror> or None if the mirror is disabled
+        """
+        if not iUtils.getSetting('MIRROR_ENABLED'):
+            return None
+        return cls.instance()
+
+    @staticmethod
+    def getDefaultMirrorDir():
+        mirror_dir = iUtils.getSetting('MIRROR_DIR')
+        if mirror_dir:
+            return mirror_dir
+        return os.environ['HOME'] + '/.library/mirror'
+
+    """ API """
+
+    def resolve(self, path):
+        """
+        Returns the path that should be read for the image provided.  If
+        it has not been mirrored yet, it is queued to be mirrored.  This is
+        safe to call from a worker thread.
+        @path: <str> path to source image
+        @return: <str> path to the local copy, or the source if
+            there is no copy
+        """
+        if not self.isMirrorable(path):
+            return path
+        source = self.statSource(path)
+        if source is None:
+            return path
+
+        local_path = self.getLocalPath(path, *source)
+        with self._lock:
+            if local_path in self._files:
+                self._files.move_to_end(local_path)
+                self._hits += 1
+                return local_path
+
+        # copied before the scan has picked it up
+        if self.getLocalSize(local_path) == source[1]:
+            self.register(local_path, source[1])
+            with self._lock:
+                self._hits += 1
+            return local_path
+
+        with self._lock:
+            self._misses += 1
+        self.request(path)
+        return path
+
+    def getMTime(self, path):
+        """
+        @return: <int> mtime of the source image, this is only stat'd once
+            every revalidate_interval.  None if it does not exist, or is
+            not mirrored.
+        """
+        if not self.isMirrorable(path):
+            return None
+        source = self.statSource(path)
+        if source is None:
+            return None
+        return source[0]
+
+    def request(self, path, priority=0):
+        """
+        Queues the image provided to be mirrored
+        @path: <str> path to source image
+        @priority: <int> priority in the pool, default images are
+            queued ahead of frames
+        """
+        with self._lock:
+            if path in self._pending:
+                return
+            self._pending.add(path)
+        self._pool.start(MirrorTask(self, path), priority)
+
+    def prefetchRecords(self, records, width=None):
+        """
+        Mirrors the images of the assets provided in the background, any
+        prefetches that have not started yet are dropped.
+        @records: <list> of <AssetRecord>
+        @width: <int> width the images are displayed at, if the assets
+            have a pyramid, the level that is displayed is mirrored
+        """
+        self.cancel()
+        num_frames = 0
+        if iUtils.getSetting('MIRROR_PREFETCH_FRAMES'):
+            num_frames = iUtils.getSetting('MIRROR_PREFETCH_FRAME_LIMIT')
+        with self._lock:
+            prefetch_id = self._prefetch_id
+        QThreadPool.globalInstance().start(
+            MirrorPrefetchTask(self, prefetch_id, list(records), width, num_frames)
+        )
+
+    def isCurrentPrefetch(self, prefetch_id):
+        return prefetch_id == self._prefetch_id
+
+    def finishRequest(self, path):
+        with self._lock:
+            self._pending.discard(path)
+
+    def cancel(self):
+        """
+        Drops all of the copies that have not started yet, and stops
+        the prefetch that is queueing them
+        """
+        self._pool.clear()
+        with self._lock:
+            self._pending.clear()
+            self._prefetch_id += 1
+
+    def discard(self, local_path):
+        """
+        Removes a copy that is no longer valid
+        @local_path: <str>
+        """
+        with self._lock:
+            size = self._files.pop(local_path, None)
+            if size is not None:
+                self._num_bytes -= size
+        try:
+            os.remove(local_path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Removes every copy in the mirror
+        """
+        self.cancel()
+        self._pool.waitForDone()
+        with self._lock:
+            local_paths = list(self._files.keys())
+            self._files.clear()
+            self._sources.clear()
+            self._num_bytes = 0
+        for local_path in local_paths:
+            try:
+                os.remove(local_path)
+            except OSError:
+                pass
+
+    def waitForDone(self, msecs=-1):
+        self._pool.waitForDone(msecs)
+
+    """ MIRROR """
+
+    def copy(self, path):
+        """
+        Copies the image provided into the mirror.  This is run on
+        the worker pool.
+        @path: <str> path to source image
+        @return: <bool> True if the image is in the mirror
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        mtime, size = stat.st_mtime_ns, stat.st_size
+        with self._lock:
+            self._sources[path] = (mtime, size, time.time())
+
+        local_path = self.getLocalPath(path, mtime, size)
+        if self.getLocalSize(local_path) == size:
+            self.register(local_path, size)
+            return True
+
+        temp_path = '{path}.{thread}.tmp'.format(path=local_path, thread=threading.get_ident())
+        try:
+            local_dir = os.path.dirname(local_path)
+            if not os.path.isdir(local_dir):
+                os.makedirs(local_dir, exist_ok=True)
+
+            num_bytes = 0
+            checksum = 0
+            with open(path, 'rb') as source_file, open(temp_path, 'wb') as local_file:
+                while True:
+                    chunk = source_file.read(ProxyMirror.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    checksum = zlib.crc32(chunk, checksum)
+                    num_bytes += len(chunk)
+                    local_file.write(chunk)
+
+            # the source changed while it was being copied, or the
+            # copy does not read back the same
+            stat = os.stat(path)
+            is_valid = (
+                (stat.st_mtime_ns, stat.st_size) == (mtime, size)
+                and num_bytes == size
+                and ProxyMirror.getChecksum(temp_path) == checksum
+            )
+            if not is_valid:
+                os.remove(temp_path)
+                with self._lock:
+                    self._failures += 1
+                return False
+
+            os.replace(temp_path, local_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            with self._lock:
+                self._failures += 1
+            return False
+
+        self.register(local_path, size)
+        with self._lock:
+            self._copies += 1
+        return True
+
+    def register(self, local_path, size):
+        """
+        Adds a copy to the mirror as the most recently used, and removes
+        the least recently used copies if it is over quota.
+        """
+        with self._lock:
+            if local_path in self._files:
+                self._num_bytes -= self._files.pop(local_path)
+            self._files[local_path] = size
+            self._num_bytes += size
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used copies until the mirror is under quota
+        """
+        removed = []
+        with self._lock:
+            while self._num_bytes > self._max_bytes and len(self._files) > 1:
+                local_path, size = self._files.popitem(last=False)
+                self._num_bytes -= size
+                self._evictions += 1
+                removed.append(local_path)
+        for local_path in removed:
+            try:
+                os.remove(local_path)
+            except OSError:
+                pass
+
+    def scan(self):
+        """
+        Adds the copies made by previous sessions to the mirror, least
+        recently modified first.  Copies that were left half written,
+        or that are not the size they are named as, are removed.
+        """
+        found = []
+        for root, dirs, files in os.walk(self._mirror_dir):
+            for filename in files:
+                local_path = '/'.join([root, filename])
+                try:
+                    stat = os.stat(local_path)
+                except OSError:
+                    continue
+                expected_size = ProxyMirror.getExpectedSize(filename)
+                if filename.endswith('.tmp') or expected_size != stat.st_size:
+                    try:
+                        os.remove(local_path)
+                    except OSError:
+                        pass
+                    continue
+                found.append((stat.st_mtime_ns, local_path, stat.st_size))
+
+        found.sort()
+        with self._lock:
+            files = OrderedDict()
+            for mtime, local_path, size in found:
+                if local_path not in self._files:
+                    files[local_path] = size
+                    self._num_bytes += size
+            files.update(self._files)
+            self._files = files
+        self.evict()
+
+    """ UTILS """
+
+    def isMirrorable(self, path):
+        return bool(path) and not path.startswith(self._mirror_dir + '/')
+
+    def statSource(self, path):
+        """
+        @return: <tuple> (mtime, size) of the source image, or None if it
+            does not exist.  This is only stat'd once every
+            revalidate_interval.
+        """
+        now = time.time()
+        with self._lock:
+            source = self._sources.get(path)
+        if source is not None and now - source[2] < self._revalidate_interval:
+            return source[:2]
+
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            with self._lock:
+                self._sources.pop(path, None)
+            return None
+        source = (stat.st_mtime_ns, stat.st_size, now)
+        with self._lock:
+            self._sources[path] = source
+        return source[:2]
+
+    def getLocalPath(self, path, mtime, size):
+        """
+        @return: <str> path the copy of the source provided is stored at
+        """
+        digest = hashlib.sha1('{path}:{mtime}'.format(path=path, mtime=mtime).encode('utf-8')).hexdigest()
+        filename = '{digest}_{size}{ext}'.format(
+            digest=digest, size=size, ext=os.path.splitext(path)[1]
+        )
+        return '/'.join([self._mirror_dir, digest[:2], filename])
+
+    @staticmethod
+    def getLocalSize(local_path):
+        try:
+            return os.stat(local_path).st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def getExpectedSize(filename):
+        """
+        @return: <int> size of the source the copy provided was made from,
+            or None if this is not a copy
+        """
+        name = os.path.splitext(filename)[0]
+        try:
+            return int(name.rsplit('_', 1)[1])
+        except (IndexError, ValueError):
+            return None
+
+    @staticmethod
+    def getChecksum(filepath):
+        checksum = 0
+        with open(filepath, 'rb') as f:
+            while True:
+                chunk = f.read(ProxyMirror.CHUNK_SIZE)
+                if not chunk:
+                    return checksum
+                checksum = zlib.crc32(chunk, checksum)
+
+    """ STATS """
+
+    def stats(self):
+        """
+        @return: <dict> of the hits, misses, copies, failures, evictions,
+            number of copies (count), and size of the mirror (num_bytes)
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'copies': self._copies,
+                'failures': self._failures,
+                'evictions': self._evictions,
+                'count': len(self._files),
+                'num_bytes': self._num_bytes
+            }
+
+    def resetStats(self):
+        self._hits = 0
+        self._misses = 0
+        self._copies = 0
+        self._failures = 0
+        self._evictions = 0
+
+    """ PROPERTIES """
+
+    @property
+    def mirror_dir(self):
+        return self._mirror_dir
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        self._max_bytes = max_bytes
+        self.evict()
+
+    @property
+    def num_bytes(self):
+        return self._num_bytes
+
+
+class MirrorTask(QRunnable):
+    """
+    Copies a single image into the mirror
+    @mirror: <ProxyMirror>
+    @path: <str> path to source image
+    """
+    def __init__(self, mirror, path):
+        super(MirrorTask, self).__init__()
+        self.mirror = mirror
+        self.path = path
+
+    def run(self):
+        try:
+            self.mirror.copy(self.path)
+        finally:
+            self.mirror.finishRequest(self.path)
+
+
+class MirrorPrefetchTask(QRunnable):
+    """
+    Queues the images of the assets provided to be mirrored.  This is
+    run on the global pool, so that cancelling the copies does not drop it,
+    and stops as soon as another prefetch is started.
+    @mirror: <ProxyMirror>
+    @prefetch_id: <int> prefetch this task belongs to
+    @records: <list> of <AssetRecord>
+    @width: <int> width the images are displayed at
+    @num_frames: <int> max number of frames to queue, after the default images
+    """
+    def __init__(self, mirror, prefetch_id, records, width, num_frames):
+        super(MirrorPrefetchTask, self).__init__()
+        self.mirror = mirror
+        self.prefetch_id = prefetch_id
+        self.records = records
+        self.width = width
+        self.num_frames = num_frames
+
+    def isCancelled(self):
+        return not self.mirror.isCurrentPrefetch(self.prefetch_id)
+
+    def run(self):
+        for record in self.records:
+            if self.isCancelled():
+                return
+            default_image = record.default_image
+            if default_image:
+                self.mirror.request(record.getDisplayPath(default_image, self.width), priority=1)
+
+        num_frames = self.num_frames
+        for record in self.records:
+            for index in range(len(record.proxy_list)):
+                if num_frames <= 0 or self.isCancelled():
+                    return
+                image_path = record.getImagePath(index)
+                self.mirror.request(record.getDisplayPath(image_path, self.width))
+                num_frames -= 1
+
+
+class MirrorScanTask(QRunnable):
+    """
+    Picks up the copies made by previous sessions
+    @mirror: <ProxyMirror>
+    """
+    def __init__(self, mirror):
+        super(MirrorScanTask, self).__init__()
+        self.mirror = mirror
+
+    def run(self):
+        self.mirror.scan()
@@ -0,0 +1,351 @@
+"""
+Read-ahead of the proxy frames while scrubbing.
+
+Scrubbing an image calls setImage() for every step the mouse moves, and
+loading each frame from disk on the GUI thread stutters on network storage.
+Each image that is scrubbed gets a FramePrefetcher, which decodes the frames
+around the current position on a background thread into a bounded ring, so
+that by the time the cursor gets to a frame it has already been decoded.
+
+The window of frames requested is widened in the direction the user is
+scrubbing, and every time the position changes the pending requests are
+replaced, so frames the cursor has already jumped past are never decoded.
+"""
+import threading
+from collections import deque
+
+from qtpy.QtCore import *
+from qtpy.QtGui import *
+
+from .__utils__ import iUtils
+from .ThumbnailCache import ThumbnailCache
+
+
+class FramePrefetcher(QObject):
+    """
+    @image_dir: <str> path to the directory containing the proxy sequence
+    @image_list: <list> of <str> names of the frames in the image_dir
+    @image_width: <int> width the frames are displayed at
+    @ring_size: <int> max number of frames held at once
+    @ahead: <int> number of frames requested in the direction of motion
+    @behind: <int> number of frames requested behind the direction of motion
+    @position: <int> index of the frame currently displayed
+    @direction: <int> 1 if scrubbing forwards, -1 if backwards, 0 if unknown
+    @record: <AssetRecord> if provided, the frames are decoded from the
+        level of its thumbnail pyramid that covers the image_width
+    """
+    frameDecoded = Signal(int, int, object, object)
+
+    _pool = None
+
+    def __init__(
+        self,
+        parent=None,
+        image_dir=None,
+        image_list=None,
+        image_width=None,
+        ring_size=None,
+        ahead=None,
+        behind=None,
+        record=None
+    ):
+        super(FramePrefetcher, self).__init__(parent)
+        if ring_size is None:
+            ring_size = iUtils.getSetting('PREFETCH_RING_SIZE')
+        if ahead is None:
+            ahead = iUtils.getSetting('PREFETCH_AHEAD')
+        if behind is None:
+            behind = iUtils.getSetting('PREFETCH_BEHIND')
+
+        self._image_dir = image_dir
+        self._image_list = image_list or []
+        self._image_width = image_width
+        self._record = record
+        self._ring_size = ring_size
+        self._ahead = ahead
+        self._behind = behind
+
+        self._ring = {}
+        self._position = None
+        self._direction = 0
+        self._generation = 0
+        self._requests = deque()
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._num_tasks = 0
+        self.resetStats()
+
+        self.frameDecoded.connect(self.__frameDecoded)
+
+    @classmethod
+    def pool(cls):
+        """
+        Returns the thread pool shared by all of the prefetchers, so that
+        scrubbing many images at once does not create a thread for each one
+        """
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(iUtils.getSetting('PREFETCH_THREAD_COUNT'))
+        return cls._pool
+
+    """ API """
+
+    def pixmap(self, index):
+        """
+        Returns the frame at the index provided.  If it has not been
+        prefetched, it is loaded on the GUI thread.
+        @index: <int>
+        @return: <QPixmap>
+        """
+        index = self.wrapIndex(index)
+        try:
+            pixmap = self._ring[index]
+            self._hits += 1
+            return pixmap
+        except KeyError:
+            self._misses += 1
+
+        pixmap = ThumbnailCache.instance().pixmap(self.getDecodePath(index), self.image_width)
+        self.insert(index, pixmap)
+        return pixmap
+
+    def setPosition(self, index):
+        """
+        Updates the current position, and requests all of the frames
+        in the window around it that have not been decoded yet.  Any
+        requests that are still pending are dropped.
+        @index: <int>
+        """
+        index = self.wrapIndex(index)
+        if self._position is not None and index != self._position:
+            step = self.getOffset(self._position, index)
+            self._direction = 1 if step > 0 else -1
+
+            # cursor jumped, anything in flight is stale
+            if abs(step) > max(self._ahead, self._behind):
+                self._generation += 1
+        self._position = index
+
+        with self._lock:
+            self._requests = deque(
+                frame for frame in self.getWindow()
+                if frame not in self._ring and frame not in self._in_flight
+            )
+            num_tasks = min(
+                self.pool().maxThreadCount() - self._num_tasks,
+                len(self._requests)
+            )
+            self._num_tasks += max(num_tasks, 0)
+        for _ in range(num_tasks):
+            self.pool().start(PrefetchTask(self))
+
+    def cancel(self):
+        """
+        Drops all of the pending requests
+        """
+        with self._lock:
+            self._generation += 1
+            self._requests.clear()
+
+    def clear(self):
+        self.cancel()
+        self._ring.clear()
+        self._position = None
+        self._direction = 0
+
+    """ UTILS """
+
+    def getImagePath(self, index):
+        return '/'.join([self._image_dir, self._image_list[index]])
+
+    def getDecodePath(self, index):
+        """
+        @return: <str> path to the image that is decoded for the frame
+            provided, this is the pyramid level if there is one
+        """
+        image_path = self.getImagePath(index)
+        if self._record is None:
+            return image_path
+        return self._record.getDisplayPath(image_path, self.image_width)
+
+    def wrapIndex(self, index):
+        if len(self._image_list) == 0:
+            return 0
+        return index % len(self._image_list)
+
+    def getOffset(self, old_index, new_index):
+        """
+        @return: <int> shortest number of frames between the two indexes,
+            taking into account that the sequence loops
+        """
+        num_frames = len(self._image_list)
+        offset = (new_index - old_index) % num_frames
+        if offset > num_frames // 2:
+            offset -= num_frames
+        return offset
+
+    def getWindow(self):
+        """
+        @return: <list> of <int> indexes of the frames that should be
+            decoded, in the order they should be decoded.  This alternates
+            from the current position outwards, favouring the direction of
+            motion.
+        """
+        num_frames = len(self._image_list)
+        if num_frames == 0 or self._position is None:
+            return []
+
+        if self._direction == 0:
+            ahead = behind = max(self._ahead, self._behind) // 2
+        else:
+            ahead, behind = self._ahead, self._behind
+        direction = self._direction or 1
+
+        # keep the window inside of the ring
+        ahead = min(ahead, self._ring_size - 1)
+        behind = min(behind, self._ring_size - 1 - ahead)
+
+        window = [self._position]
+        for offset in range(1, max(ahead, behind) + 1):
+            if offset <= ahead:
+                window.append(self.wrapIndex(self._position + offset * direction))
+            if offset <= behind:
+                window.append(self.wrapIndex(self._position - offset * direction))
+
+        # remove duplicates for sequences shorter than the window
+        frames = []
+        for frame in window:
+            if frame not in frames:
+                frames.append(frame)
+        return frames
+
+    def insert(self, index, pixmap):
+        """
+        Adds the frame to the ring, if the ring is full the frames
+        that are furthest from the current position are removed.
+        """
+        self._ring[index] = pixmap
+        if len(self._ring) <= self._ring_size:
+            return
+
+        position = self._position if self._position is not None else index
+        frames = sorted(
+            self._ring.keys(),
+            key=lambda frame: abs(self.getOffset(position, frame))
+        )
+        for frame in frames[self._ring_size:]:
+            del self._ring[frame]
+            self._evictions += 1
+
+    def takeRequest(self):
+        """
+        Called by the PrefetchTask to get the next frame to decode
+        @return: <tuple> (generation, index), index is None if there
+            is nothing left to do
+        """
+        with self._lock:
+            if len(self._requests) == 0:
+                self._num_tasks -= 1
+                return self._generation, None
+            index = self._requests.popleft()
+            self._in_flight.add(index)
+            return self._generation, index
+
+    def isCurrentGeneration(self, generation):
+        return generation == self._generation
+
+    """ STATS """
+
+    def stats(self):
+        """
+        @return: <dict> of the counters for this prefetcher
+        """
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self.hitRate(),
+            'decoded': self._decoded,
+            'dropped': self._dropped,
+            'evictions': self._evictions,
+            'count': len(self._ring)
+        }
+
+    def hitRate(self):
+        """
+        @return: <float> ratio of the frames displayed that had already
+            been prefetched
+        """
+        total = self._hits + self._misses
+        if total == 0:
+            return 0.0
+        return self._hits / float(total)
+
+    def resetStats(self):
+        self._hits = 0
+        self._misses = 0
+        self._decoded = 0
+        self._dropped = 0
+        self._evictions = 0
+
+    """ EVENTS """
+
+    def __frameDecoded(self, generation, index, key, image):
+        with self._lock:
+            self._in_flight.discard(index)
+        if not self.isCurrentGeneration(generation) or image.isNull():
+            self._dropped += 1
+            return
+        self._decoded += 1
+        if key is None:
+            pixmap = QPixmap.fromImage(image)
+        else:
+            pixmap = ThumbnailCache.instance().insert(key, image)
+        self.insert(index, pixmap)
+
+    """ PROPERTIES """
+
+    @property
+    def image_width(self):
+        return self._image_width
+
+    @property
+    def image_list(self):
+        return self._image_list
+
+    @property
+    def position(self):
+        return self._position
+
+    @property
+    def direction(self):
+        return self._direction
+
+
+class PrefetchTask(QRunnable):
+    """
+    Decodes the frames requested by a FramePrefetcher until there are no
+    requests left.  Each prefetcher runs at most one of these per thread
+    in the pool.
+    @prefetcher: <FramePrefetcher>
+    """
+    def __init__(self, prefetcher):
+        super(PrefetchTask, self).__init__()
+        self.prefetcher = prefetcher
+
+    def run(self):
+        prefetcher = self.prefetcher
+        width = prefetcher.image_width
+        while True:
+            generation, index = prefetcher.takeRequest()
+            if index is None:
+                return
+
+            path = prefetcher.getDecodePath(index)
+            key = ThumbnailCache.getKey(path, width)
+            image = ThumbnailCache.decodeImage(path, width)
+            try:
+                prefetcher.frameDecoded.emit(generation, index, key, image)
+            except RuntimeError:
+                # the image this was prefetching for has been deleted
+                prefetcher.cancel()
+                return
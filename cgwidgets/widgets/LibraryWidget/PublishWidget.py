@@ -5,6 +5,7 @@ from qtpy.QtWidgets import *
 from qtpy.QtCore import *
 
 from .__utils__ import iUtils
+from .Pyramid import ThumbnailPyramid
 from cgwidgets import utils as gUtils
 
 class PublishWidget(QWidget):
@@ -117,6 +118,12 @@ class PublishWidget(QWidget):
         self.publish_dir = UserInputLineEdit(name='Publish Directory')
         container.layout().addWidget(self.publish_dir)
 
+        # add thumbnail pyramid option
+        self.build_pyramid = UserInputCheckBox(
+            name='Build Thumbnails', checked=iUtils.getSetting('PYRAMID_ON_PUBLISH')
+        )
+        container.layout().addWidget(self.build_pyramid)
+
         # create publish button
         self.publish_button = QPushButton('Publish')
         self.publish_button.clicked.connect(self.publish)
@@ -140,6 +147,12 @@ class PublishWidget(QWidget):
             value = widget.getValue()
             publish_file[option] = value
 
+        # pre scale the proxy images for the views
+        if self.build_pyramid.getValue() and publish_file.get('proxy'):
+            pyramid = ThumbnailPyramid.build(publish_file['proxy'])
+            if pyramid:
+                publish_file['pyramid'] = pyramid
+
         filedir = self.publish_dir.getValue()
         with open(filedir, 'w') as f:
             json.dump(publish_file, f, sort_keys=True, indent=4)
@@ -200,6 +213,18 @@ class UserInputDropDown(UserInput):
         return self.user_input.currentText()
 
 
+class UserInputCheckBox(UserInput):
+    def __init__(self, parent=None, name=None, checked=False):
+        super(UserInputCheckBox, self).__init__(parent, name=name)
+
+        self.user_input = QCheckBox()
+        self.user_input.setChecked(checked)
+        self.layout().addWidget(self.user_input)
+
+    def getValue(self):
+        return self.user_input.isChecked()
+
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     main = PublishWidget()
@@ -0,0 +1,304 @@
+"""
+Pre scaled thumbnails of the proxy images.
+
+The proxies of an asset are whatever format the publisher wrote (usually
+large exrs), and every view scales them down to one of the IMAGE_SIZES
+each time they are displayed.  A thumbnail pyramid is a copy of every
+proxy image at each of the IMAGE_SIZES widths, written in a format that is
+fast to decode (jpg, or png if the image has an alpha channel).  The views
+then decode the smallest level that is at least as wide as the size they
+are displaying, rather than the proxy.
+
+The pyramid is written next to the proxy directory, and recorded in the
+json file of the asset as
+    "pyramid": {
+        "dir": <str> path to the pyramid,
+        "format": <str> extension of the images,
+        "levels": <list> of <int> widths that were written,
+        "skipped": <list> of <str> names of the proxy images that could
+            not be decoded, these are displayed from the proxy
+    }
+where each level is stored as <dir>/<width>/<proxy image name>.<format>
+
+A level that is missing, or older than its proxy image (the proxy was
+republished after the pyramid was built), is not used, and the proxy
+image is displayed instead.
+
+Pyramids are built by the PublishWidget when publishing, and can be built
+for an existing library with
+    python -m cgwidgets.widgets.LibraryWidget.Pyramid /path/to/library
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from qtpy.QtCore import *
+from qtpy.QtGui import *
+
+from .__utils__ import iUtils
+
+
+class ThumbnailPyramid(object):
+    """
+    @pyramid: <dict> pyramid entry of an assets json file
+    """
+    def __init__(self, pyramid):
+        self._dir = pyramid['dir']
+        self._format = pyramid['format']
+        self._levels = sorted(int(level) for level in pyramid['levels'])
+        self._skipped = frozenset(pyramid.get('skipped') or ())
+
+    @classmethod
+    def fromRecord(cls, record):
+        """
+        @record: <AssetRecord> or <dict> json data of an asset
+        @return: <ThumbnailPyramid> or None if the asset has no pyramid
+        """
+        pyramid = record.get('pyramid')
+        if not pyramid:
+            return None
+        try:
+            return cls(pyramid)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    """ API """
+
+    def getLevel(self, width):
+        """
+        @width: <int> width the image will be displayed at
+        @return: <int> the smallest level that is at least as wide as the
+            width provided, or None if they are all too small
+        """
+        for level in self._levels:
+            if level >= width:
+                return level
+        return None
+
+    def getImagePath(self, image_name, width):
+        """
+        @image_name: <str> name of the image in the proxy directory
+        @width: <int> width the image will be displayed at
+        @return: <str> path to the image in the pyramid, or None if
+            there is no level large enough, or the image was not written
+        """
+        if image_name in self._skipped:
+            return None
+        level = self.getLevel(width)
+        if level is None:
+            return None
+        return self.getLevelPath(self._dir, level, image_name, self._format)
+
+    """ BUILD """
+
+    @staticmethod
+    def getDefaultLevels():
+        return sorted(set(int(size) for size in iUtils.getSetting('IMAGE_SIZES').values()))
+
+    @staticmethod
+    def getPyramidDir(proxy_dir):
+        return proxy_dir.rstrip('/') + '_pyramid'
+
+    @staticmethod
+    def getLevelPath(pyramid_dir, level, image_name, image_format):
+        name = os.path.splitext(image_name)[0]
+        return '/'.join([pyramid_dir, str(level), '{name}.{ext}'.format(name=name, ext=image_format)])
+
+    @staticmethod
+    def build(proxy_dir, image_list=None, levels=None, image_format=None, quality=None, num_threads=None):
+        """
+        Writes the pyramid of every image in the proxy directory.  Each
+        proxy is decoded once, at the size of the largest level, and the
+        smaller levels are scaled down from that.
+        @proxy_dir: <str> path to the proxy directory
+        @image_list: <list> of <str> names of the images to write, if not
+            provided, this will be every file in the proxy directory
+        @levels: <list> of <int> widths to write, defaults to the IMAGE_SIZES
+        @image_format: <str> extension of the images written
+        @quality: <int> 0-100 compression quality
+        @num_threads: <int> number of images decoded at once
+        @return: <dict> pyramid entry for the json file, or None if
+            there was nothing to write
+        """
+        if levels is None:
+            levels = ThumbnailPyramid.getDefaultLevels()
+        if image_format is None:
+            image_format = iUtils.getSetting('PYRAMID_FORMAT')
+        if quality is None:
+            quality = iUtils.getSetting('PYRAMID_QUALITY')
+        if image_list is None:
+            try:
+                image_list = sorted(os.listdir(proxy_dir))
+            except OSError:
+                return None
+        levels = sorted(set(int(level) for level in levels))
+        if not image_list or not levels:
+            return None
+
+        # jpgs can not store the alpha channel
+        if image_format.lower() in ('jpg', 'jpeg'):
+            if ThumbnailPyramid.hasAlphaChannel('/'.join([proxy_dir, image_list[0]])):
+                image_format = 'png'
+
+        pyramid_dir = ThumbnailPyramid.getPyramidDir(proxy_dir)
+        for level in levels:
+            level_dir = '/'.join([pyramid_dir, str(level)])
+            if not os.path.isdir(level_dir):
+                os.makedirs(level_dir)
+
+        def buildImage(image_name):
+            return ThumbnailPyramid.buildImage(
+                '/'.join([proxy_dir, image_name]), pyramid_dir, levels, image_format, quality
+            )
+
+        with ThreadPoolExecutor(max_workers=num_threads or QThread.idealThreadCount()) as executor:
+            results = list(executor.map(buildImage, image_list))
+
+        # only record the levels that every image was written at, images
+        # that could not be decoded are recorded as skipped, so they are
+        # displayed from the proxy rather than a level that does not exist
+        written = [set(result) for result in results if result is not None]
+        skipped = [image_name for image_name, result in zip(image_list, results) if result is None]
+        if not written:
+            return None
+        written_levels = sorted(set.intersection(*written))
+        if not written_levels:
+            return None
+
+        return {
+            'dir': pyramid_dir,
+            'format': image_format,
+            'levels': written_levels,
+            'skipped': skipped
+        }
+
+    @staticmethod
+    def hasAlphaChannel(image_path):
+        """
+        @return: <bool> True if the image has an alpha channel, this
+            decodes a small version of the image to check
+        """
+        reader = QImageReader(image_path)
+        size = reader.size()
+        if size.isValid() and size.width() > 16:
+            reader.setScaledSize(QSize(16, max(1, size.height() * 16 // size.width())))
+        return reader.read().hasAlphaChannel()
+
+    @staticmethod
+    def buildImage(image_path, pyramid_dir, levels, image_format, quality):
+        """
+        Writes a single proxy image at each of the levels provided.  Levels
+        wider than the image are skipped, as they would only upscale it.
+        @return: <list> of <int> levels written, or None if the image could
+            not be read
+        """
+        reader = QImageReader(image_path)
+        size = reader.size()
+        max_level = levels[-1]
+        if size.isValid() and max_level < size.width():
+            height = max(1, int(round(size.height() * max_level / size.width())))
+            reader.setScaledSize(QSize(max_level, height))
+        image = reader.read()
+        if image.isNull():
+            return None
+        source_width = size.width() if size.isValid() else image.width()
+
+        image_name = os.path.basename(image_path)
+        written = []
+        for level in reversed(levels):
+            if level > source_width:
+                continue
+            if image.width() != level:
+                image = image.scaledToWidth(level, Qt.SmoothTransformation)
+            level_path = ThumbnailPyramid.getLevelPath(pyramid_dir, level, image_name, image_format)
+            if image.save(level_path, None, quality):
+                written.append(level)
+        return written
+
+    """ PROPERTIES """
+
+    @property
+    def dir(self):
+        return self._dir
+
+    @property
+    def format(self):
+        return self._format
+
+    @property
+    def levels(self):
+        return list(self._levels)
+
+    @property
+    def skipped(self):
+        return sorted(self._skipped)
+
+
+def buildLibrary(library_dir, levels=None, image_format=None, quality=None, force=False, log=print):
+    """
+    Builds the pyramid of every asset in the library, and records
+    it in the assets json file.
+    @library_dir: <str> path to the library
+    @force: <bool> if True, assets that already have a pyramid are rebuilt
+    @return: <int> number of assets built
+    """
+    num_built = 0
+    for root, dirs, files in os.walk(library_dir):
+        for filename in sorted(files):
+            filepath = '/'.join([root, filename])
+            try:
+                with open(filepath, 'r') as f:
+                    jsondata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(jsondata, dict) or not jsondata.get('proxy'):
+                continue
+            if jsondata.get('pyramid') and not force:
+                continue
+
+            pyramid = ThumbnailPyramid.build(
+                jsondata['proxy'], levels=levels, image_format=image_format, quality=quality
+            )
+            if pyramid is None:
+                log('skipped {filepath}'.format(filepath=filepath))
+                continue
+
+            jsondata['pyramid'] = pyramid
+            temp_file = filepath + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(jsondata, f, sort_keys=True, indent=4)
+            os.replace(temp_file, filepath)
+            num_built += 1
+            log('built {filepath} {levels}'.format(filepath=filepath, levels=pyramid['levels']))
+    return num_built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Builds the thumbnail pyramids of all of the assets in a library'
+    )
+    parser.add_argument('library_dir', nargs='+', help='path to the library')
+    parser.add_argument('--levels', type=int, nargs='+', help='widths to write, defaults to IMAGE_SIZES')
+    parser.add_argument('--format', dest='image_format', help='image format, defaults to PYRAMID_FORMAT')
+    parser.add_argument('--quality', type=int, help='compression quality, defaults to PYRAMID_QUALITY')
+    parser.add_argument('--force', action='store_true', help='rebuild existing pyramids')
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    num_built = 0
+    for library_dir in args.library_dir:
+        num_built += buildLibrary(
+            library_dir,
+            levels=args.levels,
+            image_format=args.image_format,
+            quality=args.quality,
+            force=args.force
+        )
+    print('built {num} pyramids'.format(num=num_built))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Query engine for the SearchBar.
+
+The search text is parsed once into a SearchQuery, which holds a list of
+(key, terms) pairs, where each term has already been compiled.  The query is
+then run against a SearchIndex built from the rows of the ImageListModel.
+
+Plain tokens (terms without any regex special characters) on the indexed
+keys (name/type/notes) are answered from a trigram inverted index, and the
+regex is only run for the terms that actually need it.  The result is
+returned as a row bitset (an int, where bit N is set if row N matches).
+
+Syntax:
+    columnname{regex, regex}columnname{regex, regex}
+    if ANY of the regexes match (re.search), the row is displayed.
+"""
+import re
+from collections import defaultdict
+
+
+REGEX_SPECIAL_CHARACTERS = set('.^$*+?{}[]\\|()')
+
+
+def rowsToBitset(rows):
+    """
+    @rows: <iterable> of <int> row numbers
+    @return: <int> bitset with the bits of the rows provided set
+    """
+    rows = list(rows)
+    if len(rows) == 0:
+        return 0
+    bits = bytearray((max(rows) >> 3) + 1)
+    for row in rows:
+        bits[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(bytes(bits), 'little')
+
+
+def bitsetToRows(bitset):
+    """
+    @bitset: <int>
+    @return: <list> of <int> rows whose bits are set, in order
+    """
+    rows = []
+    if bitset <= 0:
+        return rows
+    data = bitset.to_bytes((bitset.bit_length() + 7) >> 3, 'little')
+    for byte_index, byte in enumerate(data):
+        if byte:
+            row = byte_index << 3
+            for bit in range(8):
+                if byte & (1 << bit):
+                    rows.append(row + bit)
+    return rows
+
+
+class SearchTerm(object):
+    """
+    Single term (regex) of a search parameter
+    @text: <str> text typed by the user
+    @pattern: <re.Pattern> compiled regex, this is None for
+        plain tokens
+    """
+    def __init__(self, text):
+        self.text = text
+        self.pattern = None
+        if not self.isToken():
+            try:
+                self.pattern = re.compile(text)
+            except re.error:
+                # invalid regex, match it literally
+                self.pattern = re.compile(re.escape(text))
+
+    def isToken(self):
+        """
+        @return: <bool> True if this term has no regex special characters,
+            and can be matched as a plain substring
+        """
+        return not any(char in REGEX_SPECIAL_CHARACTERS for char in self.text)
+
+
+class SearchQuery(object):
+    """
+    Compiled plan of the text typed into the SearchBar
+    @params: <list> of <tuple> (key, <list> of <SearchTerm>)
+    """
+    def __init__(self, params=None):
+        if not params:
+            params = []
+        self._params = params
+
+    @classmethod
+    def parse(cls, user_search_text):
+        """
+        @user_search_text: < str >
+            string input from the user in the search bar widget
+            this should be in the format of
+                jsonkey{regex, regex, regex}
+                ie
+                    name{.*}
+        @return: <SearchQuery>
+        """
+        params = []
+        for search_param in user_search_text.replace(' ', '').split('}')[:-1]:
+            # test{asdf,asdf,asdf}
+            try:
+                key, user_regex = search_param.split('{', 1)
+            except ValueError:
+                continue
+            terms = [SearchTerm(text) for text in user_regex.split(',')]
+            params.append((key, terms))
+
+        return cls(params)
+
+    def isEmpty(self):
+        return len(self._params) == 0
+
+    def execute(self, search_index):
+        """
+        Runs the query on the index provided
+        @search_index: <SearchIndex>
+        @return: <int> bitset of all of the rows that matched
+        """
+        bitset = 0
+        for key, terms in self._params:
+            for term in terms:
+                bitset |= search_index.match(key, term)
+        return bitset
+
+    @property
+    def params(self):
+        return self._params
+
+
+class SearchIndex(object):
+    """
+    Index of the rows in an ImageListModel that queries are run against.
+
+    The values for each key are gathered the first time that key is
+    searched, and the trigram index for the INDEXED_KEYS is also built
+    the first time it is needed.
+    @row_list: <list> of <dict> json data
+    @INDEXED_KEYS: <list> of <str> keys that have an inverted index, the
+        PublishWidget writes the notes to 'note', while older assets
+        use 'notes', so both are indexed
+    """
+    INDEXED_KEYS = ['name', 'type', 'note', 'notes']
+
+    def __init__(self, row_list):
+        self._row_list = row_list
+        self._values = {}
+        self._trigrams = {}
+
+    def getValues(self, key):
+        """
+        @return: <list> of the value of each row for the key provided.  If the
+            key does not exist, or is not a string, the value is None.
+        """
+        try:
+            return self._values[key]
+        except KeyError:
+            values = []
+            for jsondata in self._row_list:
+                value = jsondata.get(key)
+                values.append(value if isinstance(value, str) else None)
+            self._values[key] = values
+            return values
+
+    def getTrigrams(self, key):
+        """
+        @return: <dict> of trigram: <set> of rows whose value contains it
+        """
+        try:
+            return self._trigrams[key]
+        except KeyError:
+            trigrams = defaultdict(set)
+            for row, value in enumerate(self.getValues(key)):
+                if value is None:
+                    continue
+                for index in range(len(value) - 2):
+                    trigrams[value[index:index + 3]].add(row)
+
+            self._trigrams[key] = trigrams
+            return trigrams
+
+    def match(self, key, term):
+        """
+        @key: <str> json key
+        @term: <SearchTerm>
+        @return: <int> bitset of the rows that matched
+        """
+        if term.isToken():
+            if key in self.INDEXED_KEYS:
+                return rowsToBitset(self.matchToken(key, term.text))
+            return rowsToBitset(self.matchSubstring(key, term.text))
+        return rowsToBitset(self.matchPattern(key, term.pattern))
+
+    def matchToken(self, key, token):
+        """
+        Finds all of the rows that contain the token provided.  If the token
+        is long enough, the candidates are found with the trigram index, and
+        only they are checked.
+        @return: <list> of <int> rows
+        """
+        if len(token) < 3:
+            return self.matchSubstring(key, token)
+        values = self.getValues(key)
+
+        trigrams = self.getTrigrams(key)
+        posting_lists = []
+        for index in range(len(token) - 2):
+            rows = trigrams.get(token[index:index + 3])
+            if not rows:
+                return []
+            posting_lists.append(rows)
+        posting_lists.sort(key=len)
+        candidates = set.intersection(*posting_lists)
+
+        # a single trigram is an exact match
+        if len(token) == 3:
+            return candidates
+        return [row for row in candidates if token in values[row]]
+
+    def matchSubstring(self, key, token):
+        """
+        @return: <list> of <int> rows that contain the token provided
+        """
+        return [
+            row for row, value in enumerate(self.getValues(key))
+            if value is not None and token in value
+        ]
+
+    def matchPattern(self, key, pattern):
+        """
+        @pattern: <re.Pattern>
+        @return: <list> of <int> rows
+        """
+        search = pattern.search
+        return [
+            row for row, value in enumerate(self.getValues(key))
+            if value is not None and search(value)
+        ]
+
+    @property
+    def row_list(self):
+        return self._row_list
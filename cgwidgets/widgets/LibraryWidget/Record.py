@@ -0,0 +1,206 @@
+"""
+Parse once records of the assets in the library.
+
+Every row of the ImageListModel is an AssetRecord.  A record is created
+once per json file (on the loader's worker threads when possible), and then
+handed to every widget that displays that asset, so building a view does not
+need to read the json file, or list the proxy directory again.
+"""
+import os
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from .__utils__ import iUtils
+from .Pyramid import ThumbnailPyramid
+from .ThumbnailCache import ThumbnailCache
+
+
+class AssetRecord(Mapping):
+    """
+    Immutable record of a single asset.  This is a read only mapping of
+    the json data, so it can be used anywhere the json <dict> was used
+    before (record['name'], record.get('notes'), etc).
+
+    The proxy and frame directories are listed the first time they are
+    needed, and the result is held for the life of the record.
+
+    @filepath: <str> path to the json file
+    @proxy_dir: <str> path to the directory of proxy images
+    @proxy_list: <tuple> of <str> sorted names of the images in the proxy_dir
+    @frame_dir: <str> path to the directory of full resolution frames
+    @frame_list: <tuple> of <str> sorted names of the images in the frame_dir
+    @default_index: <int> index in the proxy_list of the image displayed
+        by default, or None if there are no proxy images
+    @default_image: <str> path to the image displayed by default, or None
+    @pyramid: <ThumbnailPyramid> pre scaled copies of the proxy images,
+        or None if they have not been built for this asset
+    """
+    def __init__(self, jsondata, proxy_list=None):
+        object.__setattr__(self, '_jsondata', dict(jsondata))
+        object.__setattr__(self, '_proxy_list', None)
+        object.__setattr__(self, '_frame_list', None)
+        object.__setattr__(self, '_pyramid', ThumbnailPyramid.fromRecord(self._jsondata))
+        if proxy_list is not None:
+            object.__setattr__(self, '_proxy_list', tuple(proxy_list))
+
+    @classmethod
+    def fromRow(cls, row):
+        """
+        @row: <dict> or <AssetRecord>
+        @return: <AssetRecord> if a record is provided, it is returned as is
+        """
+        if isinstance(row, AssetRecord):
+            return row
+        return cls(row)
+
+    @classmethod
+    def load(cls, filepath, resolve=True):
+        """
+        Parses the json file provided.  This is safe to call from a
+        worker thread.
+        @filepath: <str> path to json file
+        @resolve: <bool> if True, the proxy directory is listed now rather
+            than the first time it is displayed
+        @return: <AssetRecord> or None if the file could not be read
+        """
+        jsondata = iUtils.loadJSONRow(filepath)
+        if jsondata is None:
+            return None
+        record = cls(jsondata)
+        if resolve:
+            record.proxy_list
+        return record
+
+    @classmethod
+    def fromSnapshot(cls, snapshot):
+        """
+        @snapshot: <dict> returned by toSnapshot()
+        @return: <AssetRecord>
+        """
+        return cls(snapshot['data'], proxy_list=snapshot.get('proxy_list'))
+
+    def toSnapshot(self):
+        """
+        @return: <dict> json serializable copy of this record.  The proxy
+            list is only included if it has already been listed, so this
+            never touches the file system.
+        """
+        proxy_list = self._proxy_list
+        return {
+            'data': self._jsondata,
+            'proxy_list': list(proxy_list) if proxy_list is not None else None
+        }
+
+    """ UTILS """
+
+    @staticmethod
+    def listDirectory(directory):
+        try:
+            return tuple(sorted(os.listdir(directory)))
+        except (OSError, TypeError):
+            return ()
+
+    def getImagePath(self, index):
+        """
+        @index: <int> index in the proxy_list
+        @return: <str> path to proxy image
+        """
+        return '/'.join([self.proxy_dir, self.proxy_list[index]])
+
+    def getDisplayPath(self, image_path, width):
+        """
+        Returns the path of the image that should be decoded to display
+        the proxy image provided at the width provided.  This is the
+        smallest level of the pyramid that covers the width, or the proxy
+        image itself if there is no pyramid, or the level is missing or
+        older than the proxy image.
+        @image_path: <str> path to proxy image
+        @width: <int> width the image is displayed at
+        @return: <str>
+        """
+        if self._pyramid is None or not image_path or not width:
+            return image_path
+        display_path = self._pyramid.getImagePath(os.path.basename(image_path), width)
+        if not display_path:
+            return image_path
+
+        # the proxy was republished after the pyramid was built
+        display_mtime = ThumbnailCache.getMTime(display_path)
+        if display_mtime is None:
+            return image_path
+        image_mtime = ThumbnailCache.getMTime(image_path)
+        if image_mtime is not None and display_mtime < image_mtime:
+            return image_path
+        return display_path
+
+    """ MAPPING """
+
+    def __getitem__(self, key):
+        return self._jsondata[key]
+
+    def __iter__(self):
+        return iter(self._jsondata)
+
+    def __len__(self):
+        return len(self._jsondata)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('AssetRecord is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('AssetRecord is immutable')
+
+    def __hash__(self):
+        return hash(self.filepath)
+
+    def __repr__(self):
+        return repr(self._jsondata)
+
+    """ PROPERTIES """
+
+    @property
+    def filepath(self):
+        return self._jsondata.get('filepath')
+
+    @property
+    def proxy_dir(self):
+        return self._jsondata.get('proxy')
+
+    @property
+    def proxy_list(self):
+        if self._proxy_list is None:
+            object.__setattr__(self, '_proxy_list', self.listDirectory(self.proxy_dir))
+        return self._proxy_list
+
+    @property
+    def pyramid(self):
+        return self._pyramid
+
+    @property
+    def frame_dir(self):
+        return self._jsondata.get('frame')
+
+    @property
+    def frame_list(self):
+        if self._frame_list is None:
+            object.__setattr__(self, '_frame_list', self.listDirectory(self.frame_dir))
+        return self._frame_list
+
+    @property
+    def default_index(self):
+        proxy_list = self.proxy_list
+        if len(proxy_list) == 0:
+            return None
+        try:
+            return proxy_list.index(self._jsondata['default_image'])
+        except (KeyError, ValueError):
+            return 0
+
+    @property
+    def default_image(self):
+        default_index = self.default_index
+        if default_index is None:
+            return None
+        return self.getImagePath(default_index)
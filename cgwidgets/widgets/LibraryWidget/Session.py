@@ -0,0 +1,119 @@
+"""
+Warm start of the Library.
+
+When the LibraryWidget is closed, the directory that was selected, the view
+mode, the image size, and the rows of the model are written to a session
+file.  The next time it is opened, the views are built from the session
+straight away (without reading any of the json files), and the directory is
+then reloaded in the background, and only the rows that changed on disk
+are patched into the model.
+"""
+import json
+import os
+
+from .__utils__ import iUtils
+from .Record import AssetRecord
+
+
+class LibrarySession(object):
+    """
+    @session_file: <str> path to the session file
+    @max_rows: <int> max number of rows stored in the session, any rows
+        over this are loaded by the revalidation instead
+
+    The session is stored as
+        {
+            'version': <int>,
+            'library_dir': <str> LIBRARY_DIR the session was saved from,
+            'directory': <str> directory selected in the DirList,
+            'view': <str> view mode,
+            'size': <str> name of the image size,
+            'rows': <list> of AssetRecord snapshots
+        }
+    """
+    VERSION = 1
+
+    def __init__(self, session_file=None, max_rows=None):
+        if session_file is None:
+            session_file = self.getDefaultSessionFile()
+        if max_rows is None:
+            max_rows = iUtils.getSetting('SESSION_MAX_ROWS')
+        self._session_file = session_file
+        self._max_rows = max_rows
+
+    @staticmethod
+    def getDefaultSessionFile():
+        session_file = iUtils.getSetting('SESSION_FILE')
+        if session_file:
+            return session_file
+        return os.environ['HOME'] + '/.library/session.json'
+
+    """ API """
+
+    def save(self, library_dir, directory, view=None, size=None, records=()):
+        """
+        Writes the session to disk
+        @library_dir: <str>
+        @directory: <str> directory currently selected
+        @view: <str> name of the current view mode
+        @size: <str> name of the current image size
+        @records: <list> of <AssetRecord> rows of the current model
+        """
+        session = {
+            'version': LibrarySession.VERSION,
+            'library_dir': library_dir,
+            'directory': directory,
+            'view': view,
+            'size': size,
+            'rows': [record.toSnapshot() for record in list(records)[:self._max_rows]]
+        }
+
+        session_dir = os.path.dirname(self._session_file)
+        if not os.path.isdir(session_dir):
+            os.makedirs(session_dir)
+        temp_file = '{path}.{pid}.tmp'.format(path=self._session_file, pid=os.getpid())
+        with open(temp_file, 'w') as f:
+            json.dump(session, f, separators=(',', ':'))
+        os.replace(temp_file, self._session_file)
+
+    def load(self, library_dir=None):
+        """
+        @library_dir: <str> if provided, sessions saved from a different
+            LIBRARY_DIR are ignored
+        @return: <dict> the session, with its rows converted to
+            AssetRecords, or None if there is no valid session
+        """
+        try:
+            with open(self._session_file, 'r') as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(session, dict) or session.get('version') != LibrarySession.VERSION:
+            return None
+        if library_dir is not None and session.get('library_dir') != library_dir:
+            return None
+        if not session.get('directory'):
+            return None
+
+        try:
+            session['rows'] = [AssetRecord.fromSnapshot(row) for row in session.get('rows', [])]
+        except (KeyError, TypeError):
+            return None
+        return session
+
+    def clear(self):
+        try:
+            os.remove(self._session_file)
+        except OSError:
+            pass
+
+    """ PROPERTIES """
+
+    @property
+    def session_file(self):
+        return self._session_file
+
+    @property
+    def max_rows(self):
+        return self._max_rows
@@ -38,6 +38,78 @@ class Settings(object):
     IMAGE_SIZES['xl'] = 300
     IMAGE_SIZES['american'] = 500
 
+    # LOADER
+    LOADER_BATCH_SIZE = 64
+    # max estimated size of the parsed directories held in memory (bytes)
+    SHARD_CACHE_SIZE = 64 * 1024 * 1024
+
+    # THUMBNAIL CACHE
+    # max size of the decoded thumbnails held in memory (bytes)
+    THUMBNAIL_CACHE_SIZE = 256 * 1024 * 1024
+
+    # THUMBNAIL PYRAMID
+    # build pre scaled thumbnails of the proxies when publishing
+    PYRAMID_ON_PUBLISH = True
+    PYRAMID_FORMAT = 'jpg'
+    PYRAMID_QUALITY = 85
+
+    # THUMBNAIL ATLAS
+    # slice the thumbnails of each directory out of a few packed images
+    ATLAS_ENABLED = True
+    # build the atlas of directories that do not have one in the background
+    ATLAS_AUTO_BUILD = True
+    # if None, this will default to $HOME/.library/atlas
+    ATLAS_DIR = None
+    # size of each thumbnail in the atlas, and the number of thumbnails
+    # in each row / column of a page
+    ATLAS_CELL_SIZE = 100
+    ATLAS_PAGE_SIZE = 16
+    ATLAS_QUALITY = 85
+
+    # MIRROR
+    # copy the proxy images to a local directory, for libraries
+    # that are on network storage
+    MIRROR_ENABLED = False
+    # if None, this will default to $HOME/.library/mirror
+    MIRROR_DIR = None
+    # max size of the local copies (bytes)
+    MIRROR_SIZE = 10 * 1024 * 1024 * 1024
+    # number of seconds a proxies mtime is trusted for before it is checked again
+    MIRROR_REVALIDATE_INTERVAL = 30
+    MIRROR_THREAD_COUNT = 2
+    # mirror every frame of the assets displayed, rather than only the default images
+    MIRROR_PREFETCH_FRAMES = True
+    # max number of frames queued each time a directory is loaded, these
+    # are queued from the first row down
+    MIRROR_PREFETCH_FRAME_LIMIT = 2000
+
+    # PREFETCH
+    # number of decoded frames each image holds while scrubbing
+    PREFETCH_RING_SIZE = 48
+    # number of frames decoded in the direction of motion / behind it
+    PREFETCH_AHEAD = 16
+    PREFETCH_BEHIND = 4
+    PREFETCH_THREAD_COUNT = 4
+
+    # INDEX
+    INDEX_ENABLED = True
+    # if None, this will default to $HOME/.library/index.db
+    INDEX_FILE = None
+
+    # WATCHER
+    WATCHER_ENABLED = True
+    # 'auto' | 'inotify' | 'qt'
+    WATCHER_BACKEND = 'auto'
+    # number of milliseconds file system events are batched for
+    WATCHER_BATCH_INTERVAL = 250
+
+    # SESSION
+    SESSION_ENABLED = True
+    # if None, this will default to $HOME/.library/session.json
+    SESSION_FILE = None
+    # max number of rows stored in the session
+    SESSION_MAX_ROWS = 20000
+
     # DEFAULTS
     DEFAULT_VIEW = 'Detailed'
     DEFAULT_SIZE = 'large'
@@ -0,0 +1,246 @@
+"""
+In memory store of the Library settings.
+
+The user settings ($HOME/.library/settings.json) are read once, and every
+lookup after that is a dict lookup.  Edits made to the file outside of
+this process are picked up by a QFileSystemWatcher when there is an event
+loop running, and by checking the mtime of the file (at most once every
+SettingsStore.POLL_INTERVAL seconds) when there is not.
+
+Anything that needs to react to a setting changing should connect to
+settingChanged rather than polling getSetting.
+"""
+import json
+import os
+import threading
+import time
+
+from qtpy.QtCore import *
+
+
+class SettingsStore(QObject):
+    """
+    @settings_file: <str> path to the users settings.json
+    @poll_interval: <float> number of seconds between checks of the
+        mtime of the settings file
+    @user_settings: <dict> settings that have been set by the user
+
+    settingChanged is emitted with the name of the setting, and its
+    new value, whenever it is changed by setSetting, or by an edit
+    to the settings file.
+    """
+    settingChanged = Signal(str, object)
+
+    POLL_INTERVAL = 1.0
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, settings_file=None, poll_interval=None):
+        super(SettingsStore, self).__init__()
+        if settings_file is None:
+            settings_file = self.getDefaultSettingsFile()
+        if poll_interval is None:
+            poll_interval = SettingsStore.POLL_INTERVAL
+
+        self._settings_file = settings_file
+        self._poll_interval = poll_interval
+        self._lock = threading.RLock()
+        self._user_settings = {}
+        self._values = {}
+        self._mtime = None
+        self._last_poll = 0
+        self._watcher = None
+
+        self.load()
+        self.watch()
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the store shared by all of the widgets in this process
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def getDefaultSettingsFile():
+        return os.environ['HOME'] + '/.library/settings.json'
+
+    """ API """
+
+    def getSetting(self, setting):
+        """
+        @setting: <str> return the setting value.  The users settings are
+            checked first before checking the settings file embedded
+            into the library.
+        """
+        self.poll()
+        try:
+            return self._values[setting]
+        except KeyError:
+            pass
+
+        with self._lock:
+            try:
+                value = self._user_settings[setting]
+            except KeyError:
+                from .Settings import Settings
+                value = getattr(Settings, setting)
+
+            # if value is a list then it is denoted as a stylesheet saved as a list
+            if type(value) == list:
+                value = ';'.join(value)
+            self._values[setting] = value
+            return value
+
+    def setSetting(self, setting, value):
+        """
+        Sets the users value of the setting provided, and writes it
+        to the settings file.
+        @setting: <str>
+        @value: json serializable value
+        """
+        with self._lock:
+            self._user_settings[setting] = value
+            self._values.pop(setting, None)
+            self.save()
+        self.settingChanged.emit(setting, self.getSetting(setting))
+
+    def removeSetting(self, setting):
+        """
+        Removes the users value of the setting provided, so that the
+        default from the Settings is used.
+        """
+        with self._lock:
+            if setting not in self._user_settings:
+                return
+            del self._user_settings[setting]
+            self._values.pop(setting, None)
+            self.save()
+        self.settingChanged.emit(setting, self.getSetting(setting))
+
+    def load(self):
+        """
+        Reads the settings file, and emits settingChanged for every setting
+        whose value is different from the one that was loaded before.
+        """
+        with self._lock:
+            mtime = self.getMTime()
+            try:
+                with open(self._settings_file, 'r') as f:
+                    user_settings = json.load(f)
+                if not isinstance(user_settings, dict):
+                    user_settings = {}
+            except (OSError, ValueError):
+                user_settings = {}
+
+            old_settings = self._user_settings
+            self._user_settings = user_settings
+            self._values = {}
+            self._mtime = mtime
+            self._last_poll = time.monotonic()
+
+        changed = [
+            setting for setting in set(old_settings) | set(user_settings)
+            if old_settings.get(setting) != user_settings.get(setting)
+        ]
+        for setting in sorted(changed):
+            try:
+                self.settingChanged.emit(setting, self.getSetting(setting))
+            except AttributeError:
+                # not a setting the library knows about
+                continue
+
+    def save(self):
+        """
+        Writes the users settings to disk.  This is written to a temp
+        file first, so that other processes never read half of it.
+        """
+        with self._lock:
+            settings_dir = os.path.dirname(self._settings_file)
+            if not os.path.isdir(settings_dir):
+                os.makedirs(settings_dir)
+            temp_file = '{path}.{pid}.tmp'.format(path=self._settings_file, pid=os.getpid())
+            with open(temp_file, 'w') as f:
+                json.dump(self._user_settings, f, indent=4, sort_keys=True)
+            os.replace(temp_file, self._settings_file)
+            self._mtime = self.getMTime()
+
+    def poll(self):
+        """
+        Reloads the settings file if it has changed since it was last
+        read.  The file is only stat'd once every poll_interval.
+        """
+        now = time.monotonic()
+        if now - self._last_poll < self._poll_interval:
+            return
+        self._last_poll = now
+        if self._watcher is None:
+            self.watch()
+        if self.getMTime() != self._mtime:
+            self.load()
+
+    def watch(self):
+        """
+        Watches the settings file for changes, this can only be done when
+        there is a QCoreApplication, and only from its thread.  If it can't
+        be watched, changes are picked up by poll().
+        """
+        app = QCoreApplication.instance()
+        if self._watcher is not None or app is None:
+            return
+        if QThread.currentThread() != app.thread() or self.thread() != app.thread():
+            return
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self.__settingsFileChanged)
+        self._watcher.directoryChanged.connect(self.__settingsFileChanged)
+        self.updateWatchedPaths()
+
+    def updateWatchedPaths(self):
+        """
+        Watches the settings directory as well as the file, as writing
+        the file with os.replace() removes the watch on the old file.
+        """
+        if self._watcher is None:
+            return
+        settings_dir = os.path.dirname(self._settings_file)
+        for path in (settings_dir, self._settings_file):
+            if os.path.exists(path) and path not in self._watcher.files() + self._watcher.directories():
+                self._watcher.addPath(path)
+
+    """ UTILS """
+
+    def getMTime(self):
+        try:
+            return os.stat(self._settings_file).st_mtime_ns
+        except OSError:
+            return None
+
+    """ EVENTS """
+
+    def __settingsFileChanged(self, *args):
+        self.updateWatchedPaths()
+        if self.getMTime() != self._mtime:
+            self.load()
+
+    """ PROPERTIES """
+
+    @property
+    def settings_file(self):
+        return self._settings_file
+
+    @property
+    def user_settings(self):
+        return dict(self._user_settings)
+
+    @property
+    def poll_interval(self):
+        return self._poll_interval
+
+    @poll_interval.setter
+    def poll_interval(self, poll_interval):
+        self._poll_interval = poll_interval
@@ -0,0 +1,228 @@
+"""
+Process wide cache of the parsed rows of each directory in the library.
+
+When a directory is selected in the DirList, the ImageListLoader walks it
+and parses every json file underneath it.  Moving between a parent and a
+child that have already been browsed would parse the same files again, so
+the records of each directory are held here as a shard, along with the
+names of its sub directories.  A shard is valid as long as the mtime of its
+directory, and the mtime/size of each of its files have not changed, so
+loading a directory that has already been visited only lists it, rather
+than parsing its json files again.
+
+Editing a json file in place does not change the mtime of its directory,
+which is why the files are checked as well.  The LibraryWatcher also
+invalidates the shards of the directories that it sees change.
+"""
+import threading
+from collections import OrderedDict
+
+from .__utils__ import iUtils
+
+
+class Shard(object):
+    """
+    Parsed contents of a single directory
+    @directory: <str> path to directory
+    @mtime: <int> mtime of the directory when it was listed
+    @files: <dict> of <str> path to each file in the directory:
+        <tuple> (mtime, size) of the file when it was listed
+    @records: <tuple> of <AssetRecord>
+    @sub_directories: <tuple> of <str> paths to the sub directories
+    @num_bytes: <int> estimated size of the shard
+    """
+    RECORD_OVERHEAD = 1024
+
+    def __init__(self, directory, mtime, files, records, sub_directories):
+        self.directory = directory
+        self.mtime = mtime
+        self.files = files
+        self.records = tuple(records)
+        self.sub_directories = tuple(sub_directories)
+        self.num_bytes = self.getSize()
+
+    def getSize(self):
+        """
+        @return: <int> rough estimate of the number of bytes held by this
+            shard, this only needs to be good enough to enforce the cap
+        """
+        num_bytes = sum(len(path) for path in self.sub_directories)
+        num_bytes += sum(len(path) + 64 for path in self.files)
+        for record in self.records:
+            num_bytes += self.RECORD_OVERHEAD
+            for key, value in record.items():
+                num_bytes += len(key) + len(str(value))
+        return num_bytes
+
+
+class PendingShard(object):
+    """
+    Collects the records of a directory from the ParseTasks it was split
+    into, and adds the shard to the cache once all of them have finished.
+    If any of them are cancelled, the shard is never added.
+    @num_batches: <int> number of ParseTasks that will add records
+    """
+    def __init__(self, cache, directory, mtime, files, sub_directories, num_batches):
+        self._cache = cache
+        self._directory = directory
+        self._mtime = mtime
+        self._files = files
+        self._sub_directories = sub_directories
+        self._num_batches = num_batches
+        self._records = []
+        self._is_cancelled = False
+        self._lock = threading.Lock()
+
+        if num_batches == 0:
+            self.finish()
+
+    def addRecords(self, records):
+        with self._lock:
+            self._records += records
+            self._num_batches -= 1
+            is_done = self._num_batches == 0
+        if is_done:
+            self.finish()
+
+    def cancel(self):
+        self._is_cancelled = True
+
+    def finish(self):
+        if self._is_cancelled:
+            return
+        self._cache.insert(Shard(
+            self._directory, self._mtime, self._files, self._records, self._sub_directories
+        ))
+
+
+class ShardCache(object):
+    """
+    LRU cache of Shards keyed by directory.  This is accessed from the
+    loader's worker threads, so all access goes through a lock.
+
+    @max_bytes: <int> budget of the cache, once the estimated size of the
+        shards goes over this, the least recently used are evicted.  If
+        this is 0, nothing is cached.
+    @num_bytes: <int> current estimated size of the cache
+    @hits: <int> number of directories loaded from the cache
+    @misses: <int> number of directories that had to be parsed
+    @evictions: <int> number of shards that have been evicted
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = iUtils.getSetting('SHARD_CACHE_SIZE')
+        self._max_bytes = max_bytes
+        self._shards = OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+        self.resetStats()
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the cache shared by all of the loaders in this process
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    """ API """
+
+    def get(self, directory, mtime, files):
+        """
+        @directory: <str> path to directory
+        @mtime: <int> current mtime of the directory
+        @files: <dict> of <str> path: <tuple> current (mtime, size)
+            of each file in the directory
+        @return: <Shard> or None if it is not cached, or is stale
+        """
+        with self._lock:
+            shard = self._shards.get(directory)
+            if shard is None or mtime is None or shard.mtime != mtime or shard.files != files:
+                self._misses += 1
+                return None
+            self._shards.move_to_end(directory)
+            self._hits += 1
+            return shard
+
+    def insert(self, shard):
+        """
+        @shard: <Shard>
+        """
+        if shard.num_bytes > self._max_bytes:
+            return
+        with self._lock:
+            self.__remove(shard.directory)
+            self._shards[shard.directory] = shard
+            self._num_bytes += shard.num_bytes
+            while self._num_bytes > self._max_bytes:
+                directory = next(iter(self._shards))
+                self.__remove(directory)
+                self._evictions += 1
+
+    def invalidate(self, directory):
+        """
+        Removes the shard of the directory provided
+        @directory: <str> path to directory
+        """
+        with self._lock:
+            self.__remove(directory)
+
+    def clear(self):
+        with self._lock:
+            self._shards.clear()
+            self._num_bytes = 0
+
+    def __remove(self, directory):
+        shard = self._shards.pop(directory, None)
+        if shard is not None:
+            self._num_bytes -= shard.num_bytes
+
+    """ STATS """
+
+    def stats(self):
+        """
+        @return: <dict> of the counters for this cache
+        """
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'count': len(self._shards),
+            'num_bytes': self._num_bytes,
+            'max_bytes': self._max_bytes
+        }
+
+    def resetStats(self):
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    """ PROPERTIES """
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max_bytes
+            while self._shards and self._num_bytes > self._max_bytes:
+                self.__remove(next(iter(self._shards)))
+                self._evictions += 1
+
+    @property
+    def num_bytes(self):
+        return self._num_bytes
+
+    def __contains__(self, directory):
+        return directory in self._shards
+
+    def __len__(self):
+        return len(self._shards)
@@ -0,0 +1,181 @@
+"""
+Synthetic libraries for benchmarking the Library.
+
+Writes a library in the same layout as the PublishWidget does:
+    <root>/library/<dir>/<dir>/.../<asset>.json
+    <root>/assets/<asset>/frame
+    <root>/assets/<asset>/proxy/<asset>.<####>.<ext>
+    <root>/assets/<asset>/data
+
+The library directories are a tree fan_out wide and depth deep, and the
+assets are spread evenly across all of the directories.  Each proxy frame
+is a small generated image, so that decoding them costs about the same as
+decoding real proxies.
+
+    python -m cgwidgets.widgets.LibraryWidget.Synthetic /tmp/synthetic --assets 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+from qtpy.QtCore import *
+from qtpy.QtGui import *
+
+
+PUBLISH_TYPES = ['shader', 'texture', 'lightrig', 'lighttex']
+NOTE_WORDS = [
+    'wet', 'dry', 'rough', 'glossy', 'metal', 'stone', 'wood', 'fabric',
+    'hero', 'background', 'damaged', 'clean', 'warm', 'cold', 'dusk', 'noon'
+]
+
+
+def getDirectories(library_dir, fan_out, depth):
+    """
+    @return: <list> of <str> every directory in a tree fan_out wide
+        and depth deep, underneath the library_dir provided
+    """
+    directories = []
+    parents = [library_dir]
+    for level in range(depth):
+        children = []
+        for parent in parents:
+            for index in range(fan_out):
+                name = 'dir{level}_{index:02d}'.format(level=level, index=index)
+                children.append('/'.join([parent, name]))
+        directories += children
+        parents = children
+    return directories
+
+
+def createFrame(name, frame, num_frames, width, height, color):
+    """
+    @return: <QImage> proxy frame of a synthetic asset
+    """
+    image = QImage(width, height, QImage.Format_RGB32)
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, color)
+    gradient.setColorAt(1, color.darker(300))
+    painter = QPainter(image)
+    painter.fillRect(0, 0, width, height, QBrush(gradient))
+
+    # sweep a bar across the frames so that scrubbing changes the image
+    x = int((width - 1) * frame / max(1, num_frames - 1))
+    painter.fillRect(x, 0, max(2, width // 64), height, QColor(255, 255, 255))
+    painter.setPen(QColor(255, 255, 255))
+    painter.drawText(4, height - 6, '{name} {frame:04d}'.format(name=name, frame=frame))
+    painter.end()
+    return image
+
+
+def generateLibrary(
+        root_dir,
+        num_assets=1000,
+        fan_out=4,
+        depth=2,
+        num_frames=24,
+        image_size=(256, 144),
+        image_format='jpg',
+        seed=0,
+        log=None
+):
+    """
+    Writes a synthetic library
+    @root_dir: <str> directory the library and assets are written to
+    @num_assets: <int> number of assets
+    @fan_out: <int> number of sub directories in each library directory
+    @depth: <int> number of levels of sub directories
+    @num_frames: <int> number of proxy frames of each asset
+    @image_size: <tuple> (width, height) of the proxy frames
+    @image_format: <str> extension of the proxy frames
+    @seed: <int> the same seed always writes the same library
+    @return: <dict> of the 'library_dir', 'assets_dir', and the numbers
+        of assets, directories, and frames written
+    """
+    rng = random.Random(seed)
+    library_dir = '/'.join([root_dir.rstrip('/'), 'library'])
+    assets_dir = '/'.join([root_dir.rstrip('/'), 'assets'])
+    directories = [library_dir] + getDirectories(library_dir, fan_out, depth)
+    for directory in directories:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    width, height = image_size
+    for asset_index in range(num_assets):
+        name = 'asset_{index:06d}'.format(index=asset_index)
+        asset_dir = '/'.join([assets_dir, name])
+        proxy_dir = '/'.join([asset_dir, 'proxy'])
+        for sub_dir in ('frame', 'proxy', 'data'):
+            sub_dir = '/'.join([asset_dir, sub_dir])
+            if not os.path.isdir(sub_dir):
+                os.makedirs(sub_dir)
+
+        # proxy frames
+        color = QColor.fromHsv(rng.randrange(360), 128 + rng.randrange(128), 160 + rng.randrange(96))
+        image_list = []
+        for frame in range(1, num_frames + 1):
+            image_name = '{name}.{frame:04d}.{ext}'.format(name=name, frame=frame, ext=image_format)
+            image = createFrame(name, frame, num_frames, width, height, color)
+            image.save('/'.join([proxy_dir, image_name]))
+            image_list.append(image_name)
+
+        # json
+        publish_file = {
+            'iskatanalibrary': True,
+            'name': name,
+            'type': rng.choice(PUBLISH_TYPES),
+            'frame': '/'.join([asset_dir, 'frame']),
+            'proxy': proxy_dir,
+            'data': '/'.join([asset_dir, 'data']),
+            'note': ' '.join(rng.sample(NOTE_WORDS, 3)),
+            'default_image': image_list[len(image_list) // 2] if image_list else ''
+        }
+        directory = directories[asset_index % len(directories)]
+        with open('/'.join([directory, name + '.json']), 'w') as f:
+            json.dump(publish_file, f, sort_keys=True, indent=4)
+
+        if log and (asset_index + 1) % 100 == 0:
+            log('wrote {num} / {total} assets'.format(num=asset_index + 1, total=num_assets))
+
+    return {
+        'library_dir': library_dir,
+        'assets_dir': assets_dir,
+        'num_assets': num_assets,
+        'num_directories': len(directories),
+        'num_frames': num_assets * num_frames
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Writes a synthetic library for benchmarking')
+    parser.add_argument('root_dir', help='directory the library and assets are written to')
+    parser.add_argument('--assets', type=int, default=1000, help='number of assets')
+    parser.add_argument('--fan-out', type=int, default=4, help='sub directories in each directory')
+    parser.add_argument('--depth', type=int, default=2, help='levels of sub directories')
+    parser.add_argument('--frames', type=int, default=24, help='proxy frames of each asset')
+    parser.add_argument('--size', type=int, nargs=2, default=[256, 144], help='width height of the frames')
+    parser.add_argument('--format', dest='image_format', default='jpg', help='extension of the frames')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # the frames are drawn with a QPainter, which needs a gui application
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    summary = generateLibrary(
+        args.root_dir,
+        num_assets=args.assets,
+        fan_out=args.fan_out,
+        depth=args.depth,
+        num_frames=args.frames,
+        image_size=tuple(args.size),
+        image_format=args.image_format,
+        seed=args.seed,
+        log=print
+    )
+    print(json.dumps(summary, indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Process wide cache of the scaled images displayed by the Library.
+
+The same proxy frame is displayed by the thumbnail view, the detailed
+view's vertical header, and the full screen viewer.  Rather than each one
+of these decoding the full resolution image and scaling it down, the image
+is decoded once at the size it is displayed at (QImageReader.setScaledSize)
+and shared between all of them.
+"""
+import os
+from collections import OrderedDict
+
+from qtpy.QtCore import *
+from qtpy.QtGui import *
+
+from .__utils__ import iUtils
+from .Mirror import ProxyMirror
+
+
+class ThumbnailCache(object):
+    """
+    LRU cache of QPixmaps keyed by (path, mtime, width).
+
+    This should only be accessed from the GUI thread, as QPixmaps can
+    not be created on other threads.  Use decodeImage() to decode
+    on a worker thread, and insert() to add the result to the cache.
+
+    @max_bytes: <int> budget of the cache, once the total size of the
+        pixmaps goes over this, the least recently used are evicted
+    @num_bytes: <int> current size of the cache
+    @hits: <int> number of lookups that were found in the cache
+    @misses: <int> number of lookups that had to be decoded
+    @evictions: <int> number of pixmaps that have been evicted
+    """
+    _instance = None
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = iUtils.getSetting('THUMBNAIL_CACHE_SIZE')
+        self._max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._num_bytes = 0
+        self.resetStats()
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the cache shared by all of the widgets in this process
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    """ UTILS """
+
+    @staticmethod
+    def getMTime(path):
+        """
+        @return: <int> mtime of the file, or None if it does not exist
+        """
+        mirror = ProxyMirror.active()
+        if mirror is not None:
+            mtime = mirror.getMTime(path)
+            if mtime is not None:
+                return mtime
+        try:
+            return os.stat(path).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    @staticmethod
+    def getKey(path, width, mtime=None):
+        """
+        @path: <str> path to image on disk
+        @width: <int> width the image will be displayed at
+        @mtime: <int> mtime of the file, if this is not provided the
+            file will be stat'd.  Views that paint a lot should look
+            this up once, and provide it.
+        @return: <tuple> (path, mtime, width), or None if
+            the file does not exist
+        """
+        if mtime is None:
+            mtime = ThumbnailCache.getMTime(path)
+            if mtime is None:
+                return None
+        return (path, mtime, int(width))
+
+    @staticmethod
+    def decodeImage(path, width):
+        """
+        Decodes the image scaled to the width provided.  If the image
+        format supports it, the image is scaled while it is being read,
+        so that the full resolution image is never decoded.  This is
+        safe to call from a worker thread.
+
+        @path: <str> path to image on disk
+        @width: <int> width to scale the image to
+        @return: <QImage>
+        """
+        # read the local copy of the image if it has been mirrored
+        mirror = ProxyMirror.active()
+        if mirror is not None:
+            local_path = mirror.resolve(path)
+            if local_path != path:
+                image = ThumbnailCache.readImage(local_path, width)
+                if not image.isNull():
+                    return image
+                mirror.discard(local_path)
+        return ThumbnailCache.readImage(path, width)
+
+    @staticmethod
+    def readImage(path, width):
+        """
+        @path: <str> path to image on disk
+        @width: <int> width to scale the image to
+        @return: <QImage>
+        """
+        width = int(width)
+        reader = QImageReader(path)
+        size = reader.size()
+        if size.isValid() and 0 < width < size.width():
+            height = max(1, int(round(size.height() * width / size.width())))
+            reader.setScaledSize(QSize(width, height))
+            return reader.read()
+
+        image = reader.read()
+        if image.isNull() or image.width() == width or width <= 0:
+            return image
+        return image.scaledToWidth(width)
+
+    def pixmap(self, path, width, mtime=None):
+        """
+        Returns the pixmap for the image provided, scaled to the width
+        provided.  If the pixmap is not in the cache, it will be decoded
+        and added to it.
+
+        @path: <str> path to image on disk
+        @width: <int> width to scale the image to
+        @mtime: <int> mtime of the file (see getKey)
+        @return: <QPixmap>
+        """
+        key = self.getKey(path, width, mtime=mtime)
+        if key is None:
+            self._misses += 1
+            return QPixmap()
+
+        # hit
+        pixmap = self.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        # miss
+        image = self.decodeImage(path, width)
+        if image.isNull():
+            return QPixmap()
+        return self.insert(key, image)
+
+    def get(self, key):
+        """
+        @key: <tuple> returned by getKey()
+        @return: <QPixmap> or None if it is not cached
+        """
+        try:
+            pixmap = self._cache[key]
+        except KeyError:
+            self._misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self._hits += 1
+        return pixmap
+
+    def insert(self, key, image):
+        """
+        Adds an image to the cache, and evicts the least recently
+        used pixmaps if it goes over budget.
+
+        @key: <tuple> returned by getKey()
+        @image: <QImage> or <QPixmap>
+        @return: <QPixmap>
+        """
+        if isinstance(image, QImage):
+            pixmap = QPixmap.fromImage(image)
+        else:
+            pixmap = image
+
+        if key in self._cache:
+            self._num_bytes -= self.getPixmapBytes(self._cache.pop(key))
+        self._cache[key] = pixmap
+        self._num_bytes += self.getPixmapBytes(pixmap)
+        self.evict()
+        return pixmap
+
+    def evict(self):
+        """
+        Removes the least recently used pixmaps until the
+        cache is back under budget
+        """
+        # always keep the most recent pixmap, even if it is over budget
+        while self._num_bytes > self.max_bytes and len(self._cache) > 1:
+            key, pixmap = self._cache.popitem(last=False)
+            self._num_bytes -= self.getPixmapBytes(pixmap)
+            self._evictions += 1
+
+    def clear(self):
+        self._cache.clear()
+        self._num_bytes = 0
+
+    @staticmethod
+    def getPixmapBytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    """ STATS """
+
+    def stats(self):
+        """
+        @return: <dict> of the counters used for tuning the size
+            of the cache
+        """
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'count': len(self._cache),
+            'num_bytes': self._num_bytes,
+            'max_bytes': self._max_bytes
+        }
+
+    def resetStats(self):
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    """ PROPERTIES """
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        self._max_bytes = max_bytes
+        self.evict()
+
+    @property
+    def num_bytes(self):
+        return self._num_bytes
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def evictions(self):
+        return self._evictions
@@ -52,7 +52,7 @@ class TopBarWidgetContainer(QGroupBox):
 class ViewModeDropDown(QComboBox):
     def __init__(self, parent=None):
         super(ViewModeDropDown, self).__init__(parent)
-        self.addItems(['List', 'Detailed', 'Thumbnail', 'Publish'])
+        self.addItems(['List', 'Detailed', 'Table', 'Thumbnail', 'Icon', 'Publish'])
         self.currentIndexChanged.connect(self.indexChanged)
 
     def indexChanged(self):
@@ -63,6 +63,10 @@ class ViewModeDropDown(QComboBox):
             self.switchToPublishView(main_widget)
         elif mode == 'Thumbnail':
             self.switchToThumbnailView(main_widget, model)
+        elif mode == 'Icon':
+            self.switchToIconView(main_widget, model)
+        elif mode == 'Table':
+            self.switchToTableView(main_widget, model)
         elif mode == 'Detailed':
             self.switchToDetailedView(main_widget, model)
         elif mode == 'List':
@@ -75,6 +79,14 @@ class ViewModeDropDown(QComboBox):
                 item.setSelected()
         main_widget.working_area_layout.setCurrentIndex(0)
 
+    def switchToIconView(self, main_widget, model):
+        main_widget.search_bar.show()
+        main_widget.working_area_layout.setCurrentWidget(main_widget.icon_view)
+
+    def switchToTableView(self, main_widget, model):
+        main_widget.search_bar.show()
+        main_widget.working_area_layout.setCurrentWidget(main_widget.table_view)
+
     def switchToDetailedView(self, main_widget, model):
         main_widget.search_bar.show()
         main_widget.working_area_layout.setCurrentIndex(1)
@@ -13,10 +13,8 @@ List:
 
 """
 from collections import OrderedDict
-import json
 import math
 import os
-import re
 import sys
 
 from qtpy.QtWidgets import *
@@ -24,6 +22,11 @@ from qtpy.QtCore import *
 from qtpy.QtGui import *
 
 from .__utils__ import iUtils
+from .Atlas import AtlasCache
+from .Metadata import ImageListMetadata
+from .Query import SearchIndex, SearchQuery, bitsetToRows
+from .Record import AssetRecord
+from .ThumbnailCache import ThumbnailCache
 from cgwidgets import utils as gUtils
 
 
@@ -44,16 +47,28 @@ class ImageListModel(QAbstractTableModel):
 
         How do you sync this?
 
-    @imageJSONList: < list> of < JSON >
+    @imageJSONList: < list> of < AssetRecord >
         This is the row list of data that is shown to the user...
-    @metadata: <dict> of <list>
+        Each row is a read only mapping of the json data, that is
+        shared with all of the widgets displaying that asset.
+    @metadata: <ImageListMetadata> of <PathList>
         metadata['hidden'] = [filepath, filepath]
-        metadata['selection'] = [filepath, filepath]
-        Need something here to hold the metadata for
-            selection
-            hidden
-            etc
+        metadata['selected'] = [filepath, filepath]
+        These are ordered sets with the API of a list, so that checking
+        if a row is hidden/selected is constant time.
+    @FILEPATH_ROLE: <Qt.ItemDataRole> returns the path to the json file
+    @IMAGE_ROLE: <Qt.ItemDataRole> returns a tuple of the (path, mtime) of
+        the image displayed by default.  This is resolved once per row, so
+        that views painting the rows do not hit the disk.
+    @decoration_size: <int> width of the thumbnail returned for the
+        Qt.DecorationRole of the first column.  If this is 0, no
+        thumbnail is returned.
     """
+    FILEPATH_ROLE = Qt.UserRole
+    IMAGE_ROLE = Qt.UserRole + 1
+
+    selectionChanged = Signal()
+
     def __init__(self, parent_widget=None, filedirs_list=[]):
         super(ImageListModel, self).__init__()
         # self.selection_list = []
@@ -66,10 +81,15 @@ class ImageListModel(QAbstractTableModel):
             5: 'proxy',
             6: 'filepath'
             }
-        self._metadata = {}
-        self.metadata['hidden'] = []
-        self.metadata['selected'] = []
+        self._metadata = ImageListMetadata()
         self._parent_widget = parent_widget
+        self._default_images = {}
+        self._display_images = {}
+        self._decoration_size = 0
+        self._search_index = None
+        self._search_query = None
+        self._records = None
+        self._directory = None
 
         try:
             self.populateModelFromDirectory(filedirs_list)
@@ -84,10 +104,144 @@ class ImageListModel(QAbstractTableModel):
     def rowCount(self, parent=None):
         return len(self.imageJSONList)
 
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        jsondata = self.imageJSONList[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            try:
+                return jsondata[self.key_map[index.column()]]
+            except KeyError:
+                return 'Not Valid'
+        elif role == Qt.DecorationRole:
+            if index.column() != 0 or not self.decoration_size:
+                return None
+            image_path, mtime = self.getDisplayImage(index.row(), self.decoration_size)
+            if not image_path:
+                return None
+            return ThumbnailCache.instance().pixmap(
+                image_path, self.decoration_size, mtime=mtime
+            )
+        elif role == Qt.BackgroundRole:
+            if jsondata['filepath'] in self.metadata['selected']:
+                return QColor(255, 200, 0, 64)
+            return None
+        elif role == Qt.ToolTipRole:
+            return repr(jsondata).replace(',', '\n')[1:-1]
+        elif role == ImageListModel.FILEPATH_ROLE:
+            return jsondata['filepath']
+        elif role == ImageListModel.IMAGE_ROLE:
+            return self.getDefaultImage(index.row())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.key_map[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sorts the rows by the column provided.  This is done on the
+        row list directly, rather than through a QSortFilterProxyModel,
+        as calling back into data() for every comparison is really slow
+        for large directories.
+        @column: <int> column to sort by, if this is less than 0 the
+            order is left as is
+        @order: <Qt.SortOrder>
+        """
+        if column < 0 or column >= self.columnCount():
+            return
+        key = self.key_map[column]
+
+        self.layoutAboutToBeChanged.emit()
+        # store persistent indexes
+        old_indexes = self.persistentIndexList()
+        old_filepaths = [
+            self.imageJSONList[index.row()]['filepath'] for index in old_indexes
+        ]
+
+        # sort
+        self.imageJSONList.sort(
+            key=lambda jsondata: str(jsondata.get(key, '')).lower(),
+            reverse=(order == Qt.DescendingOrder)
+        )
+        self._search_index = None
+
+        # update persistent indexes
+        rows = dict(
+            (jsondata['filepath'], row) for row, jsondata in enumerate(self.imageJSONList)
+        )
+        new_indexes = [
+            self.index(rows[filepath], index.column())
+            for filepath, index in zip(old_filepaths, old_indexes)
+        ]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
 
+        self.updateViews()
 
     """ UTILS """
 
+    def getDefaultImage(self, row):
+        """
+        @row: <int>
+        @return: <tuple> (path, mtime) of the image displayed by default
+            for the row provided.  This is cached after the first lookup.
+        """
+        record = self.imageJSONList[row]
+        try:
+            return self._default_images[record.filepath]
+        except KeyError:
+            image_path = record.default_image
+            default_image = (image_path, ThumbnailCache.getMTime(image_path))
+            self._default_images[record.filepath] = default_image
+            return default_image
+
+    def getDisplayImage(self, row, width):
+        """
+        @row: <int>
+        @width: <int> width the image is displayed at
+        @return: <tuple> (path, mtime) of the image that is decoded to
+            display the default image of the row at the width provided.
+            This is the smallest level of the thumbnail pyramid that
+            covers the width, or the default image if there is none.
+        """
+        record = self.imageJSONList[row]
+        level = record.pyramid.getLevel(width) if record.pyramid else None
+        if level is None:
+            return self.getDefaultImage(row)
+
+        display_images = self._display_images.setdefault(record.filepath, {})
+        try:
+            return display_images[level]
+        except KeyError:
+            image_path = record.getDisplayPath(record.default_image, width)
+            display_image = (image_path, ThumbnailCache.getMTime(image_path))
+            display_images[level] = display_image
+            return display_image
+
+    def getRecord(self, row):
+        """
+        @row: <int>
+        @return: <AssetRecord>
+        """
+        return self.imageJSONList[row]
+
+    def getRecordFromFilepath(self, filepath):
+        """
+        @filepath: <str> path to json file
+        @return: <AssetRecord> or None if it is not in this model
+        """
+        if self._records is None:
+            self._records = dict(
+                (record.filepath, record) for record in self.imageJSONList
+            )
+        return self._records.get(filepath)
+
     def populateModelFromDirectory(self, filedirs_list):
         """
         populates all of the items in the model from a model
@@ -102,16 +256,9 @@ class ImageListModel(QAbstractTableModel):
         # check data, if good add it to the row list
         row_list = []
         for filepath in items:
-            try:
-                with open(filepath, 'r') as f:
-                    jsondata = json.load(f)
-            except IOError:
-                pass
-            except ValueError:
-                pass
-            else:
-                jsondata['filepath'] = filepath
-                row_list.append(jsondata)
+            record = AssetRecord.load(filepath)
+            if record is not None:
+                row_list.append(record)
 
         self.imageJSONList = row_list
 
@@ -122,32 +269,220 @@ class ImageListModel(QAbstractTableModel):
         # check data, if good add it to the row list
         row_list = []
         for filepath in json_list:
-            try:
-                with open(filepath, 'r') as f:
-                    jsondata = json.load(f)
-            except IOError:
-                pass
-            except ValueError:
-                pass
-            else:
-                jsondata['filepath'] = filepath
-                row_list.append(jsondata)
+            record = AssetRecord.load(filepath)
+            if record is not None:
+                row_list.append(record)
 
         self.imageJSONList = row_list
 
+    def populateModelFromRecords(self, record_list):
+        """
+        populates the model from records that have already been loaded,
+        this does not touch the file system.
+        @record_list: <list> of <AssetRecord>
+        """
+        self.imageJSONList = record_list
+
+    def populateModelFromIndex(self, index, filedirs_list):
+        """
+        populates all of the items in the model from the LibraryIndex,
+        this is a single query, and does not touch the file system.
+        @index: <LibraryIndex>
+        @filedirs_list: <list> of <str> paths to directories
+        """
+        self.imageJSONList = index.getRows(filedirs_list)
+
+    def insertJSONRows(self, row_list):
+        """
+        Appends rows to the end of the model, and adds them to all of
+        the views currently displaying this model.  This is used by the
+        ImageListLoader to stream rows into the model in batches.
+        @row_list: <list> of <AssetRecord> or <dict> json data
+        """
+        first = self.rowCount()
+        last = first + len(row_list) - 1
+        row_list = [AssetRecord.fromRow(row) for row in row_list]
+        self.beginInsertRows(QModelIndex(), first, last)
+        self.imageJSONList += row_list
+        self._search_index = None
+        self._records = None
+        self.endInsertRows()
+
+        # hide the new rows that do not match the current search
+        if self._search_query:
+            visible = set(bitsetToRows(self._search_query.execute(SearchIndex(row_list))))
+            self.metadata['hidden'].update(
+                record.filepath for row, record in enumerate(row_list)
+                if row not in visible
+            )
+
+        self.updateViewRows(first, last)
+
+    def removeFilepaths(self, filepaths):
+        """
+        Removes the rows of the json files provided.  Each run of
+        consecutive rows is removed with a single beginRemoveRows, so the
+        model based views only drop the rows that were removed.
+        @filepaths: <list> of <str> paths to json files
+        @return: <int> number of rows removed
+        """
+        rows = self.getRows(filepaths)
+        if not rows:
+            return 0
+
+        # group into ranges, and remove from the bottom up
+        ranges = []
+        for row in sorted(rows, reverse=True):
+            if ranges and ranges[-1][0] == row + 1:
+                ranges[-1][0] = row
+            else:
+                ranges.append([row, row])
+        for first, last in ranges:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.imageJSONList[first:last + 1]
+            self.endRemoveRows()
+
+        for filepath in filepaths:
+            self._default_images.pop(filepath, None)
+            self._display_images.pop(filepath, None)
+        self.metadata['hidden'].difference_update(filepaths)
+        self.metadata['selected'].difference_update(filepaths)
+        self._search_index = None
+        self._records = None
+        return len(rows)
+
+    def updateRecords(self, record_list):
+        """
+        Replaces the rows of the records provided with the new records,
+        this is used when a json file is modified on disk.
+        @record_list: <list> of <AssetRecord>
+        @return: <int> number of rows updated
+        """
+        rows = dict(
+            (record.filepath, row) for row, record in enumerate(self.imageJSONList)
+        )
+        num_updated = 0
+        for record in record_list:
+            row = rows.get(record.filepath)
+            if row is None:
+                continue
+            self.imageJSONList[row] = AssetRecord.fromRow(record)
+            self._default_images.pop(record.filepath, None)
+            self._display_images.pop(record.filepath, None)
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, self.columnCount() - 1)
+            )
+            num_updated += 1
+
+        if num_updated:
+            self._search_index = None
+            self._records = None
+        return num_updated
+
+    def getRows(self, filepaths):
+        """
+        @filepaths: <list> of <str> paths to json files
+        @return: <list> of <int> rows of the filepaths that are in this model
+        """
+        filepaths = set(filepaths)
+        return [
+            row for row, record in enumerate(self.imageJSONList)
+            if record.filepath in filepaths
+        ]
+
+    def containsDirectory(self, directory):
+        """
+        @directory: <str> path to directory
+        @return: <bool> True if the rows of this model are loaded from
+            the directory provided, or one of its parent directories
+        """
+        if self.directory is None:
+            return False
+        return directory == self.directory or directory.startswith(self.directory + '/')
+
+    """ SELECTION """
+
     def appendToSelectionList(self, path):
-        try:
-            self.metadata['selected'].remove(path)
-        except:
-            pass
-        finally:
-            self.metadata['selected'].append(path)
+        # moves the path to the end if it is already selected
+        self.metadata['selected'].append(path)
 
     def removeFromSelectionList(self, path):
-        try:
-            self.metadata['selected'].remove(path)
-        except ValueError:
-            pass
+        self.metadata['selected'].discard(path)
+
+    def getVisibleFilepaths(self, first=0, last=None):
+        """
+        @first: <int> first row
+        @last: <int> last row, if None this will be the last row in the model
+        @return: <list> of <str> paths to the json files of all of the rows
+            between first and last that are not hidden
+        """
+        if last is None:
+            last = self.rowCount() - 1
+        hidden = self.metadata['hidden']
+        return [
+            jsondata['filepath'] for jsondata in self.imageJSONList[first:last + 1]
+            if jsondata['filepath'] not in hidden
+        ]
+
+    def setSelection(self, filepaths):
+        """
+        Replaces the current selection
+        @filepaths: <list> of <str> paths to json files
+        """
+        self.metadata['selected'] = filepaths
+        self.notifySelectionChanged()
+
+    def selectAll(self):
+        """
+        Selects all of the rows that are not hidden
+        """
+        self.metadata['selected'].update(self.getVisibleFilepaths())
+        self.notifySelectionChanged()
+
+    def clearSelection(self):
+        self.metadata['selected'].clear()
+        self.notifySelectionChanged()
+
+    def invertSelection(self):
+        """
+        Inverts the selection of all of the rows that are not hidden.  Rows
+        that are hidden are left as is.
+        """
+        selected = self.metadata['selected']
+        visible = self.getVisibleFilepaths()
+        inverted = [filepath for filepath in visible if filepath not in selected]
+        selected.difference_update(visible)
+        selected.extend(inverted)
+        self.notifySelectionChanged()
+
+    def selectRange(self, first, last):
+        """
+        Adds all of the rows between first and last (inclusive) that are
+        not hidden to the selection.
+        @first: <int> row
+        @last: <int> row, this can be before first
+        """
+        if last < first:
+            first, last = last, first
+        self.metadata['selected'].update(self.getVisibleFilepaths(first, last))
+        self.notifySelectionChanged()
+
+    def notifySelectionChanged(self):
+        """
+        Sends a single update for the entire selection to all of the views,
+        this is used by the bulk operations rather than updating every row
+        one at a time.
+        """
+        if self.rowCount() > 0:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, self.columnCount() - 1),
+                [Qt.BackgroundRole]
+            )
+        self.selectionChanged.emit()
+        self.updateViewSelection()
+
+    """ SEARCH """
 
     def populateHideList(self, user_search_text):
         """
@@ -157,51 +492,39 @@ class ImageListModel(QAbstractTableModel):
                 jsonkey{regex, regex, regex}
                 ie
                     name{.*}
+        @return: <int> bitset of the rows that are displayed, or None
+            if nothing is hidden
         """
         # reset hidden list
         self.metadata['hidden'] = []
-        # get search text list...
-        search_param_list = user_search_text.replace(' ','').split('}')[:-1]
+        self._search_query = None
 
         # check for null cases to reset
-        if (
-            user_search_text.replace(' ', '') == ''
-            or len(search_param_list) == 0
-        ):
-            return
-        # temp list
-        hide_list = []
-
-        # run through list and check for matches in json files
-        for jsondata in self.imageJSONList:
-            hide_list.append(jsondata['filepath'])
-            for search_param in search_param_list:
-                # test{} blahhaha{} akdlsjf{}
-                # test{asdf,asdf,asdf}
-                try:
-                    # split data into key and regex
-                    user_search_key, user_regex = search_param.split('{')
-                    # check to make sure the key exists
-                    key_data = jsondata[user_search_key]
-
-                    # get the user regex for this specific key
-                    for regex in user_regex.split(','):
-                        if re.search(regex, key_data):
-                            try:
-                                hide_list.remove(jsondata['filepath'])
-                            except ValueError:
-                                """
-                                bypass incase this gets multiple
-                                hits from the regex list
-                                """
-                                pass
-                except KeyError:
-                    print('{key} does not exist in {file}'.format(
-                        key=user_search_key,
-                        file=jsondata['filepath'])
-                    )
-
-        self.metadata['hidden'] = hide_list
+        query = SearchQuery.parse(user_search_text)
+        if query.isEmpty():
+            return None
+        # rows inserted later are filtered by the same query
+        self._search_query = query
+
+        # run query
+        visible_rows = query.execute(self.getSearchIndex())
+        visible = set(bitsetToRows(visible_rows))
+        self.metadata['hidden'] = [
+            jsondata['filepath'] for row, jsondata in enumerate(self.imageJSONList)
+            if row not in visible
+        ]
+        return visible_rows
+
+    def getSearchIndex(self):
+        """
+        @return: <SearchIndex> of the current rows, this is built the
+            first time it is needed, and reset whenever the rows change
+        """
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.imageJSONList)
+        return self._search_index
+
+    """ VIEWS """
 
     def updateViews(self):
         """
@@ -212,12 +535,66 @@ class ImageListModel(QAbstractTableModel):
 
         detailed_view = main_widget.detailed_view
         thumbnail_view = main_widget.thumbnail_view
+        icon_view = main_widget.icon_view
+        table_view = main_widget.table_view
         list_view = main_widget.list_view
-        views = [detailed_view, thumbnail_view, list_view]
+        views = [detailed_view, thumbnail_view, icon_view, table_view, list_view]
 
         for view in views:
             view.update()
 
+        # the thumbnails have been sliced out of the atlases
+        AtlasCache.instance().releasePages()
+
+    def updateViewSelection(self, filepaths=None):
+        """
+        Updates the display of the selection in all of the views, without
+        rebuilding them.
+        @filepaths: <list> of <str> paths to the json files whose selection
+            changed, if None every row is updated
+        """
+        main_widget = gUtils.getMainWidget(self._parent_widget, 'Library')
+        if not main_widget:
+            return
+
+        detailed_view = main_widget.detailed_view
+        thumbnail_view = main_widget.thumbnail_view
+        icon_view = main_widget.icon_view
+        table_view = main_widget.table_view
+        list_view = main_widget.list_view
+        views = [detailed_view, thumbnail_view, icon_view, table_view, list_view]
+
+        if filepaths is not None:
+            filepaths = set(filepaths)
+        for view in views:
+            view.updateSelection(filepaths)
+
+    def updateViewRows(self, first, last):
+        """
+        Adds the rows from first to last to all of the views that
+        are currently displaying this model, without rebuilding them.
+        @first: <int> first row inserted
+        @last: <int> last row inserted
+        """
+        main_widget = gUtils.getMainWidget(self._parent_widget, 'Library')
+        if not main_widget:
+            return
+
+        detailed_view = main_widget.detailed_view
+        thumbnail_view = main_widget.thumbnail_view
+        list_view = main_widget.list_view
+        views = [detailed_view, thumbnail_view, list_view]
+
+        for view in views:
+            if getattr(view, 'model', None) is self:
+                view.insertRowWidgets(first, last)
+
+        # the model based views add the rows themselves, but
+        # do not know which of them are hidden
+        for view in [main_widget.icon_view, main_widget.table_view]:
+            if view.model() is self:
+                view.updateHiddenRows(first, last)
+
     """ PROPERTIES """
 
     @property
@@ -236,13 +613,35 @@ class ImageListModel(QAbstractTableModel):
     def image_size(self, image_size):
         self._image_size = image_size
 
+    @property
+    def decoration_size(self):
+        return self._decoration_size
+
+    @decoration_size.setter
+    def decoration_size(self, decoration_size):
+        self._decoration_size = decoration_size
+
+    @property
+    def directory(self):
+        """
+        <str> path to the directory the rows were loaded from, this is
+        used to decide which changes on disk belong to this model.
+        """
+        return self._directory
+
+    @directory.setter
+    def directory(self, directory):
+        self._directory = directory
+
     @property
     def imageJSONList(self):
         return self._imageJSONList
 
     @imageJSONList.setter
     def imageJSONList(self, jsondata):
-        self._imageJSONList = jsondata
+        self._imageJSONList = [AssetRecord.fromRow(row) for row in jsondata]
+        self._search_index = None
+        self._records = None
 
     @property
     def metadata(self):
@@ -250,6 +649,8 @@ class ImageListModel(QAbstractTableModel):
 
     @metadata.setter
     def metadata(self, metadata):
+        if not isinstance(metadata, ImageListMetadata):
+            metadata = ImageListMetadata(metadata)
         self._metadata = metadata
 
 
@@ -276,9 +677,23 @@ class ThumbnailViewWidget(QScrollArea):
         self.main_layout.setAlignment(Qt.AlignTop | Qt.AlignLeft)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.setSpacing(self.spacing)
+        self._widget_list = []
+        self._is_dirty = False
         self.top_level_widget.setSizePolicy(
             QSizePolicy.Fixed, QSizePolicy.Fixed
         )
+
+        # cell (row, column) of each widget in the grid, and the number of
+        # columns it was laid out with, so resizing only moves the widgets
+        # whose cell has changed
+        self._cells = {}
+        self._layout_num_columns = None
+
+        # coalesce resize events into one relayout per frame
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(16)
+        self._resize_timer.timeout.connect(self.resizeWidgets)
         """
         self.setMinimumHeight(1)
 
@@ -325,7 +740,14 @@ class ThumbnailViewWidget(QScrollArea):
         self.model = model
         # reset
         # self.resetHeaderWidgetLists()
-        gUtils.clearLayout(self.main_layout)
+        self.resetLayout()
+
+        # widgets are only created when this view is visible
+        if not self.isVisible():
+            self.widget_list = []
+            self._is_dirty = True
+            return
+        self._is_dirty = False
 
         # populate model
         widget_list = []
@@ -360,6 +782,41 @@ class ThumbnailViewWidget(QScrollArea):
             pass
         """
 
+    def insertRowWidgets(self, first, last):
+        """
+        Creates the items for the rows that have been appended to the
+        model, and adds them to the end of the layout
+        @first: <int> first row inserted
+        @last: <int> last row inserted
+        """
+        if self._is_dirty or not self.isVisible():
+            self._is_dirty = True
+            return
+
+        num_columns = self.num_columns
+        if not num_columns:
+            num_columns = self.getNumColumns()
+            self.num_columns = num_columns
+
+        for row in range(first, last + 1):
+            jsondata = self.model.imageJSONList[row]
+            if jsondata['filepath'] not in self.model.metadata['hidden']:
+                thumbnail_view_item = ThumbnailViewItem(
+                    parent=self,
+                    name=jsondata['name'],
+                    image_size=self.image_size,
+                    jsondata=jsondata
+                )
+                if thumbnail_view_item.image_widget.isSelected():
+                    thumbnail_view_item.image_widget.setSelected()
+
+                index = len(self.widget_list)
+                self.widget_list.append(thumbnail_view_item)
+                cell = divmod(index, num_columns)
+                self.main_layout.addWidget(thumbnail_view_item, *cell)
+                self._cells[thumbnail_view_item] = cell
+                self._layout_num_columns = num_columns
+
     def getNumColumns(self):
         """
         @return: <int> number of columns based off of the
@@ -391,22 +848,48 @@ class ThumbnailViewWidget(QScrollArea):
         return num_columns
 
     def layoutWidgets(self, num_columns=None):
+        """
+        Places each widget in its cell of the grid.  If the number of
+        columns has not changed since the last layout, nothing is done,
+        otherwise only the widgets whose cell has changed are moved.
+        @num_columns: <int> if not provided, this is calculated
+            from the width of this widget
+        """
         # get num columns
         if not num_columns:
             num_columns = self.getNumColumns()
             self.num_columns = num_columns
+        if num_columns == self._layout_num_columns:
+            return
 
-        # clear layout
-        gUtils.clearLayout(self.main_layout)
+        # move the widgets whose cell has changed
+        cells = {}
+        for index, widget in enumerate(self.widget_list):
+            cell = divmod(index, num_columns)
+            old_cell = self._cells.get(widget)
+            if old_cell != cell:
+                if old_cell is not None:
+                    self.main_layout.removeWidget(widget)
+                self.main_layout.addWidget(widget, *cell)
+            cells[widget] = cell
+
+        self._cells = cells
+        self._layout_num_columns = num_columns
+
+    def resizeWidgets(self):
+        """
+        Called once per frame while this widget is being resized
+        """
+        self.layoutWidgets()
 
-        # populate layout
-        if hasattr(self, 'widget_list'):
-            for index, widget in enumerate(self.widget_list):
-                self.main_layout.addWidget(
-                    widget,
-                    int(index / num_columns),
-                    index % num_columns
-                )
+    def resetLayout(self):
+        """
+        Removes all of the widgets from the grid, the next call to
+        layoutWidgets() will add every widget again
+        """
+        gUtils.clearLayout(self.main_layout)
+        self._cells = {}
+        self._layout_num_columns = None
 
     def update(self):
         self.image_size = gUtils.getMainWidget(self, 'Library').image_size
@@ -417,16 +900,31 @@ class ThumbnailViewWidget(QScrollArea):
             pass
 
         # update selected items...
+        self.updateSelection()
+
+    def updateSelection(self, filepaths=None):
+        """
+        @filepaths: <set> of <str> paths to the json files to update,
+            if None every widget is updated
+        """
         for widget in self.widget_list:
-            if widget.image_widget.isSelected():
-                widget.image_widget.setSelected()
-            else:
-                widget.image_widget.setUnselected()
+            image_widget = widget.image_widget
+            if filepaths is None or image_widget.json_file in filepaths:
+                image_widget.updateSelection()
 
     """ EVENTS """
 
+    def showEvent(self, event, *args, **kwargs):
+        # create the widgets if the model was set while hidden
+        if self._is_dirty is True:
+            self.update()
+        return QScrollArea.showEvent(self, event, *args, **kwargs)
+
     def resizeEvent(self, event, *args, **kwargs):
-        self.layoutWidgets()
+        # deferred to the next frame, so dragging the edge of the
+        # window only relayouts once per frame
+        if not self._resize_timer.isActive():
+            self._resize_timer.start()
         return QScrollArea.resizeEvent(self, event, *args, **kwargs)
 
 
@@ -487,6 +985,476 @@ class ThumbnailViewItem(QWidget):
         self._image_widget = image_widget
 
 
+class AbstractImageIndexView(object):
+    """
+    Mouse interaction for the views that paint their rows rather than
+    creating a widget for each one.  This mimics the ImageWidget
+        LMB Click: toggle selection
+        Shift + LMB Click: select all of the rows between the last
+            row clicked and this one
+        LMB Click + Drag: activate the full screen display
+        MMB Click + Drag: LibraryWidget.imageClickedEvent (drag/drop)
+
+    The selection is stored on the model (metadata['selected']) just
+    like the widget based views.
+    @activation_distance: <int> how far the mouse has to move while the LMB
+        is pressed before the full screen display is activated
+    """
+    def __init__(self):
+        self._activation_distance = 20
+        self._activated = False
+        self._button = None
+        self._init_pos = QPoint()
+        self._press_index = QModelIndex()
+        self._anchor_row = None
+
+    @property
+    def activation_distance(self):
+        return self._activation_distance
+
+    @activation_distance.setter
+    def activation_distance(self, activation_distance):
+        self._activation_distance = activation_distance
+
+    def getImageWidth(self):
+        """
+        Virtual function that returns the width of the image
+        displayed for each row
+        """
+        return 0
+
+    def updateSelection(self, filepaths=None):
+        self.viewport().update()
+
+    def getImageIndex(self, index):
+        """
+        @index: <QModelIndex>
+        @return: <ImageIndex> for the index provided
+        """
+        return ImageIndex(
+            model=self.model(),
+            row=index.row(),
+            image_width=self.getImageWidth(),
+            button=self._button
+        )
+
+    def imageIndexPressEvent(self, event):
+        """
+        @return: <bool> True if the event was handled
+        """
+        index = self.indexAt(event.pos())
+        self._press_index = index
+        self._button = event.button()
+        self._activated = False
+        if not index.isValid():
+            return False
+
+        # set initial position for drag slider
+        self._init_pos = QCursor.pos()
+        image_index = self.getImageIndex(index)
+        if event.button() == Qt.MiddleButton:
+            image_index.setSelected()
+            self.viewport().update()
+
+        main_widget = gUtils.getMainWidget(self, 'Library')
+        main_widget.imageClickedEvent(event, image_index)
+        return True
+
+    def imageIndexMoveEvent(self, event):
+        """
+        Activates the full screen display if the user click/drags
+        on a thumbnail
+        @return: <bool> True if the event was handled
+        """
+        if self._button != Qt.LeftButton or not self._press_index.isValid():
+            return False
+        if self._activated is True:
+            return True
+
+        mmd = self._init_pos.x() - QCursor.pos().x()
+        if mmd > self.activation_distance or mmd < -self.activation_distance:
+            self.getImageIndex(self._press_index).setSelected()
+            self._activated = True
+            main_widget = gUtils.getMainWidget(self, 'Library')
+            main_widget.activateFullScreenDisplay()
+        return True
+
+    def imageIndexReleaseEvent(self, event):
+        """
+        @return: <bool> True if the event was handled
+        """
+        index = self._press_index
+        self._press_index = QModelIndex()
+        if not index.isValid():
+            return False
+
+        # selection toggle used if the full screen has been activated
+        if event.button() == Qt.LeftButton:
+            activated = self._activated
+            self._activated = False
+            if activated is False:
+                if event.modifiers() & Qt.ShiftModifier and self._anchor_row is not None:
+                    # updates the views itself
+                    self.model().selectRange(self._anchor_row, index.row())
+                    return True
+
+                image_index = self.getImageIndex(index)
+                if image_index.isSelected():
+                    image_index.setUnselected()
+                else:
+                    image_index.setSelected()
+                self._anchor_row = index.row()
+
+        self.model().updateViewSelection()
+        return True
+
+
+class IconViewWidget(QListView, AbstractImageIndexView):
+    """
+    Thumbnail view that paints the items rather than creating a widget
+    for every row.  Only the items that are visible are painted by the
+    IconViewDelegate, so the memory used by this view does not grow with
+    the size of the library.
+
+    @image_size: <int> size of the thumbnails
+    @border_width: <int> width of the selection border
+    """
+    def __init__(self, parent=None):
+        super(IconViewWidget, self).__init__(parent)
+        AbstractImageIndexView.__init__(self)
+        # global attributes
+        self._image_size = 100
+        self._border_width = iUtils.getSetting('IMAGE_SELECTED_BORDER_WIDTH')
+
+        # setup view
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setWrapping(True)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setDragEnabled(False)
+        self.setSpacing(15)
+        self.setItemDelegate(IconViewDelegate(self))
+        self.setIconSize(QSize(self.image_size, self.image_size))
+
+    """ PROPERTIES """
+
+    @property
+    def image_size(self):
+        return self._image_size
+
+    @image_size.setter
+    def image_size(self, image_size):
+        self._image_size = image_size
+        self.setIconSize(QSize(image_size, image_size))
+
+    @property
+    def border_width(self):
+        return self._border_width
+
+    """ FUNCTIONS """
+
+    def setModel(self, model):
+        QListView.setModel(self, model)
+        self._anchor_row = None
+        self.updateHiddenRows()
+
+    def updateHiddenRows(self, first=0, last=None):
+        """
+        Hides all of the rows that are in the models hidden list
+        @first: <int> first row to update
+        @last: <int> last row to update, if None this will
+            update every row after the first
+        """
+        model = self.model()
+        if not model:
+            return
+        if last is None:
+            last = model.rowCount() - 1
+        hidden = model.metadata['hidden']
+        for row in range(first, last + 1):
+            filepath = model.imageJSONList[row]['filepath']
+            self.setRowHidden(row, filepath in hidden)
+
+    def update(self):
+        self._border_width = iUtils.getSetting('IMAGE_SELECTED_BORDER_WIDTH')
+        main_widget = gUtils.getMainWidget(self, 'Library')
+        try:
+            self.image_size = main_widget.image_size
+        except AttributeError:
+            pass
+        self.updateHiddenRows()
+        self.viewport().update()
+
+    def getImageWidth(self):
+        return self.image_size - (self.border_width * 2)
+
+    """ EVENTS """
+
+    def mousePressEvent(self, event, *args, **kwargs):
+        if not self.imageIndexPressEvent(event):
+            return QListView.mousePressEvent(self, event, *args, **kwargs)
+
+    def mouseMoveEvent(self, event, *args, **kwargs):
+        self.imageIndexMoveEvent(event)
+
+    def mouseReleaseEvent(self, event, *args, **kwargs):
+        if not self.imageIndexReleaseEvent(event):
+            return QListView.mouseReleaseEvent(self, event, *args, **kwargs)
+
+
+class IconViewDelegate(QStyledItemDelegate):
+    """
+    Paints a single thumbnail, its selection border and name
+    for the IconViewWidget
+    """
+    def __init__(self, parent=None):
+        super(IconViewDelegate, self).__init__(parent)
+        self._selected_color = QColor(255, 200, 0, 255)
+
+    def sizeHint(self, option, index):
+        view = self.parent()
+        image_size = view.image_size
+        return QSize(image_size, image_size + option.fontMetrics.height())
+
+    def paint(self, painter, option, index):
+        view = self.parent()
+        model = index.model()
+        image_size = view.image_size
+        border_width = view.border_width
+        rect = option.rect
+
+        painter.save()
+
+        # draw image
+        image_width = image_size - (border_width * 2)
+        image_path, mtime = model.getDisplayImage(index.row(), image_width)
+        if image_path:
+            pixmap = ThumbnailCache.instance().pixmap(
+                image_path, image_width, mtime=mtime
+            )
+            y_offset = max(0, (image_size - (border_width * 2) - pixmap.height()) * 0.5)
+            painter.drawPixmap(
+                rect.x() + border_width,
+                int(rect.y() + border_width + y_offset),
+                pixmap
+            )
+
+        # draw selection border
+        filepath = index.data(ImageListModel.FILEPATH_ROLE)
+        if filepath in model.metadata['selected']:
+            pen = QPen(self._selected_color)
+            pen.setWidth(border_width)
+            pen.setJoinStyle(Qt.MiterJoin)
+            painter.setPen(pen)
+            painter.setBrush(Qt.NoBrush)
+            offset = border_width * 0.5
+            painter.drawRect(QRectF(
+                rect.x() + offset,
+                rect.y() + offset,
+                image_size - border_width,
+                image_size - border_width
+            ))
+
+        # draw name
+        name = index.data(Qt.DisplayRole)
+        text_rect = QRect(
+            rect.x(), rect.y() + image_size,
+            image_size, rect.height() - image_size
+        )
+        painter.setPen(option.palette.color(QPalette.Text))
+        painter.drawText(
+            text_rect,
+            Qt.AlignLeft | Qt.AlignVCenter,
+            option.fontMetrics.elidedText(str(name), Qt.ElideRight, image_size)
+        )
+
+        painter.restore()
+
+
+class ImageIndex(object):
+    """
+    Stand in for an ImageWidget, for views that paint their rows rather
+    than creating a widget for each one.  This has the same interface
+    that is used by the selection, and LibraryWidget.imageClickedEvent
+
+    @model: <ImageListModel>
+    @row: <int> row in the model
+    @record: <AssetRecord> record of the row
+    @image_width: <int> width the image is displayed at
+    @button: <Qt.MouseButton> current button being pressed
+    """
+    def __init__(self, model=None, row=None, image_width=None, button=None):
+        record = model.getRecord(row)
+        self.model = model
+        self.record = record
+        self.button = button
+        self.image_width = image_width
+        self.json_file = record.filepath
+        self.proxyImageDir = record.proxy_dir
+
+        image_path = record.default_image
+        if image_path:
+            self.currentImage = os.path.basename(image_path)
+        else:
+            self.currentImage = None
+
+    def isSelected(self):
+        return self.json_file in self.model.metadata['selected']
+
+    def setSelected(self):
+        self.model.appendToSelectionList(self.json_file)
+
+    def setUnselected(self):
+        self.model.removeFromSelectionList(self.json_file)
+
+
+class TableViewWidget(QTableView, AbstractImageIndexView):
+    """
+    Detailed view that puts a QTableView directly on the ImageListModel.
+    The thumbnails are the Qt.DecorationRole of the first column, which are
+    served from the ThumbnailCache, so only the rows that are visible are
+    ever decoded.  Clicking on a column header will sort by that column.
+
+    @image_size: <int> height of the rows
+    @border_width: <int> width of the selection border
+    @column_width: <int> default width of the columns, the first column
+        is widened by the image size to make room for the thumbnail
+    """
+    def __init__(self, parent=None):
+        super(TableViewWidget, self).__init__(parent)
+        AbstractImageIndexView.__init__(self)
+        # global attributes
+        self._image_size = 100
+        self._column_width = 100
+        self._border_width = iUtils.getSetting('IMAGE_SELECTED_BORDER_WIDTH')
+
+        # setup view
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setDragEnabled(False)
+        self.setWordWrap(False)
+        self.setShowGrid(False)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.horizontalHeader().setDefaultSectionSize(self._column_width)
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.image_size = self._image_size
+
+    """ PROPERTIES """
+
+    @property
+    def image_size(self):
+        return self._image_size
+
+    @image_size.setter
+    def image_size(self, image_size):
+        self._image_size = image_size
+        image_width = self.getImageWidth()
+        self.setIconSize(QSize(image_width, image_width))
+        self.verticalHeader().setDefaultSectionSize(image_size)
+        self.setColumnWidth(0, image_size + self.column_width)
+        model = self.model()
+        if model:
+            model.decoration_size = image_width
+
+    @property
+    def border_width(self):
+        return self._border_width
+
+    @property
+    def column_width(self):
+        return self._column_width
+
+    @column_width.setter
+    def column_width(self, column_width):
+        self._column_width = column_width
+        self.horizontalHeader().setDefaultSectionSize(column_width)
+
+    """ FUNCTIONS """
+
+    def setModel(self, model):
+        old_model = self.model()
+        if old_model is model:
+            return
+        if old_model:
+            old_model.layoutChanged.disconnect(self.__layoutChanged)
+
+        model.decoration_size = self.getImageWidth()
+        QTableView.setModel(self, model)
+        self._anchor_row = None
+        self.setColumnWidth(0, self.image_size + self.column_width)
+        model.layoutChanged.connect(self.__layoutChanged)
+
+        # keep the current sort order
+        self.sortModel()
+        self.updateHiddenRows()
+
+    def sortModel(self):
+        """
+        Sorts the model by the column that is currently selected in the
+        header.  Rows are streamed into the model unsorted, so this is
+        run again once they have all been loaded.
+        """
+        model = self.model()
+        header = self.horizontalHeader()
+        if model and 0 <= header.sortIndicatorSection():
+            model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+    def updateHiddenRows(self, first=0, last=None):
+        """
+        Hides all of the rows that are in the models hidden list
+        @first: <int> first row to update
+        @last: <int> last row to update, if None this will
+            update every row after the first
+        """
+        model = self.model()
+        if not model:
+            return
+        if last is None:
+            last = model.rowCount() - 1
+        hidden = model.metadata['hidden']
+        for row in range(first, last + 1):
+            filepath = model.imageJSONList[row]['filepath']
+            self.setRowHidden(row, filepath in hidden)
+
+    def update(self):
+        self._border_width = iUtils.getSetting('IMAGE_SELECTED_BORDER_WIDTH')
+        main_widget = gUtils.getMainWidget(self, 'Library')
+        try:
+            self.image_size = main_widget.image_size
+        except AttributeError:
+            pass
+        self.updateHiddenRows()
+        self.viewport().update()
+
+    def getImageWidth(self):
+        return self.image_size - (self.border_width * 2)
+
+    """ EVENTS """
+
+    def __layoutChanged(self, *args):
+        # the rows have been sorted
+        self.updateHiddenRows()
+
+    def mousePressEvent(self, event, *args, **kwargs):
+        if not self.imageIndexPressEvent(event):
+            return QTableView.mousePressEvent(self, event, *args, **kwargs)
+
+    def mouseMoveEvent(self, event, *args, **kwargs):
+        self.imageIndexMoveEvent(event)
+
+    def mouseReleaseEvent(self, event, *args, **kwargs):
+        if not self.imageIndexReleaseEvent(event):
+            return QTableView.mouseReleaseEvent(self, event, *args, **kwargs)
+
+
 class DetailedViewWidget(QWidget):
     """
     @header_position < int > height of the horizontal header
@@ -521,6 +1489,7 @@ class DetailedViewWidget(QWidget):
         self._column_width = 100
         self._column_spacing = 5
         self._header_position = 40
+        self._is_dirty = False
 
         # main layout
         self.main_layout = QHBoxLayout()
@@ -569,6 +1538,13 @@ class DetailedViewWidget(QWidget):
         self.resetHeaderWidgetLists()
         gUtils.clearLayout(self.main_table.main_layout)
 
+        # widgets are only created when this view is visible
+        if not self.isVisible():
+            gUtils.clearLayout(self.vheader.main_layout)
+            self._is_dirty = True
+            return
+        self._is_dirty = False
+
         # update view
         for row in range(model.rowCount()):
             jsondata = model.imageJSONList[row]
@@ -581,7 +1557,32 @@ class DetailedViewWidget(QWidget):
         self.hheader.updateColumnsWidth()
         self.vheader.update()
 
+    def insertRowWidgets(self, first, last):
+        """
+        Creates the rows for the items that have been appended to
+        the model, without rebuilding the rest of the table
+        @first: <int> first row inserted
+        @last: <int> last row inserted
+        """
+        if self._is_dirty or not self.isVisible():
+            self._is_dirty = True
+            return
+
+        for row in range(first, last + 1):
+            jsondata = self.model.imageJSONList[row]
+            if jsondata['filepath'] not in self.model.metadata['hidden']:
+                item = DetailedViewItem(self, jsondata=jsondata)
+                item.setFixedHeight(self.row_height)
+                self.main_table.main_layout.addWidget(item)
+
+        self.vheader.insertRows(first, last)
+
     def update(self):
+        # widgets are only created when this view is visible
+        if not self.isVisible():
+            self._is_dirty = True
+            return
+
         # self.image_size = gUtils.getMainWidget(self, 'Library').image_size
         self.row_height = gUtils.getMainWidget(self, 'Library').image_size
         # update model
@@ -592,13 +1593,24 @@ class DetailedViewWidget(QWidget):
             pass
 
         # update selected items...
+        self.updateSelection()
+
+    def updateSelection(self, filepaths=None):
+        """
+        @filepaths: <set> of <str> paths to the json files to update,
+            if None every widget is updated
+        """
         layout = self.vheader.main_layout
         for index in range(layout.count()):
             widget = layout.itemAt(index).widget()
-            if widget.isSelected():
-                widget.setSelected()
-            else:
-                widget.setUnselected()
+            if filepaths is None or widget.json_file in filepaths:
+                widget.updateSelection()
+
+    def showEvent(self, event, *args, **kwargs):
+        # create the widgets if the model was set while hidden
+        if self._is_dirty is True:
+            self.update()
+        return QWidget.showEvent(self, event, *args, **kwargs)
 
     """  PROPERTIES """
 
@@ -796,15 +1808,27 @@ class DetailedViewVerticalHeader(QWidget):
     def populate(self):
 
         model = self.parent().model
-        for row in range(model.rowCount()):
+        self.insertRows(0, model.rowCount() - 1)
+        return
+
+    def insertRows(self, first, last):
+        """
+        Creates the image widgets for the rows provided, and
+        appends them to the end of the header
+        @first: <int> first row
+        @last: <int> last row
+        """
+        model = self.parent().model
+        for row in range(first, last + 1):
             jsondata = model.imageJSONList[row]
             if jsondata['filepath'] not in model.metadata['hidden']:
                 image_widget, self.pixmap = iUtils.createImageWidget(
                     self, jsondata, self.getRowHeight()
                 )
                 #image_widget.setFixedWidth(self.getRowHeight())
+                if image_widget.isSelected():
+                    image_widget.setSelected()
                 self.main_layout.addWidget(image_widget)
-        return
 
 
 class DetailedViewHorizontalHeader(QScrollArea):
@@ -885,6 +1909,7 @@ class DetailedViewHorizontalHeaderItem(QLabel):
 
     def appendWidget(self, widget):
         self._widget_list.append(widget)
+        widget.setFixedWidth(self.width())
 
     def resetWidgetList(self):
         self._widget_list = []
@@ -0,0 +1,515 @@
+"""
+Live updates of the library from the file system.
+
+The LibraryWatcher watches the directories of the library that have been
+displayed, and when one of them changes it rescans only that directory,
+compares it against the snapshot taken the last time it was scanned, and
+reports the files/directories that were created, modified, or removed.
+
+The events are batched over a short window (WATCHER_BATCH_INTERVAL), so
+writing a json file (which can send several events) only results in a
+single update.
+
+Backends:
+    qt: QFileSystemWatcher
+    inotify: Linux only, reads the inotify events directly (through ctypes),
+        this also reports files that are modified in place.
+    auto: inotify if it is available, otherwise qt
+"""
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+from qtpy.QtCore import *
+
+from .__utils__ import iUtils
+from .Record import AssetRecord
+
+
+class InotifyWatcher(QObject):
+    """
+    Minimal inotify backend with the same interface as the parts of the
+    QFileSystemWatcher that are used by the LibraryWatcher.
+    """
+    directoryChanged = Signal(str)
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    MASK = (
+        IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+        | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    )
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, parent=None):
+        super(InotifyWatcher, self).__init__(parent)
+        self._libc = self.getLibC()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        self._watches = {}
+        self._paths = {}
+        self._notifier = QSocketNotifier(self._fd, QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self.__readEvents)
+
+    @staticmethod
+    def getLibC():
+        """
+        @return: <ctypes.CDLL> libc, if it has the inotify functions
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify is only available on Linux')
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        return libc
+
+    @classmethod
+    def isAvailable(cls):
+        try:
+            cls.getLibC()
+        except OSError:
+            return False
+        return True
+
+    def addPath(self, path):
+        if path in self._paths:
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, path.encode(), self.MASK)
+        if wd < 0:
+            return False
+        self._watches[wd] = path
+        self._paths[path] = wd
+        return True
+
+    def removePath(self, path):
+        wd = self._paths.pop(path, None)
+        if wd is None:
+            return False
+        self._watches.pop(wd, None)
+        self._libc.inotify_rm_watch(self._fd, wd)
+        return True
+
+    def directories(self):
+        return list(self._paths.keys())
+
+    def close(self):
+        self._notifier.setEnabled(False)
+        os.close(self._fd)
+
+    """ EVENTS """
+
+    def __readEvents(self, *args):
+        changed = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size + length
+                path = self._watches.get(wd)
+                if path is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    # watch was removed by the kernel (directory deleted)
+                    self._watches.pop(wd, None)
+                    self._paths.pop(path, None)
+                if path not in changed:
+                    changed.append(path)
+
+        for path in changed:
+            self.directoryChanged.emit(path)
+
+
+class LibraryWatcher(QObject):
+    """
+    @batch_interval: <int> number of milliseconds events are gathered
+        for before the directories that changed are rescanned
+    @backend: <QFileSystemWatcher> or <InotifyWatcher>
+
+    filesChanged is emitted with
+        created: <list> of <AssetRecord>
+        modified: <list> of <AssetRecord>
+        removed: <list> of <str> paths to json files
+    directoriesChanged is emitted with
+        created: <list> of <str> paths to directories
+        removed: <list> of <str> paths to directories
+    """
+    filesChanged = Signal(object, object, object)
+    directoriesChanged = Signal(object, object)
+    directoriesScanned = Signal(object)
+
+    def __init__(self, parent=None, backend=None, batch_interval=None):
+        super(LibraryWatcher, self).__init__(parent)
+        if backend is None:
+            backend = iUtils.getSetting('WATCHER_BACKEND')
+        if batch_interval is None:
+            batch_interval = iUtils.getSetting('WATCHER_BATCH_INTERVAL')
+
+        self._backend = self.createBackend(backend)
+        self._backend.directoryChanged.connect(self.__directoryChanged)
+
+        # snapshots of each watched directory {name: (is_dir, mtime, size)}
+        self._snapshots = {}
+        self._pending = {}
+        self._tree_roots = set()
+        # paths the backend is watching, and the paths that were
+        # added directly (rather than as part of a tree)
+        self._watched = set()
+        self._pinned = set()
+        self._is_scanning = False
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.setInterval(batch_interval)
+        self._batch_timer.timeout.connect(self.flush)
+
+        self.directoriesScanned.connect(self.__directoriesScanned)
+
+    def createBackend(self, backend):
+        """
+        @backend: <str> 'auto' | 'inotify' | 'qt'
+        @return: <QFileSystemWatcher> or <InotifyWatcher>
+        """
+        if backend in ('auto', 'inotify'):
+            try:
+                return InotifyWatcher(self)
+            except OSError:
+                if backend == 'inotify':
+                    raise
+        return QFileSystemWatcher(self)
+
+    """ API """
+
+    def addDirectory(self, directory):
+        """
+        Starts watching the directory provided, until it is removed with
+        removeDirectory().  The directory is scanned in the background to
+        take the initial snapshot.
+        @directory: <str> path to directory
+        """
+        self._pinned.add(directory)
+        self.watchDirectory(directory)
+
+    def addDirectories(self, directories):
+        for directory in directories:
+            self.addDirectory(directory)
+
+    def removeDirectory(self, directory):
+        """
+        Stops watching the directory provided, and everything underneath it
+        """
+        prefix = directory + '/'
+        for path in list(self._watched):
+            if path == directory or path.startswith(prefix):
+                self.unwatchDirectory(path)
+
+    def watchTree(self, directory):
+        """
+        Watches the directory provided and all of its sub directories.  The
+        sub directories are found when it is scanned, so this does not
+        walk the tree on the GUI thread.
+        @directory: <str> path to directory
+        """
+        self._tree_roots.add(directory)
+
+        # sub directories that were already scanned are watched now, the
+        # rest are watched when their parent's scan finishes
+        directories = [directory]
+        while directories:
+            directory = directories.pop()
+            self.watchDirectory(directory)
+            snapshot = self._snapshots.get(directory, {})
+            for name, (is_dir, mtime, size) in sorted(snapshot.items()):
+                if is_dir:
+                    directories.append('/'.join([directory, name]))
+
+    def unwatchTree(self, directory):
+        """
+        Stops watching the tree provided.  The directories in it that were
+        added with addDirectory(), or that are in another tree that is
+        being watched, are still watched.
+        @directory: <str> path to directory provided to watchTree
+        """
+        self._tree_roots.discard(directory)
+        prefix = directory + '/'
+        for path in list(self._watched):
+            if path != directory and not path.startswith(prefix):
+                continue
+            if path in self._pinned or self.isWatchingTree(path):
+                continue
+            self.unwatchDirectory(path)
+
+    def directories(self):
+        return list(self._snapshots.keys())
+
+    def isWatched(self, directory):
+        return directory in self._snapshots
+
+    def isWatchingTree(self, directory):
+        """
+        @return: <bool> True if the directory is underneath a directory
+            that was provided to watchTree
+        """
+        for root in self._tree_roots:
+            if directory == root or directory.startswith(root + '/'):
+                return True
+        return False
+
+    def flush(self):
+        """
+        Rescans all of the directories that have changed now, rather
+        than waiting for the batch interval
+        """
+        self._batch_timer.stop()
+        self.scan()
+
+    def waitForDone(self, msecs=-1):
+        """
+        Blocks until all of the pending scans have finished, and
+        their results have been delivered
+        """
+        while True:
+            self._pool.waitForDone(msecs)
+            QCoreApplication.processEvents()
+            if not self._is_scanning and not self._pending:
+                return
+
+    """ UTILS """
+
+    def watchDirectory(self, directory, report=False):
+        """
+        Adds the directory provided to the backend, and queues the scan
+        of its initial snapshot.
+        @report: <bool> if True, everything that is currently in the
+            directory is reported as created.  This is used for
+            directories that are created while they are being watched.
+        """
+        if directory in self._snapshots or directory in self._pending:
+            return
+        if not self._backend.addPath(directory):
+            return
+        self._watched.add(directory)
+        self._pending[directory] = {} if report else None
+        self.scan()
+
+    def unwatchDirectory(self, directory):
+        """
+        Removes the directory provided from the backend, any scan of it that
+        is in flight is dropped when it arrives
+        """
+        self._watched.discard(directory)
+        self._pinned.discard(directory)
+        self._snapshots.pop(directory, None)
+        self._pending.pop(directory, None)
+        self._backend.removePath(directory)
+
+    def scan(self):
+        """
+        Starts a scan of all of the pending directories, only one scan
+        is run at a time so that each one is compared against the
+        results of the last.
+        """
+        if self._is_scanning or not self._pending:
+            return
+        requests = list(self._pending.items())
+        self._pending = {}
+        self._is_scanning = True
+        self._pool.start(WatcherScanTask(self, requests))
+
+    @staticmethod
+    def scanDirectory(directory):
+        """
+        @return: <dict> of {name: (is_dir, mtime, size)} of everything
+            in the directory, or None if it does not exist
+        """
+        snapshot = {}
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return None
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    snapshot[entry.name] = (True, 0, 0)
+                else:
+                    stat = entry.stat()
+                    snapshot[entry.name] = (False, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    """ EVENTS """
+
+    def __directoryChanged(self, directory):
+        if directory not in self._snapshots:
+            return
+        self._pending.setdefault(directory, self._snapshots[directory])
+        if not self._batch_timer.isActive():
+            self._batch_timer.start()
+
+    def __directoriesScanned(self, results):
+        created_files = []
+        modified_files = []
+        removed_files = []
+        created_dirs = []
+        removed_dirs = []
+
+        for result in results:
+            directory = result['directory']
+            snapshot = result['snapshot']
+
+            # directory removed
+            if snapshot is None:
+                if directory in self._snapshots:
+                    removed_dirs.append(directory)
+                    removed_files += [
+                        '/'.join([directory, name])
+                        for name, (is_dir, mtime, size) in self._snapshots[directory].items()
+                        if not is_dir
+                    ]
+                self.removeDirectory(directory)
+                continue
+
+            # watch was removed while scanning
+            if directory not in self._watched:
+                continue
+
+            self._snapshots[directory] = snapshot
+            created_files += result['created']
+            modified_files += result['modified']
+            removed_files += result['removed']
+            removed_dirs += result['removed_dirs']
+            for child in result['removed_dirs']:
+                self.removeDirectory(child)
+
+            # watch new directories, and the sub directories of trees
+            created_dirs += result['created_dirs']
+            for child in result['created_dirs']:
+                self.watchDirectory(child, report=True)
+            if self.isWatchingTree(directory):
+                for child in result['child_dirs']:
+                    self.watchDirectory(child)
+
+        self._is_scanning = False
+
+        if created_dirs or removed_dirs:
+            self.directoriesChanged.emit(created_dirs, removed_dirs)
+        if created_files or modified_files or removed_files:
+            self.filesChanged.emit(created_files, modified_files, removed_files)
+
+        # run anything that changed while this was scanning
+        self.scan()
+
+    """ PROPERTIES """
+
+    @property
+    def backend(self):
+        return self._backend
+
+    @property
+    def batch_interval(self):
+        return self._batch_timer.interval()
+
+    @batch_interval.setter
+    def batch_interval(self, batch_interval):
+        self._batch_timer.setInterval(batch_interval)
+
+
+class WatcherScanTask(QRunnable):
+    """
+    Rescans directories that have changed, and compares them against
+    their last snapshot.  The json files that were created/modified are
+    parsed here, so that only AssetRecords are sent back to the GUI thread.
+    @watcher: <LibraryWatcher>
+    @requests: <list> of <tuple> (directory, snapshot), if the snapshot is
+        None, this is the initial scan and nothing is reported
+    """
+    def __init__(self, watcher, requests):
+        super(WatcherScanTask, self).__init__()
+        self.watcher = watcher
+        self.requests = requests
+
+    def run(self):
+        results = []
+        for directory, old_snapshot in self.requests:
+            results.append(self.scan(directory, old_snapshot))
+        try:
+            self.watcher.directoriesScanned.emit(results)
+        except RuntimeError:
+            # the watcher has been deleted
+            pass
+
+    @staticmethod
+    def scan(directory, old_snapshot):
+        snapshot = LibraryWatcher.scanDirectory(directory)
+        result = {
+            'directory': directory,
+            'snapshot': snapshot,
+            'created': [],
+            'modified': [],
+            'removed': [],
+            'created_dirs': [],
+            'removed_dirs': [],
+            'child_dirs': []
+        }
+        if snapshot is None:
+            return result
+
+        result['child_dirs'] = [
+            '/'.join([directory, name])
+            for name, (is_dir, mtime, size) in sorted(snapshot.items()) if is_dir
+        ]
+        if old_snapshot is None:
+            return result
+
+        # created / modified
+        for name, value in sorted(snapshot.items()):
+            path = '/'.join([directory, name])
+            old_value = old_snapshot.get(name)
+            if value[0]:
+                if old_value is None or not old_value[0]:
+                    result['created_dirs'].append(path)
+                continue
+            if old_value == value:
+                continue
+            record = AssetRecord.load(path)
+            if old_value is None or old_value[0]:
+                if record is not None:
+                    result['created'].append(record)
+            elif record is not None:
+                result['modified'].append(record)
+            else:
+                result['removed'].append(path)
+
+        # removed
+        for name, old_value in old_snapshot.items():
+            if name in snapshot and snapshot[name][0] == old_value[0]:
+                continue
+            path = '/'.join([directory, name])
+            if old_value[0]:
+                result['removed_dirs'].append(path)
+            else:
+                result['removed'].append(path)
+
+        return result
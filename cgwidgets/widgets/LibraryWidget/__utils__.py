@@ -1,4 +1,3 @@
-import os
 import json
 from collections import OrderedDict
 
@@ -7,6 +6,7 @@ from qtpy.QtCore import *
 from qtpy.QtGui import *
 
 from cgwidgets import utils as gUtils
+from .SettingsStore import SettingsStore
 
 class iUtils(object):
 
@@ -16,41 +16,60 @@ class iUtils(object):
         @setting: <str> return the setting value.  This will check the
             user directory located at $HOME/.library.settings.json first
             before checking the settings file embedded into the library.
+            The settings file is only read when it changes, see SettingsStore.
         """
-        # user settings
-        try:
-            settings_dir = os.environ['HOME'] + '/.library'
-            settings_loc = settings_dir + '/settings.json'
-            user_settings = gUtils.getJSONData(settings_loc)
-            value = user_settings[setting]
-        # global settings
-        except KeyError:
-            from .Settings import Settings
-            value = getattr(Settings, setting)
-        except FileNotFoundError:
-            from .Settings import Settings
-            value = getattr(Settings, setting)
-        # return
-        finally:
-            # if value is a list then it is denoted as a stylesheet saved as a list
-            if type(value) == list:
-                value = ';'.join(value)
-    
-            return value
-    
+        return SettingsStore.instance().getSetting(setting)
+
+    @staticmethod
+    def setSetting(setting, value):
+        """
+        Sets the users value of the setting, and writes it to
+        $HOME/.library/settings.json
+        @setting: <str>
+        @value: json serializable value
+        """
+        SettingsStore.instance().setSetting(setting, value)
+
+    @staticmethod
+    def getSettingsStore():
+        """
+        @return: <SettingsStore> connect to its settingChanged signal
+            to be notified when a setting changes.
+        """
+        return SettingsStore.instance()
+
     @staticmethod
     def getModel(widget):
         main_widget = gUtils.getMainWidget(widget, 'Library')
         model = main_widget.model
         return model
 
+    @staticmethod
+    def loadJSONRow(filepath):
+        """
+        Loads a single json file into a row for the ImageListModel.
+        @filepath: <str> path to json file
+        @return: <dict> json data with the 'filepath' key added, or
+            None if the file could not be read/parsed.
+        """
+        try:
+            with open(filepath, 'r') as f:
+                jsondata = json.load(f)
+        except IOError:
+            return None
+        except ValueError:
+            return None
+        jsondata['filepath'] = filepath
+        return jsondata
+
     @staticmethod
     def createImageWidget(parent, json, row_height):
         """
-        @json: <dict> json
+        @json: <AssetRecord> row of the ImageListModel
         @row_height: <int>
         """
         from .ImageWidget import DefaultImage
+        from .Record import AssetRecord
         #from Settings import Settings
         border_width = iUtils.getSetting('IMAGE_SELECTED_BORDER_WIDTH')
         image_height = row_height - (border_width * 2)
@@ -58,7 +77,8 @@ class iUtils(object):
         image_widget = DefaultImage(
             parent=parent,
             image_width=image_height,
-            json_file=json['filepath']
+            json_file=json['filepath'],
+            record=AssetRecord.fromRow(json)
         )
         pixmap = image_widget.pixmap
     
@@ -0,0 +1,78 @@
+import unittest
+
+from cgwidgets.widgets.LibraryWidget.Metadata import ImageListMetadata, PathList
+
+
+class TestPathList(unittest.TestCase):
+    def setUp(self):
+        self.paths = PathList(['/a.json', '/b.json', '/c.json'])
+
+    def test_list(self):
+        self.assertEqual(list(self.paths), ['/a.json', '/b.json', '/c.json'])
+        self.assertEqual(len(self.paths), 3)
+        self.assertEqual(self.paths[1], '/b.json')
+        self.assertEqual(self.paths[-1], '/c.json')
+        self.assertEqual(self.paths.index('/c.json'), 2)
+        self.assertIn('/a.json', self.paths)
+        self.assertNotIn('/d.json', self.paths)
+        self.assertTrue(self.paths)
+        self.assertFalse(PathList())
+        self.assertEqual(self.paths, ['/a.json', '/b.json', '/c.json'])
+
+    def test_append(self):
+        # appending a path that exists moves it to the end
+        self.paths.append('/a.json')
+        self.assertEqual(list(self.paths), ['/b.json', '/c.json', '/a.json'])
+        self.assertEqual(PathList(['/a.json', '/a.json']), ['/a.json'])
+
+    def test_add(self):
+        # adding a path that exists leaves it where it is
+        self.paths.add('/a.json')
+        self.paths.update(['/d.json', '/b.json'])
+        self.assertEqual(list(self.paths), ['/a.json', '/b.json', '/c.json', '/d.json'])
+
+    def test_remove(self):
+        self.paths.remove('/b.json')
+        self.assertEqual(list(self.paths), ['/a.json', '/c.json'])
+        with self.assertRaises(ValueError):
+            self.paths.remove('/b.json')
+        self.paths.discard('/b.json')
+        self.paths.difference_update(['/a.json', '/d.json'])
+        self.assertEqual(list(self.paths), ['/c.json'])
+
+    def test_positionsUpdate(self):
+        # the list/row map are rebuilt after the paths change
+        self.assertEqual(self.paths.index('/b.json'), 1)
+        self.assertEqual(self.paths.getList(), ['/a.json', '/b.json', '/c.json'])
+        self.paths.remove('/a.json')
+        self.assertEqual(self.paths.index('/b.json'), 0)
+        self.assertEqual(self.paths[0], '/b.json')
+        with self.assertRaises(ValueError):
+            self.paths.index('/a.json')
+        self.paths.clear()
+        self.assertEqual(self.paths.getList(), [])
+        with self.assertRaises(IndexError):
+            self.paths[0]
+
+    def test_copy(self):
+        paths = self.paths.copy()
+        paths.remove('/a.json')
+        self.assertEqual(len(self.paths), 3)
+        self.assertIsInstance(paths, PathList)
+
+
+class TestImageListMetadata(unittest.TestCase):
+    def test_pathKeys(self):
+        metadata = ImageListMetadata(hidden=['/a.json'])
+        self.assertIsInstance(metadata['hidden'], PathList)
+        self.assertIsInstance(metadata['selected'], PathList)
+        self.assertEqual(metadata['hidden'], ['/a.json'])
+
+        metadata['selected'] = ['/b.json', '/c.json']
+        self.assertIsInstance(metadata['selected'], PathList)
+        metadata['other'] = ['/b.json']
+        self.assertIsInstance(metadata['other'], list)
+
+
+if __name__ == '__main__':
+    unittest.main()
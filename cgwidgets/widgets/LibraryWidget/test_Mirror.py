@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from qtpy.QtCore import QThreadPool
+
+from cgwidgets.widgets.LibraryWidget.Mirror import ProxyMirror
+
+
+class TestProxyMirror(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = self.temp_dir + '/proxy'
+        os.makedirs(self.source_dir)
+        self.mirror = self.createMirror()
+
+    def tearDown(self):
+        self.mirror.waitForDone()
+        shutil.rmtree(self.temp_dir)
+
+    def createMirror(self, max_bytes=1024):
+        mirror = ProxyMirror(
+            mirror_dir=self.temp_dir + '/mirror', max_bytes=max_bytes, revalidate_interval=0, thread_count=1
+        )
+        QThreadPool.globalInstance().waitForDone()
+        return mirror
+
+    def createSource(self, name, num_bytes=100, mtime=None):
+        path = '/'.join([self.source_dir, name])
+        with open(path, 'wb') as f:
+            f.write(os.urandom(num_bytes))
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def getLocalPath(self, path):
+        stat = os.stat(path)
+        return self.mirror.getLocalPath(path, stat.st_mtime_ns, stat.st_size)
+
+    def test_copy(self):
+        path = self.createSource('a.png')
+        self.assertTrue(self.mirror.copy(path))
+        local_path = self.getLocalPath(path)
+        with open(path, 'rb') as source_file, open(local_path, 'rb') as local_file:
+            self.assertEqual(source_file.read(), local_file.read())
+        self.assertEqual(self.mirror.resolve(path), local_path)
+        self.assertEqual(self.mirror.stats()['copies'], 1)
+        self.assertEqual(self.mirror.num_bytes, 100)
+
+        # copied again, it is registered rather than copied
+        self.assertTrue(self.mirror.copy(path))
+        self.assertEqual(self.mirror.stats()['copies'], 1)
+        self.assertEqual(self.mirror.num_bytes, 100)
+
+    def test_copyMissing(self):
+        self.assertFalse(self.mirror.copy(self.source_dir + '/missing.png'))
+        self.assertEqual(self.mirror.resolve(self.source_dir + '/missing.png'), self.source_dir + '/missing.png')
+
+    def test_sourceEdited(self):
+        # an edited source is mirrored under a new name
+        path = self.createSource('a.png', mtime=1000000000)
+        self.mirror.copy(path)
+        old_local_path = self.getLocalPath(path)
+        self.createSource('a.png', num_bytes=120, mtime=2000000000)
+        self.assertEqual(self.mirror.resolve(path), path)
+        self.mirror.waitForDone()
+        new_local_path = self.getLocalPath(path)
+        self.assertNotEqual(new_local_path, old_local_path)
+        self.assertEqual(self.mirror.resolve(path), new_local_path)
+
+    def test_evict(self):
+        # the least recently used copies are removed once it is over quota
+        paths = [self.createSource('{index}.png'.format(index=index), num_bytes=400) for index in range(3)]
+        for path in paths[:2]:
+            self.mirror.copy(path)
+        self.mirror.resolve(paths[0])
+        self.mirror.copy(paths[2])
+        self.assertTrue(os.path.exists(self.getLocalPath(paths[0])))
+        self.assertFalse(os.path.exists(self.getLocalPath(paths[1])))
+        self.assertTrue(os.path.exists(self.getLocalPath(paths[2])))
+        self.assertEqual(self.mirror.stats()['evictions'], 1)
+        self.assertEqual(self.mirror.num_bytes, 800)
+
+        # lowering the quota evicts, but the most recent copy is kept
+        self.mirror.max_bytes = 100
+        self.assertEqual(self.mirror.stats()['count'], 1)
+        self.assertTrue(os.path.exists(self.getLocalPath(paths[2])))
+
+    def test_scan(self):
+        # copies from previous sessions are picked up, partial copies are removed
+        path = self.createSource('a.png')
+        self.mirror.copy(path)
+        local_path = self.getLocalPath(path)
+        with open(local_path + '.1.tmp', 'wb') as f:
+            f.write(b'partial')
+        with open(local_path, 'ab') as f:
+            f.write(b'truncated copies are removed too')
+        other_path = self.createSource('b.png')
+        self.mirror.copy(other_path)
+
+        mirror = self.createMirror()
+        self.assertEqual(mirror.stats()['count'], 1)
+        self.assertEqual(mirror.resolve(other_path), self.getLocalPath(other_path))
+        self.assertFalse(os.path.exists(local_path))
+        self.assertFalse(os.path.exists(local_path + '.1.tmp'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from cgwidgets.widgets.LibraryWidget.Query import (
+    SearchIndex, SearchQuery, SearchTerm, bitsetToRows, rowsToBitset
+)
+
+
+ROWS = [
+    {'name': 'rock_wall', 'type': 'shader', 'note': 'wet stone', 'author': 'ann'},
+    {'name': 'oak_floor', 'type': 'texture', 'note': 'dry wood', 'author': 'bob'},
+    {'name': 'rock_path', 'type': 'shader', 'note': 'glossy wet', 'author': 'joanne'},
+    {'name': 'sky_dome', 'type': 'lightrig'},
+    {'name': 'ab', 'type': 'lighttex', 'note': 'clean'}
+]
+
+
+def search(text, rows=ROWS):
+    return bitsetToRows(SearchQuery.parse(text).execute(SearchIndex(rows)))
+
+
+class TestBitset(unittest.TestCase):
+    def test_roundTrip(self):
+        rows = [0, 1, 7, 8, 63, 64, 1000]
+        self.assertEqual(bitsetToRows(rowsToBitset(rows)), rows)
+
+    def test_empty(self):
+        self.assertEqual(rowsToBitset([]), 0)
+        self.assertEqual(bitsetToRows(0), [])
+
+
+class TestSearchQuery(unittest.TestCase):
+    def test_parse(self):
+        query = SearchQuery.parse('name{rock, .*_dome}type{shader}')
+        self.assertEqual([key for key, terms in query.params], ['name', 'type'])
+        name_terms = query.params[0][1]
+        self.assertEqual([term.text for term in name_terms], ['rock', '.*_dome'])
+        self.assertTrue(name_terms[0].isToken())
+        self.assertIsNone(name_terms[0].pattern)
+        self.assertFalse(name_terms[1].isToken())
+        self.assertIsNotNone(name_terms[1].pattern)
+
+    def test_parseEmpty(self):
+        self.assertTrue(SearchQuery.parse('').isEmpty())
+        self.assertTrue(SearchQuery.parse('name').isEmpty())
+
+    def test_invalidRegex(self):
+        # invalid regexes are matched literally
+        term = SearchTerm('a(b')
+        self.assertEqual(term.pattern.pattern, 'a\\(b')
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_token(self):
+        self.assertEqual(search('name{rock}'), [0, 2])
+        self.assertEqual(search('name{rock_p}'), [2])
+        self.assertEqual(search('name{does_not_exist}'), [])
+
+    def test_shortToken(self):
+        self.assertEqual(search('name{ab}'), [4])
+        self.assertEqual(search('name{k}'), [0, 1, 2, 3])
+
+    def test_pattern(self):
+        self.assertEqual(search('name{^rock}'), [0, 2])
+        self.assertEqual(search('type{^light}'), [3, 4])
+
+    def test_tokenOnKeyWithoutIndex(self):
+        index = SearchIndex(ROWS)
+        self.assertEqual(bitsetToRows(index.match('author', SearchTerm('ann'))), [0, 2])
+        self.assertEqual(search('author{ann, bob}'), [0, 1, 2])
+
+    def test_noteIsIndexed(self):
+        index = SearchIndex(ROWS)
+        self.assertEqual(bitsetToRows(index.match('note', SearchTerm('wet'))), [0, 2])
+        self.assertIn('wet', index.getTrigrams('note'))
+        self.assertEqual(search('note{wet, glossy}'), [0, 2])
+
+    def test_missingKey(self):
+        self.assertEqual(search('note{clean}'), [4])
+        self.assertEqual(search('missing{rock}'), [])
+
+    def test_multipleParams(self):
+        # any of the params can match
+        self.assertEqual(search('name{sky}type{texture}'), [1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
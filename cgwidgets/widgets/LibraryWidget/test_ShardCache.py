@@ -0,0 +1,109 @@
+import unittest
+
+from cgwidgets.widgets.LibraryWidget.ShardCache import PendingShard, Shard, ShardCache
+
+
+DIRECTORY = '/library/rocks'
+FILES = {
+    DIRECTORY + '/rock_wall.json': (100, 10),
+    DIRECTORY + '/rock_path.json': (200, 20)
+}
+RECORDS = [{'name': 'rock_wall'}, {'name': 'rock_path'}]
+
+
+def createShard(directory=DIRECTORY, mtime=1, files=FILES, records=RECORDS):
+    return Shard(directory, mtime, dict(files), records, [directory + '/mossy'])
+
+
+class TestShardCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ShardCache(max_bytes=1024 * 1024)
+        self.cache.insert(createShard())
+
+    def test_get(self):
+        shard = self.cache.get(DIRECTORY, 1, dict(FILES))
+        self.assertEqual([record['name'] for record in shard.records], ['rock_wall', 'rock_path'])
+        self.assertEqual(shard.sub_directories, (DIRECTORY + '/mossy', ))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertIsNone(self.cache.get('/library/trees', 1, {}))
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_directoryChanged(self):
+        self.assertIsNone(self.cache.get(DIRECTORY, 2, dict(FILES)))
+        self.assertIsNone(self.cache.get(DIRECTORY, None, dict(FILES)))
+
+    def test_fileEdited(self):
+        # editing a file in place does not change the mtime of its directory
+        files = dict(FILES)
+        files[DIRECTORY + '/rock_wall.json'] = (101, 10)
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, files))
+        files[DIRECTORY + '/rock_wall.json'] = (100, 11)
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, files))
+
+    def test_fileAddedOrRemoved(self):
+        files = dict(FILES)
+        files[DIRECTORY + '/rock_cliff.json'] = (300, 30)
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, files))
+        files = dict(FILES)
+        del files[DIRECTORY + '/rock_path.json']
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, files))
+
+    def test_invalidate(self):
+        self.cache.invalidate(DIRECTORY)
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, dict(FILES)))
+        self.assertEqual(self.cache.stats()['count'], 0)
+        self.assertEqual(self.cache.stats()['num_bytes'], 0)
+
+        # directories that are not cached are ignored
+        self.cache.invalidate('/library/trees')
+
+    def test_insertReplaces(self):
+        self.cache.insert(createShard(mtime=2, records=RECORDS[:1]))
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, dict(FILES)))
+        self.assertEqual(len(self.cache.get(DIRECTORY, 2, dict(FILES)).records), 1)
+        self.assertEqual(self.cache.stats()['count'], 1)
+        self.assertEqual(self.cache.stats()['num_bytes'], createShard(records=RECORDS[:1]).num_bytes)
+
+    def test_evict(self):
+        # the least recently used shards are evicted once it is over budget
+        num_bytes = createShard().num_bytes
+        cache = ShardCache(max_bytes=num_bytes * 2)
+        for name in ('a', 'b'):
+            cache.insert(createShard(directory='/library/' + name))
+        cache.get('/library/a', 1, dict(FILES))
+        cache.insert(createShard(directory='/library/c'))
+        self.assertIsNotNone(cache.get('/library/a', 1, dict(FILES)))
+        self.assertIsNone(cache.get('/library/b', 1, dict(FILES)))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        # shards larger than the budget are not cached
+        cache = ShardCache(max_bytes=num_bytes - 1)
+        cache.insert(createShard())
+        self.assertEqual(cache.stats()['count'], 0)
+
+
+class TestPendingShard(unittest.TestCase):
+    def setUp(self):
+        self.cache = ShardCache(max_bytes=1024 * 1024)
+
+    def test_finish(self):
+        pending_shard = PendingShard(self.cache, DIRECTORY, 1, dict(FILES), [], 2)
+        pending_shard.addRecords(RECORDS[:1])
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, dict(FILES)))
+        pending_shard.addRecords(RECORDS[1:])
+        self.assertEqual(len(self.cache.get(DIRECTORY, 1, dict(FILES)).records), 2)
+
+    def test_empty(self):
+        PendingShard(self.cache, DIRECTORY, 1, {}, [DIRECTORY + '/mossy'], 0)
+        self.assertEqual(self.cache.get(DIRECTORY, 1, {}).records, ())
+
+    def test_cancel(self):
+        pending_shard = PendingShard(self.cache, DIRECTORY, 1, dict(FILES), [], 2)
+        pending_shard.addRecords(RECORDS[:1])
+        pending_shard.cancel()
+        pending_shard.addRecords(RECORDS[1:])
+        self.assertIsNone(self.cache.get(DIRECTORY, 1, dict(FILES)))
+
+
+if __name__ == '__main__':
+    unittest.main()
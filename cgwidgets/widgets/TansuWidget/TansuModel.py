@@ -36,23 +36,11 @@ class TansuModelItem(AbstractDragDropModelItem, iTansuDynamicWidget):
         dynamic_widget_base_class (QWidget): Widget to be shown when this item is
             selected if the Tansu is in DYNAMIC mode.
     """
-    def __init__(self, parent=None):
-        #self._data = data
-        self._column_data = {}
-        self._children = []
-        self._parent = parent
-        self._delegate_widget = None
-        self._dynamicWidgetFunction = None
+    __slots__ = ('_test', )
 
+    def __init__(self, parent=None):
         self._test = True
-        #self._is_selected = False
-        self._is_enabled = True
-        self._isSelectable = True
-        self._isDragEnabled = True
-        self._isDropEnabled = True
-        self._isEditable = True
-        if parent is not None:
-            parent.addChild(self)
+        super(TansuModelItem, self).__init__(parent)
 
     @property
     def test(self):
@@ -184,6 +184,43 @@ class TansuModelViewWidget(QSplitter, iTansuDynamicWidget):
 
         return new_index
 
+    def insertTansuWidgets(self, row, column_data_list, parent=None, widgets=None):
+        """
+        Creates a block of new tabs at the specified index.  This only
+        inserts one set of rows into the model, so should be used
+        instead of insertTansuWidget() when creating a lot of tabs.
+
+        Args:
+            row (int): index to insert the widgets at
+            column_data_list (list | dict): of the column data (dict) for each
+                tab, or a tree of names, see AbstractDragDropModel.insertItems()
+            parent (QModelIndex): Parent index to create these new
+                tabs under neath
+            widgets (list): of QWidgets to be displayed at each of the top
+                level indexes
+
+        Returns (list): of QModelIndex
+        """
+        # create new model indexes
+        if not parent:
+            parent = QModelIndex()
+        view_items = self.model().insertItems(row, column_data_list, parent=parent)
+        if view_items:
+            row = view_items[0].row()
+
+        # add to layout if stacked
+        if self.getDelegateType() == TansuModelViewWidget.STACKED:
+            for offset, view_item in enumerate(view_items):
+                widget = widgets[offset] if widgets else None
+                view_delegate_widget = self.createTansuModelDelegateWidget(view_item, widget)
+                view_item.setDelegateWidget(view_delegate_widget)
+
+                # insert tab widget
+                self.delegateWidget().insertWidget(row + offset, view_delegate_widget)
+                view_delegate_widget.hide()
+
+        return [self.model().getIndexFromItem(view_item) for view_item in view_items]
+
     def getAllSelectedIndexes(self):
         selected_indexes = []
         for index in self.headerWidget().selectionModel().selectedIndexes():